@@ -0,0 +1,103 @@
+"""
+Throughput of 1k concurrent lookups through AsyncDictionary against sequential
+Dictionary.read calls, over a backend with a simulated network round trip.
+
+    python -m benchmarks.bench_async [round trip ms]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+from benchmarks.common import MemoryDb, generate_entries
+from db import AsyncDbInterface
+from dictionary.async_dictionary import AsyncDictionary
+from dictionary.dictionary import Dictionary
+
+LOOKUPS = 1_000
+HOT_WORDS = 200
+
+
+class LatencyDb(MemoryDb):
+    def __init__(self, entries: list[dict], latency: float):
+        super().__init__(entries)
+        self.latency = latency
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        time.sleep(self.latency)
+        return super().get_or_none(key, lang)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        time.sleep(self.latency)
+        super().increment(key, field, amount)
+
+
+class AsyncLatencyDb(AsyncDbInterface):
+    def __init__(self, entries: list[dict], latency: float):
+        super().__init__("memory")
+        self.db = MemoryDb(entries)
+        self.latency = latency
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def get_or_none(self, key: str):
+        await self._round_trip()
+        return self.db.get_or_none(key)
+
+    async def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        await self._round_trip()
+        return self.db.get_many(keys, lang)
+
+    async def insert_if_absent(self, data: dict) -> bool:
+        await self._round_trip()
+        return self.db.insert_if_absent(data)
+
+    async def update(self, key: str, data: dict):
+        await self._round_trip()
+        self.db.update(key, data)
+
+    async def increment(self, key: str, field: str, amount: int = 1):
+        await self._round_trip()
+        self.db.increment(key, field, amount)
+
+    async def get_whole_data(self):
+        return self.db.get_whole_data()
+
+
+def main(latency: float):
+    entries = generate_entries(10_000)
+    rng = random.Random(5)
+    hot = rng.sample([entry["word"] for entry in entries], HOT_WORDS)
+    keys = [rng.choice(hot) for _ in range(LOOKUPS)]
+
+    dictionary = Dictionary(LatencyDb(entries, latency))
+    start = time.perf_counter()
+    for key in keys:
+        dictionary.read(key, "en")
+    sync_elapsed = time.perf_counter() - start
+
+    async def run_async():
+        db = AsyncLatencyDb(entries, latency)
+        async_dictionary = await AsyncDictionary.create(db)
+        start = time.perf_counter()
+        await asyncio.gather(*(async_dictionary.read(key, "en") for key in keys))
+        await async_dictionary.flush()
+        return time.perf_counter() - start, db.calls
+
+    async_elapsed, calls = asyncio.run(run_async())
+    print(
+        f"{LOOKUPS} lookups over {HOT_WORDS} words, {latency * 1000:.1f} ms round trip"
+    )
+    print(f"{'Dictionary':>16}: {LOOKUPS / sync_elapsed:>10,.0f} lookups/s")
+    print(
+        f"{'AsyncDictionary':>16}: {LOOKUPS / async_elapsed:>10,.0f} lookups/s"
+        f" ({calls} backend calls)"
+    )
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.001)
@@ -0,0 +1,69 @@
+"""
+Memory of the JSON file backend holding its entries in a dict of dicts against
+the compact columns (`DbFile(compact=True)`), with the cost of opening it,
+lookups and reading every weight to build the trie.
+
+    python -m benchmarks.bench_compact [stored entries]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import DbFile
+
+LOOKUPS = 10_000
+
+
+def per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / calls
+
+
+def main(size: int):
+    entries = generate_entries(size, farsi_share=0.2)
+    rng = random.Random(1)
+    for entry in entries:
+        entry["weight"] = rng.randint(0, 1000)
+    sample = [entry["word"] for entry in rng.sample(entries, min(LOOKUPS, size))]
+    print(f"stored entries: {size:,}")
+    print(
+        f"{'storage':>8} {'memory MB':>10} {'B/entry':>8} "
+        f"{'load peak MB':>13} {'open s':>7}"
+        f" {'get us':>7} {'iter_words s':>13}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "database.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({entry["word"]: entry for entry in entries}, f, indent=4)
+        del entries
+        for name, compact in [("dict", False), ("compact", True)]:
+            tracemalloc.start()
+            db = DbFile(path, compact=compact)
+            memory, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del db
+            start = time.perf_counter()
+            db = DbFile(path, compact=compact)
+            opening = time.perf_counter() - start
+            get = per_call(
+                lambda: [db.get_or_none(word) for word in sample], len(sample)
+            )
+            iter_words = per_call(lambda: sum(1 for _ in db.iter_words()), 1)
+            print(
+                f"{name:>8} {memory / 2**20:>10.1f} "
+                f"{memory / size:>8.0f} {peak / 2**20:>13.1f}"
+                f" {opening:>7.2f} {get * 1e6:>7.2f} {iter_words:>13.2f}"
+            )
+            db.close()
+            del db
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
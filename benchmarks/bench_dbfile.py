@@ -0,0 +1,57 @@
+"""
+Sustained write throughput of the JSON file backend against the log-structured one.
+
+    python -m benchmarks.bench_dbfile [stored entries]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import DbFile, DbLogFile
+
+DURATION = 3.0
+
+
+def preload(db, entries: list[dict]):
+    db.storage = {entry["word"]: entry for entry in entries}
+
+
+def sustained_writes(db) -> float:
+    writes = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        db.write({"word": f"new{writes}", "meanings": {"en": "new", "fa": "تازه"}})
+        writes += 1
+    return writes / (time.perf_counter() - start)
+
+
+def main(size: int):
+    entries = generate_entries(size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory)
+        print(f"stored entries: {size:,}")
+
+        json_db = DbFile(str(path / "database.json"))
+        preload(json_db, entries)
+        print(f"{'DbFile':>24}: {sustained_writes(json_db):>10,.0f} writes/s")
+
+        for label, options in [
+            ("DbLogFile", {}),
+            ("DbLogFile fsync 10ms", {"fsync_interval": 0.01}),
+            ("DbLogFile fsync always", {"fsync_interval": 0}),
+        ]:
+            log_path = path / f"{label}.log"
+            db = DbLogFile(str(log_path))
+            for entry in entries:
+                db.write(entry)
+            db.close()
+            db = DbLogFile(str(log_path), **options)
+            print(f"{label:>24}: {sustained_writes(db):>10,.0f} writes/s")
+            db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
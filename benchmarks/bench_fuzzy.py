@@ -0,0 +1,70 @@
+"""
+Typo-tolerant lookup: the trie walk of `fuzzy` against comparing the query with
+every word.
+
+    python -m benchmarks.bench_fuzzy [vocabulary size]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.common import generate_words
+from dictionary.tie import TrieFactory, TrieType
+
+QUERIES = 200
+SCANNED_QUERIES = 1
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("xyz") + word[i + 1 :]
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            row.append(
+                min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = row
+    return previous[-1]
+
+
+def bench_scan(words: list[str], queries: list[str], max_distance: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        [word for word in words if levenshtein(query, word) <= max_distance]
+    return (time.perf_counter() - start) / len(queries)
+
+
+def bench_fuzzy(trie, queries: list[str], max_distance: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        trie.fuzzy(query, max_distance, limit=10)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(size: int):
+    words = generate_words(size)
+    rng = random.Random(1)
+    queries = [misspell(word, rng) for word in rng.sample(words, QUERIES)]
+    print(f"vocabulary: {size:,} words")
+    print(f"{'method':>10} {'distance':>9} {'query ms':>9}")
+    # Comparing with every word costs the same whatever the distance, and takes long.
+    scan = bench_scan(words, queries[:SCANNED_QUERIES], 2)
+    print(f"{'scan':>10} {2:>9} {scan * 1e3:>9.2f}")
+    for trie_type in TrieType:
+        trie = TrieFactory.create_trie(trie_type)
+        for word in words:
+            trie.insert(word)
+        for max_distance in (1, 2):
+            elapsed = bench_fuzzy(trie, queries, max_distance)
+            print(f"{trie_type.value:>10} {max_distance:>9} {elapsed * 1e3:>9.2f}")
+        del trie
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
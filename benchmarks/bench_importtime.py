@@ -0,0 +1,80 @@
+"""
+Cold start: what importing the CLI costs (from `python -X importtime`), and the
+wall time from launching a process to its first `get`, with the trie built on
+startup against built on first use.
+
+    python -m benchmarks.bench_importtime [stored entries]
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+FIRST_GET = """
+from db.database import DbLogFile
+from dictionary.dictionary import Dictionary
+dictionary = Dictionary(DbLogFile({path!r}), lazy_trie={lazy})
+dictionary.read({word!r}, "en")
+"""
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """
+    Returns (module, self us, cumulative us) for every module imported by `module`.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times.append((name.strip(), int(own), int(cumulative)))
+    return times
+
+
+def wall_time(code: str) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(size: int):
+    print(f"{'import':>16} {'ms':>8}")
+    for module in ["main", "db.mongo"]:
+        total = import_times(module)[-1][2]
+        print(f"{module:>16} {total / 1000:>8.1f}")
+    print("\nslowest imports of main (self time):")
+    for name, own, _ in sorted(import_times("main"), key=lambda item: -item[1])[:8]:
+        print(f"{name:>40} {own / 1000:>8.1f} ms")
+
+    entries = generate_entries(size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "database.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({entry["word"]: entry for entry in entries}, f)
+        word = entries[len(entries) // 2]["word"]
+        print(f"\nlaunch to first get, {size:,} stored entries:")
+        print(f"{'python -c pass':>16} {wall_time('pass'):>8.3f} s")
+        for label, lazy in [("eager trie", False), ("lazy trie", True)]:
+            elapsed = wall_time(FIRST_GET.format(path=path, lazy=lazy, word=word))
+            print(f"{label:>16} {elapsed:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
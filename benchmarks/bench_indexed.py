@@ -0,0 +1,67 @@
+"""
+Startup time, memory and lookup latency of DbFile against DbIndexedFile.
+
+    python -m benchmarks.bench_indexed [stored entries]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import DbFile, DbIndexedFile, convert_json_to_indexed
+
+LOOKUPS = 10_000
+
+
+def open_db(factory, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    db = factory(path)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return db, elapsed, memory
+
+
+def bench_lookups(db, keys: list[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        db.get_or_none(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main(size: int):
+    entries = generate_entries(size)
+    keys = random.Random(1).sample([entry["word"] for entry in entries], LOOKUPS)
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = str(Path(directory) / "database.json")
+        indexed_path = str(Path(directory) / "database.idx")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({entry["word"]: entry for entry in entries}, f, indent=4)
+        start = time.perf_counter()
+        convert_json_to_indexed(json_path, indexed_path)
+        print(
+            f"stored entries: {size:,}, conversion {time.perf_counter() - start:.2f} s"
+        )
+        print(f"{'backend':>14} {'startup s':>10} {'memory MB':>10} {'lookup us':>10}")
+        for name, factory, path in [
+            ("DbFile", DbFile, json_path),
+            ("DbIndexedFile", DbIndexedFile, indexed_path),
+        ]:
+            db, elapsed, memory = open_db(factory, path)
+            lookup = bench_lookups(db, keys)
+            print(
+                f"{name:>14} {elapsed:>10.3f} "
+                f"{memory / 2**20:>10.1f} {lookup * 1e6:>10.2f}"
+            )
+            if isinstance(db, DbIndexedFile):
+                db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
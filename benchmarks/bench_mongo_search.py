@@ -0,0 +1,101 @@
+"""
+Prefix search over DbMongo (through mongomock): an in-memory trie in every process
+against searches answered by the collection, alone and behind a hot-prefix cache.
+
+    python -m benchmarks.bench_mongo_search [stored entries]
+
+mongomock checks every document against the anchored regex, where a MongoDB
+server scans just the matching range of the `word` index, so the uncached search
+latency here is an upper bound; startup, memory and cache hit rates carry over.
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+import mongomock
+
+from benchmarks.common import generate_entries
+from db.cache import CachedDb
+from db.mongo import DbMongo
+from dictionary.dictionary import Dictionary
+
+QUERIES = 20
+HOT_QUERIES = 1_000
+HOT_PREFIXES = 50
+PREFIX_CACHE = 100
+
+
+def filled_db(entries: list[dict]) -> DbMongo:
+    client = mongomock.MongoClient()
+    # Loaded before DbMongo creates its unique index, which mongomock checks by
+    # scanning the whole collection on every insert.
+    client["benchmark"]["words"].insert_many([dict(entry) for entry in entries])
+    with mock.patch("db.mongo.MongoClient", lambda *args, **kwargs: client):
+        return DbMongo("mongodb://localhost", "benchmark", "words")
+
+
+def startup(db, **options):
+    tracemalloc.start()
+    start = time.perf_counter()
+    dictionary = Dictionary(db, record_lookups=False, **options)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return dictionary, elapsed, memory
+
+
+def search_latency(dictionary: Dictionary, prefixes: list[str]) -> float:
+    start = time.perf_counter()
+    for prefix in prefixes:
+        dictionary.search(prefix, limit=10)
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def main(size: int):
+    entries = generate_entries(size, farsi_share=0.2)
+    rng = random.Random(1)
+    words = [entry["word"] for entry in entries]
+    prefixes = [word[:3] for word in rng.sample(words, QUERIES)]
+    # A few prefixes typed over and over, as in an autocomplete box.
+    hot = [word[:3] for word in rng.sample(words, HOT_PREFIXES)]
+    hot_queries = rng.choices(
+        hot, weights=[1 / rank for rank in range(1, HOT_PREFIXES + 1)], k=HOT_QUERIES
+    )
+    db = filled_db(entries)
+    print(f"stored entries: {size:,}")
+    print(
+        f"{'mode':>26} {'startup s':>10} {'memory MB':>10} "
+        f"{'search us':>10} {'hot search us':>14}"
+    )
+
+    dictionary, elapsed, memory = startup(db)
+    print(
+        f"{'trie':>26} {elapsed:>10.3f} {memory / 2**20:>10.1f}"
+        f" {search_latency(dictionary, prefixes) * 1e6:>10.1f}"
+        f" {search_latency(dictionary, hot_queries) * 1e6:>14.1f}"
+    )
+    del dictionary
+
+    dictionary, elapsed, memory = startup(db, storage_search=True)
+    print(
+        f"{'mongo':>26} {elapsed:>10.3f} {memory / 2**20:>10.1f}"
+        f" {search_latency(dictionary, prefixes) * 1e6:>10.1f} {'':>14}"
+    )
+
+    cached = CachedDb(db, capacity=0, prefix_capacity=PREFIX_CACHE)
+    dictionary, elapsed, memory = startup(cached, storage_search=True)
+    hot_latency = search_latency(dictionary, hot_queries)
+    stats = cached.stats()
+    hit_rate = stats["prefix_hits"] / (stats["prefix_hits"] + stats["prefix_misses"])
+    print(
+        f"{f'mongo + {PREFIX_CACHE} prefix cache':>26} "
+        f"{elapsed:>10.3f} {memory / 2**20:>10.1f}"
+        f" {'':>10} {hot_latency * 1e6:>14.1f}   ({hit_rate:.0%} hits)"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
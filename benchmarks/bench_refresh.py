@@ -0,0 +1,59 @@
+"""
+Catching up with words another process stored: `Dictionary.refresh`, which reads
+only the changed words, against `update_trie`, which reads them all again.
+
+    python -m benchmarks.bench_refresh [stored entries]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import DbFile, DbSqlite
+from dictionary.dictionary import Dictionary
+
+CHANGED = [1, 10, 100]
+CHUNK = 10_000
+
+
+def fill(db, entries: list[dict]):
+    for start in range(0, len(entries), CHUNK):
+        db.insert_many(entries[start : start + CHUNK])
+
+
+def main(size: int):
+    entries = generate_entries(size, farsi_share=0.2)
+    print(f"stored entries: {size:,}")
+    print(f"{'backend':>8} {'changed':>8} {'refresh ms':>11} {'update_trie ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, db_class, suffix in [
+            ("DbFile", DbFile, ".json"),
+            ("DbSqlite", DbSqlite, ".sqlite3"),
+        ]:
+            path = str(Path(directory) / f"database{suffix}")
+            fill(db_class(path), entries)
+            dictionary = Dictionary(db_class(path), record_lookups=False)
+            other = db_class(path)
+            for changed in CHANGED:
+                other.insert_many(
+                    [
+                        {"word": f"new{changed}-{i}", "meanings": {"en": "new"}}
+                        for i in range(changed)
+                    ]
+                )
+                start = time.perf_counter()
+                dictionary.refresh()
+                refresh = time.perf_counter() - start
+                start = time.perf_counter()
+                dictionary.update_trie()
+                rebuild = time.perf_counter() - start
+                print(
+                    f"{name:>8} {changed:>8} "
+                    f"{refresh * 1e3:>11.2f} {rebuild * 1e3:>15.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,87 @@
+"""
+Load generator for the NDJSON server: requests per second over a Unix socket
+for several pipeline depths (requests sent before reading their responses).
+
+    python -m benchmarks.bench_server [vocabulary size] [requests]
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+from benchmarks.common import MemoryDb, generate_entries
+from dictionary.dictionary import Dictionary
+from server import DictionaryServer
+
+DEPTHS = [1, 8, 64, 512]
+
+
+def run_server(path: str, size: int, ready):
+    dictionary = Dictionary(MemoryDb(generate_entries(size)), thread_safe=True)
+    with DictionaryServer(path, dictionary) as server:
+        ready.set()
+        server.serve_forever()
+
+
+def read_lines(client: socket.socket, count: int, buffer: bytes) -> bytes:
+    received = buffer.count(b"\n")
+    while received < count:
+        chunk = client.recv(1 << 16)
+        buffer += chunk
+        received += chunk.count(b"\n")
+    # Keep whatever follows the last expected response.
+    return b"\n".join(buffer.split(b"\n")[count:])
+
+
+def bench(path: str, requests: list[bytes], depth: int) -> float:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        buffer = b""
+        start = time.perf_counter()
+        for i in range(0, len(requests), depth):
+            window = requests[i : i + depth]
+            client.sendall(b"".join(window))
+            buffer = read_lines(client, len(window), buffer)
+        return len(requests) / (time.perf_counter() - start)
+
+
+def main(size: int, count: int):
+    words = [entry["word"] for entry in generate_entries(size)]
+    rng = random.Random(1)
+    workloads = {"get": [], "mixed": []}
+    for i in range(count):
+        word = rng.choice(words)
+        get = {"id": i, "op": "get", "word": word, "lang": "en"}
+        workloads["get"].append(json.dumps(get).encode() + b"\n")
+        if i % 4 == 0:
+            get = {"id": i, "op": "complete", "prefix": word[:2], "k": 5}
+        workloads["mixed"].append(json.dumps(get).encode() + b"\n")
+    path = os.path.join(tempfile.mkdtemp(), "dictionary.sock")
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_server, args=(path, size, ready), daemon=True
+    )
+    server.start()
+    ready.wait()
+    try:
+        print(f"vocabulary: {size:,} words, {count:,} requests per run")
+        print("mixed: 3/4 get, 1/4 complete")
+        print(f"{'depth':>6} {'get req/s':>10} {'mixed req/s':>12}")
+        for depth in DEPTHS:
+            gets = bench(path, workloads["get"], depth)
+            mixed = bench(path, workloads["mixed"], depth)
+            print(f"{depth:>6} {gets:>10,.0f} {mixed:>12,.0f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+    )
@@ -0,0 +1,104 @@
+"""
+The SQLite backend, with prefix searches pushed down to it, against the JSON file
+backend with the in-memory trie: loading, startup, Python heap (SQLite's own page
+cache, a few MB, is not traced), lookups, searches and writes.
+
+    python -m benchmarks.bench_sqlite [stored entries]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import DbFile, DbSqlite
+from dictionary.dictionary import Dictionary
+
+LOOKUPS = 1_000
+CHUNK = 10_000
+# Every DbFile write rewrites the whole file.
+FILE_WRITES = 3
+
+
+def load_file(path: str, entries: list[dict]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({entry["word"]: entry for entry in entries}, f, indent=4)
+
+
+def load_sqlite(path: str, entries: list[dict]):
+    db = DbSqlite(path)
+    for start in range(0, len(entries), CHUNK):
+        db.insert_many(entries[start : start + CHUNK])
+    db.close()
+
+
+def open_dictionary(name: str, path: str) -> Dictionary:
+    if name == "DbFile":
+        return Dictionary(DbFile(path), record_lookups=False)
+    return Dictionary(DbSqlite(path), record_lookups=False, storage_search=True)
+
+
+def per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / calls
+
+
+def main(size: int):
+    entries = generate_entries(size, farsi_share=0.2)
+    rng = random.Random(1)
+    sample = [entry["word"] for entry in rng.sample(entries, LOOKUPS)]
+    prefixes = [word[:3] for word in sample]
+    print(f"stored entries: {size:,}")
+    print(
+        f"{'backend':>8} {'load s':>8} {'startup s':>10} {'heap MB':>10} {'get us':>8}"
+        f" {'get_many us':>12} {'search us':>10} {'write ms':>9}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for name, suffix, load in [
+            ("DbFile", ".json", load_file),
+            ("DbSqlite", ".sqlite3", load_sqlite),
+        ]:
+            path = str(Path(directory) / f"database{suffix}")
+            start = time.perf_counter()
+            load(path, entries)
+            loading = time.perf_counter() - start
+
+            tracemalloc.start()
+            dictionary = open_dictionary(name, path)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del dictionary
+            start = time.perf_counter()
+            dictionary = open_dictionary(name, path)
+            startup = time.perf_counter() - start
+
+            db = dictionary.db
+            get = per_call(lambda: [db.get_or_none(word) for word in sample], LOOKUPS)
+            get_many = per_call(lambda: db.get_many(sample, "en"), LOOKUPS)
+            search = per_call(
+                lambda: [dictionary.search(prefix, limit=10) for prefix in prefixes],
+                LOOKUPS,
+            )
+            writes = FILE_WRITES if name == "DbFile" else LOOKUPS
+            write = per_call(
+                lambda: [
+                    dictionary.write(f"new{i}", {"en": "new", "fa": "تازه"})
+                    for i in range(writes)
+                ],
+                writes,
+            )
+            print(
+                f"{name:>8} {loading:>8.2f} {startup:>10.3f} "
+                f"{memory / 2**20:>10.1f} {get * 1e6:>8.1f}"
+                f" {get_many * 1e6:>12.1f} {search * 1e6:>10.1f} {write * 1e3:>9.2f}"
+            )
+            del dictionary, db
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,57 @@
+"""
+Dictionary startup time: rebuilding the trie from storage against loading the trie
+snapshot.
+
+    python -m benchmarks.bench_startup [stored entries]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import generate_entries
+from db.database import (
+    DbIndexedFile,
+    DbLogFile,
+    convert_json_to_indexed,
+    convert_json_to_log,
+)
+from dictionary.dictionary import Dictionary
+
+
+def timed_startup(db, snapshot_path: str = None) -> float:
+    start = time.perf_counter()
+    Dictionary(db, snapshot_path=snapshot_path)
+    return time.perf_counter() - start
+
+
+def main(size: int):
+    entries = generate_entries(size)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        json_path = str(directory / "database.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({entry["word"]: entry for entry in entries}, f)
+        indexed_path = str(directory / "database.idx")
+        convert_json_to_indexed(json_path, indexed_path)
+        log_path = str(directory / "database.log")
+        convert_json_to_log(json_path, log_path)
+        print(f"stored entries: {size:,}")
+        print(f"{'backend':>14} {'rebuild s':>10} {'snapshot s':>11}")
+        for name, db in [
+            ("DbLogFile", DbLogFile(log_path)),
+            ("DbIndexedFile", DbIndexedFile(indexed_path)),
+        ]:
+            snapshot_path = str(directory / f"{name}.snapshot")
+            rebuild = timed_startup(db)
+            # The first start writes the snapshot, the second one loads it.
+            timed_startup(db, snapshot_path)
+            snapshot = timed_startup(db, snapshot_path)
+            print(f"{name:>14} {rebuild:>10.3f} {snapshot:>11.3f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
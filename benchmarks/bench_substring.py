@@ -0,0 +1,69 @@
+"""
+Substring and suffix search: the n-gram index and the reversed-word trie against
+a scan of every word.
+
+    python -m benchmarks.bench_substring [vocabulary size]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.common import MemoryDb, generate_entries
+from dictionary.dictionary import Dictionary
+
+QUERIES = 200
+
+
+def per_query(function, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(size: int):
+    entries = generate_entries(size)
+    dictionary = Dictionary(MemoryDb(entries))
+    words = [entry["word"] for entry in entries]
+    rng = random.Random(1)
+    samples = rng.sample(words, QUERIES)
+    infixes = [word[1:4] for word in samples]
+    suffixes = [word[-3:] for word in samples]
+
+    start = time.perf_counter()
+    dictionary.search_suffix("", limit=1)
+    print(
+        f"vocabulary: {size:,} words, indexes built "
+        f"in {time.perf_counter() - start:.2f} s"
+    )
+    print(f"{'query':>16} {'scan ms':>9} {'index ms':>9}")
+    rows = [
+        (
+            "contains",
+            lambda infix: sorted(word for word in words if infix in word),
+            lambda infix: dictionary.search_contains(infix),
+            infixes,
+        ),
+        (
+            "contains 10",
+            lambda infix: sorted(word for word in words if infix in word)[:10],
+            lambda infix: dictionary.search_contains(infix, limit=10),
+            infixes,
+        ),
+        (
+            "suffix 10",
+            lambda suffix: [word for word in words if word.endswith(suffix)][:10],
+            lambda suffix: dictionary.search_suffix(suffix, limit=10),
+            suffixes,
+        ),
+    ]
+    for name, scan, indexed, queries in rows:
+        print(
+            f"{name:>16} {per_query(scan, queries) * 1e3:>9.2f} "
+            f"{per_query(indexed, queries) * 1e3:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
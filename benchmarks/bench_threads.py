@@ -0,0 +1,72 @@
+"""
+Read throughput of a thread-safe Dictionary as reader threads are added, with
+and without a writer publishing new tries meanwhile.
+
+    python -m benchmarks.bench_threads [vocabulary size]
+"""
+
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import MemoryDb, generate_entries
+from dictionary.dictionary import Dictionary
+
+DURATION = 1.0
+THREADS = [1, 2, 4, 8]
+
+
+def reader(
+    dictionary: Dictionary, words: list[str], seed: int, stop: threading.Event
+) -> int:
+    rng = random.Random(seed)
+    operations = 0
+    while not stop.is_set():
+        word = rng.choice(words)
+        dictionary.read(word, "en")
+        dictionary.search(word[:3], limit=10)
+        dictionary.complete(word[:2], 5)
+        operations += 3
+    return operations
+
+
+def writer(dictionary: Dictionary, stop: threading.Event) -> int:
+    writes = 0
+    while not stop.is_set():
+        dictionary.write(f"new{writes}", {"en": "new word"})
+        writes += 1
+    return writes
+
+
+def run(dictionary: Dictionary, words: list[str], threads: int, with_writer: bool):
+    stop = threading.Event()
+    with ThreadPoolExecutor(threads + 1) as pool:
+        readers = [
+            pool.submit(reader, dictionary, words, seed, stop)
+            for seed in range(threads)
+        ]
+        writes = pool.submit(writer, dictionary, stop) if with_writer else None
+        time.sleep(DURATION)
+        stop.set()
+        operations = sum(future.result() for future in readers)
+    return operations / DURATION, writes.result() / DURATION if writes else 0
+
+
+def main(size: int):
+    entries = generate_entries(size)
+    words = [entry["word"] for entry in entries]
+    print(f"vocabulary: {size:,} words, {DURATION:.0f} s per run")
+    print(f"{'threads':>8} {'reads/s':>10} {'reads/s + writer':>17} {'writes/s':>9}")
+    for threads in THREADS:
+        dictionary = Dictionary(MemoryDb(entries), thread_safe=True)
+        reads, _ = run(dictionary, words, threads, with_writer=False)
+        reads_with_writer, writes = run(dictionary, words, threads, with_writer=True)
+        print(
+            f"{threads:>8} {reads:>10,.0f} {reads_with_writer:>17,.0f} {writes:>9,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,78 @@
+"""
+Memory and lookup cost of the standard trie against the radix trie.
+
+    python -m benchmarks.bench_trie [vocabulary size]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import generate_words
+from dictionary.tie import TrieFactory, TrieType
+
+LOOKUPS = 10_000
+
+
+def build(trie_type: TrieType, words: list[str]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = TrieFactory.create_trie(trie_type)
+    rng = random.Random(2)
+    for word in words:
+        trie.insert(word, rng.randint(0, 1000))
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return trie, elapsed, memory
+
+
+def bench_lookups(trie, prefixes: list[str]) -> float:
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.search_prefix(prefix)
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def bench_starts_with(trie, prefixes: list[str], limit: int = None) -> float:
+    start = time.perf_counter()
+    for prefix in prefixes:
+        list(trie.starts_with(prefix, limit=limit))
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def bench_top_k(trie, prefixes: list[str], k: int = 10) -> float:
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.top_k(prefix, k)
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def main(size: int):
+    words = generate_words(size)
+    rng = random.Random(1)
+    full_words = rng.sample(words, min(LOOKUPS, size))
+    prefixes = [word[: max(4, len(word) - 2)] for word in full_words]
+    print(f"vocabulary: {size:,} words")
+    print(
+        f"{'trie':>10} {'build s':>9} {'memory MB':>10} {'B/word':>8}"
+        f" {'lookup us':>10} {'starts_with us':>15} "
+        f"{'top 10 of a us':>15} {'top_k 10 us':>12}"
+    )
+    for trie_type in TrieType:
+        trie, elapsed, memory = build(trie_type, words)
+        lookup = bench_lookups(trie, full_words)
+        starts_with = bench_starts_with(trie, prefixes)
+        type_ahead = bench_starts_with(trie, ["a"] * 1000, limit=10)
+        top_k = bench_top_k(trie, [prefix[:2] for prefix in prefixes])
+        print(
+            f"{trie_type.value:>10} {elapsed:>9.2f} {memory / 2**20:>10.1f}"
+            f" {memory / size:>8.0f} {lookup * 1e6:>10.2f} {starts_with * 1e6:>15.2f}"
+            f" {type_ahead * 1e6:>15.2f} {top_k * 1e6:>12.2f}"
+        )
+        del trie
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
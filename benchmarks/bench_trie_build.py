@@ -0,0 +1,126 @@
+"""
+Building the trie from (word, weight) pairs in storage order: inserting them one
+by one against `TrieFactory.build_trie`, which sorts and bulk loads them, in this
+process and split among worker processes.
+
+    python -m benchmarks.bench_trie_build [vocabulary size]
+
+With workers, this process still splits the words, sends them and creates every
+node from what comes back, so the build cannot get faster than that part however
+many cores there are: the "parent share" row times it alone. Only compare worker
+counts up to the number of cores.
+"""
+
+import gc
+import os
+import pickle
+import random
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import generate_entries
+from dictionary.tie import (
+    PARTITIONS_PER_WORKER,
+    TrieFactory,
+    TrieType,
+    _describe,
+    _partition,
+)
+
+WORKERS = [2, 4, 8]
+REPEATS = 3
+
+
+def timed(func) -> float:
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            # Kept until the clock is read, so that freeing it is not timed.
+            result = func()
+            best = min(best, time.perf_counter() - start)
+            del result
+    finally:
+        gc.enable()
+    return best
+
+
+def insert_all(trie_type: TrieType, items: list[tuple[str, int]]):
+    trie = TrieFactory.create_trie(trie_type)
+    for word, weight in items:
+        trie.insert(word, weight)
+    return trie
+
+
+def parent_share(
+    trie_type: TrieType, items: list[tuple[str, int]], workers: int
+) -> float:
+    # What build_trie does in this process with that many workers, the workers'
+    # results being computed beforehand.
+    buckets = defaultdict(list)
+    for item in items:
+        buckets[item[0][:1]].append(item)
+    partitions = _partition(buckets, workers * PARTITIONS_PER_WORKER)
+    descriptions = [pickle.dumps(_describe(partition)) for partition in partitions]
+
+    def run():
+        buckets = defaultdict(list)
+        for item in items:
+            buckets[item[0][:1]].append(item)
+        for partition in _partition(buckets, workers * PARTITIONS_PER_WORKER):
+            pickle.dumps(partition)
+        trie = TrieFactory.create_trie(trie_type)
+        for description in descriptions:
+            trie._attach(pickle.loads(description))
+        return trie
+
+    return timed(run)
+
+
+def main(size: int):
+    rng = random.Random(1)
+    items = [
+        (entry["word"], rng.randint(0, 1000))
+        for entry in generate_entries(size, farsi_share=0.2)
+    ]
+    rng.shuffle(items)
+    print(f"words: {size:,}   cores: {os.cpu_count()}")
+    print(f"{'trie':>9} {'build':>14} {'ms':>9} {'us/word':>8} {'speedup':>8}")
+    for trie_type in TrieType:
+        cases = [("insert", lambda: insert_all(trie_type, items))]
+        cases.append(("bulk", lambda: TrieFactory.build_trie(trie_type, items)))
+        for workers in WORKERS:
+            cases.append(
+                (
+                    f"{workers} workers",
+                    lambda workers=workers: TrieFactory.build_trie(
+                        trie_type, items, workers
+                    ),
+                )
+            )
+        baseline = None
+        for name, func in cases:
+            elapsed = timed(func)
+            baseline = baseline or elapsed
+            report(trie_type, name, elapsed, size, baseline)
+        report(
+            trie_type,
+            "parent share",
+            parent_share(trie_type, items, WORKERS[-1]),
+            size,
+            baseline,
+        )
+
+
+def report(trie_type: TrieType, name: str, elapsed: float, size: int, baseline: float):
+    print(
+        f"{trie_type.value:>9} {name:>14} "
+        f"{elapsed * 1e3:>9.1f} {elapsed / size * 1e6:>8.2f}"
+        f" {baseline / elapsed:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
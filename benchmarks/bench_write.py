@@ -0,0 +1,32 @@
+"""
+Write latency of Dictionary.write as the stored vocabulary grows.
+
+    python -m benchmarks.bench_write
+"""
+
+import time
+
+from benchmarks.common import MemoryDb, generate_entries
+from dictionary.dictionary import Dictionary
+
+SIZES = [10_000, 100_000, 1_000_000]
+WRITES = 1_000
+
+
+def bench_write(size: int) -> float:
+    dictionary = Dictionary(MemoryDb(generate_entries(size)))
+    start = time.perf_counter()
+    for i in range(WRITES):
+        dictionary.write(f"newword{i}", {"en": "new", "fa": "تازه", "fe": "nouveau"})
+    return (time.perf_counter() - start) / WRITES
+
+
+def main():
+    print(f"{'vocabulary':>12} {'write latency':>16}")
+    for size in SIZES:
+        latency = bench_write(size)
+        print(f"{size:>12,} {latency * 1e6:>13.1f} us")
+
+
+if __name__ == "__main__":
+    main()
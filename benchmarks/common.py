@@ -0,0 +1,128 @@
+import random
+import time
+
+from db import DbInterface
+
+SYLLABLES = [
+    "ba",
+    "be",
+    "bi",
+    "ka",
+    "ke",
+    "ko",
+    "la",
+    "le",
+    "lo",
+    "ma",
+    "me",
+    "mi",
+    "na",
+    "ne",
+    "no",
+    "pa",
+    "pe",
+    "ra",
+    "re",
+    "ri",
+    "sa",
+    "se",
+    "so",
+    "ta",
+    "te",
+    "to",
+    "va",
+    "ve",
+    "za",
+    "zo",
+    "an",
+    "el",
+    "in",
+    "or",
+    "us",
+    "ash",
+]
+FARSI_LETTERS = "ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+
+
+def generate_words(count: int, seed: int = 0) -> list[str]:
+    """
+    Returns `count` distinct pseudo words, always the same ones for the same seed.
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        length = rng.randint(2, 5)
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(length)))
+    return sorted(words)
+
+
+def generate_farsi_words(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed + 2)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(FARSI_LETTERS) for _ in range(rng.randint(3, 7))))
+    return sorted(words)
+
+
+def generate_entries(count: int, seed: int = 0, farsi_share: float = 0.0) -> list[dict]:
+    """
+    Returns `count` words with fa/en/fe meanings, the same ones for the same seed.
+    farsi_share: Fraction of the words spelled in Farsi rather than Latin letters.
+    """
+    rng = random.Random(seed + 1)
+    farsi_count = int(count * farsi_share)
+    words = generate_words(count - farsi_count, seed)
+    if farsi_count:
+        words = sorted(words + generate_farsi_words(farsi_count, seed))
+    entries = []
+    for word in words:
+        farsi = "".join(rng.choice(FARSI_LETTERS) for _ in range(rng.randint(3, 8)))
+        entries.append(
+            {
+                "word": word,
+                "meanings": {
+                    "fa": farsi,
+                    "en": f"meaning of {word}",
+                    "fe": f"sens de {word}",
+                },
+            }
+        )
+    return entries
+
+
+class MemoryDb(DbInterface):
+    """
+    In-memory backend, so benchmarks measure the dictionary and not the disk.
+    """
+
+    def __init__(self, entries: list[dict] = None):
+        super().__init__("memory")
+        self.storage = {entry["word"]: entry for entry in entries or []}
+
+    def read(self):
+        return self.storage
+
+    def write(self, data: dict):
+        self.storage[data["word"]] = data
+
+    def exists(self, key: str) -> bool:
+        return key in self.storage
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        return self.storage.get(key)
+
+    def update(self, key: str, data: dict):
+        self.storage.setdefault(key, {}).update(data)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        entry = self.storage[key]
+        entry[field] = entry.get(field, 0) + amount
+
+    def get_whole_data(self) -> dict:
+        return self.storage
+
+
+def timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
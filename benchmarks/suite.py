@@ -0,0 +1,351 @@
+"""
+Benchmark suite over a generated multilingual vocabulary: trie build and prefix
+search, the JSON file backend, Dictionary lookups and the Mongo backend (through
+mongomock). Reports the time per operation and the peak memory of every case, and
+saves or compares machine-readable results.
+
+    python -m benchmarks.suite [--size 10k|100k|1m] [--save FILE] [--compare FILE]
+
+Comparing exits with status 1 when a case got slower (or bigger) than the baseline
+by more than --threshold, so the suite can gate changes in CI. Only compare results
+measured with the same --size on the same machine.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.common import MemoryDb, generate_entries
+from db.database import DbFile
+from db.mongo import DbMongo
+from dictionary.dictionary import Dictionary
+from dictionary.tie import TrieFactory, TrieType
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+FARSI_SHARE = 0.2
+REPEATS = 3
+LOOKUPS = 1_000
+# Number of prefix queries per prefix length: short prefixes match far more words.
+PREFIX_QUERIES = {1: 10, 2: 50, 3: 500, 5: 1_000}
+# Every DbFile change rewrites the whole file.
+FILE_CHANGES = 5
+# mongomock scans the collection for every query, so keep these few: they follow
+# the query shapes and round trips of DbMongo rather than a server's speed.
+MONGO_LOOKUPS = 5
+MONGO_BATCH = 200
+
+CASES = {}
+
+
+def case(name: str):
+    """
+    Registers a benchmark. The decorated function prepares one run, untimed, and
+    returns the function to time and the number of operations it performs.
+    """
+
+    def register(setup):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+class Workload:
+    def __init__(self, size: int, directory: Path):
+        self.size = size
+        self.directory = directory
+        self.entries = generate_entries(size, farsi_share=FARSI_SHARE)
+        self.words = [entry["word"] for entry in self.entries]
+        rng = random.Random(1)
+        self.sample = rng.sample(self.words, min(LOOKUPS, size))
+        self.weights = [rng.randint(0, 1000) for _ in self.words]
+        self.json_path = directory / "database.json"
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump({entry["word"]: entry for entry in self.entries}, f, indent=4)
+        self._tries = {}
+        self.mongo = None
+
+    def trie(self, trie_type: TrieType):
+        if trie_type not in self._tries:
+            trie = TrieFactory.create_trie(trie_type)
+            for word, weight in zip(self.words, self.weights):
+                trie.insert(word, weight)
+            self._tries[trie_type] = trie
+        return self._tries[trie_type]
+
+    def fresh_file_db(self) -> DbFile:
+        path = self.directory / "changes.json"
+        path.write_bytes(self.json_path.read_bytes())
+        return DbFile(str(path))
+
+
+for trie_type in TrieType:
+
+    @case(f"trie build {trie_type.value}")
+    def trie_build(work: Workload, trie_type=trie_type):
+        def run():
+            trie = TrieFactory.create_trie(trie_type)
+            for word, weight in zip(work.words, work.weights):
+                trie.insert(word, weight)
+
+        return run, work.size
+
+    @case(f"trie bulk build {trie_type.value}")
+    def trie_bulk_build(work: Workload, trie_type=trie_type):
+        items = list(zip(work.words, work.weights))
+        return lambda: TrieFactory.build_trie(trie_type, items), work.size
+
+    for length, queries in PREFIX_QUERIES.items():
+
+        @case(f"trie starts_with {length} chars {trie_type.value}")
+        def trie_starts_with(
+            work: Workload, trie_type=trie_type, length=length, queries=queries
+        ):
+            trie = work.trie(trie_type)
+            prefixes = [word[:length] for word in work.sample[:queries]]
+
+            def run():
+                for prefix in prefixes:
+                    for _ in trie.starts_with(prefix):
+                        pass
+
+            return run, len(prefixes)
+
+    @case(f"trie top_k {trie_type.value}")
+    def trie_top_k(work: Workload, trie_type=trie_type):
+        trie = work.trie(trie_type)
+        prefixes = [word[:2] for word in work.sample]
+
+        def run():
+            for prefix in prefixes:
+                trie.top_k(prefix, 10)
+
+        return run, len(prefixes)
+
+
+@case("dbfile startup")
+def dbfile_startup(work: Workload):
+    return lambda: DbFile(str(work.json_path)), 1
+
+
+@case("dbfile write")
+def dbfile_write(work: Workload):
+    db = work.fresh_file_db()
+
+    def run():
+        for i in range(FILE_CHANGES):
+            db.write(
+                {
+                    "word": f"new{i}",
+                    "meanings": {"en": "new", "fa": "تازه"},
+                    "weight": 0,
+                }
+            )
+
+    return run, FILE_CHANGES
+
+
+@case("dbfile update")
+def dbfile_update(work: Workload):
+    db = work.fresh_file_db()
+    words = work.sample[:FILE_CHANGES]
+
+    def run():
+        for word in words:
+            db.update(
+                word, {"meanings": {"en": "changed", "fa": "تغییر", "fe": "changé"}}
+            )
+
+    return run, len(words)
+
+
+@case("dictionary startup")
+def dictionary_startup(work: Workload):
+    db = MemoryDb(work.entries)
+    return lambda: Dictionary(db), 1
+
+
+@case("dictionary read")
+def dictionary_read(work: Workload):
+    dictionary = Dictionary(MemoryDb(work.entries))
+
+    def run():
+        for word in work.sample:
+            dictionary.read(word, "en")
+
+    return run, len(work.sample)
+
+
+@case("dictionary read_many")
+def dictionary_read_many(work: Workload):
+    dictionary = Dictionary(MemoryDb(work.entries))
+    return lambda: dictionary.read_many(work.sample, "en"), len(work.sample)
+
+
+def _mongo_db(client, name: str) -> DbMongo:
+    with mock.patch("db.mongo.MongoClient", lambda *args, **kwargs: client):
+        return DbMongo("mongodb://localhost", "benchmark", name)
+
+
+@case("mongo insert_many")
+def mongo_insert_many(work: Workload):
+    import mongomock
+
+    db = _mongo_db(mongomock.MongoClient(), "words")
+    entries = work.entries[:MONGO_BATCH]
+    return lambda: db.insert_many(entries), len(entries)
+
+
+def _filled_mongo_db(work: Workload) -> DbMongo:
+    if work.mongo is None:
+        import mongomock
+
+        client = mongomock.MongoClient()
+        # Loaded before DbMongo creates its unique index, which mongomock checks
+        # by scanning the whole collection on every insert.
+        client["benchmark"]["words"].insert_many(
+            [dict(entry) for entry in work.entries]
+        )
+        work.mongo = _mongo_db(client, "words")
+    return work.mongo
+
+
+@case("mongo get_or_none")
+def mongo_get_or_none(work: Workload):
+    db = _filled_mongo_db(work)
+    words = work.sample[:MONGO_LOOKUPS]
+
+    def run():
+        for word in words:
+            db.get_or_none(word)
+
+    return run, len(words)
+
+
+@case("mongo get_many")
+def mongo_get_many(work: Workload):
+    db = _filled_mongo_db(work)
+    return lambda: db.get_many(work.sample, "en"), len(work.sample)
+
+
+@case("mongo dictionary startup")
+def mongo_dictionary_startup(work: Workload):
+    db = _filled_mongo_db(work)
+    return lambda: Dictionary(db), 1
+
+
+def measure(setup, work: Workload, memory: bool) -> dict:
+    best = float("inf")
+    for _ in range(REPEATS):
+        run, operations = setup(work)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    result = {"seconds_per_op": best / operations, "operations": operations}
+    if memory:
+        # In a separate run: tracing allocations slows everything down.
+        run, _ = setup(work)
+        tracemalloc.start()
+        run()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(size: int, selected: list[str] = None, memory: bool = True) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        work = Workload(size, Path(directory))
+        for name, setup in CASES.items():
+            if selected and not any(pattern in name for pattern in selected):
+                continue
+            try:
+                results[name] = measure(setup, work, memory)
+            except ImportError as e:
+                print(f"skipped {name}: {e}", file=sys.stderr)
+                continue
+            print(format_result(name, results[name]), flush=True)
+    return {
+        "size": size,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    line = f"{name:<36} {result['seconds_per_op'] * 1e6:>14,.2f} us/op"
+    if "peak_bytes" in result:
+        line += f" {result['peak_bytes'] / 2**20:>10,.1f} MB peak"
+    return line
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Prints every case against the baseline and returns the ones that regressed.
+    """
+    if results["size"] != baseline["size"]:
+        print(
+            f"warning: baseline measured {baseline['size']:,} "
+            f"words, not {results['size']:,}"
+        )
+    regressions = []
+    print(f"{'case':<36} {'time':>8} {'memory':>8}")
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<36} {'new':>8}")
+            continue
+        time_ratio = result["seconds_per_op"] / before["seconds_per_op"]
+        line = f"{name:<36} {time_ratio:>7.2f}x"
+        regressed = time_ratio > 1 + threshold
+        if "peak_bytes" in result and before.get("peak_bytes"):
+            memory_ratio = result["peak_bytes"] / before["peak_bytes"]
+            line += f" {memory_ratio:>7.2f}x"
+            regressed = regressed or memory_ratio > 1 + threshold
+        if regressed:
+            line += "  REGRESSION"
+            regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dictionary benchmark suite")
+    parser.add_argument("--size", choices=SIZES, default="10k", help="Vocabulary size")
+    parser.add_argument(
+        "--case", action="append", help="Only run the cases whose name contains this"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the peak memory runs"
+    )
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with results saved by --save")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Tolerated slowdown before flagging a regression",
+    )
+    args = parser.parse_args()
+
+    results = run_suite(SIZES[args.size], args.case, memory=not args.no_memory)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
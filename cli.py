@@ -1,28 +1,198 @@
+import csv
+import json
 import os
+from itertools import islice
 from db.database import DbFactory, DbType
+from db.metrics import Metrics
 from dictionary.dictionary import Dictionary
 from dotenv import load_dotenv
 
+MONGO_CLIENT_SETTINGS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
 
-def create_dictionary_cli() -> Dictionary:
+
+def mongo_client_options() -> dict:
+    """
+    Reads the optional MongoClient pool and timeout settings from the environment.
+    """
+    return {
+        option: int(os.environ[setting])
+        for setting, option in MONGO_CLIENT_SETTINGS.items()
+        if os.getenv(setting)
+    }
+
+
+def create_dictionary_cli(db_type: str = None, **options) -> Dictionary:
+    """
+    Builds the Dictionary from the .env settings, asking for the database type
+    unless given.
+    options: Passed on to Dictionary.
+    """
     load_dotenv()
     file_path = os.getenv("FILE_PATH", "database.json")
+    log_path = os.getenv("LOG_PATH", "database.log")
+    indexed_path = os.getenv("INDEXED_PATH", "database.idx")
+    sqlite_path = os.getenv("SQLITE_PATH", "database.sqlite3")
     mongo_connection = os.getenv("MONGO_CONNECTION", "mongodb://localhost:27017/")
     mongo_db = os.getenv("MONGO_DB", "snap")
     mongo_collection = os.getenv("MONGO_COLLECTION", "words")
+    snapshot_path = os.getenv("SNAPSHOT_PATH") or None
+    index_path = os.getenv("INDEX_PATH") or None
+    metrics = (
+        Metrics() if os.getenv("METRICS", "").lower() in ("1", "true", "yes") else None
+    )
+    cache_ttl = os.getenv("CACHE_TTL")
+    cache = {
+        "cache_size": int(os.getenv("CACHE_SIZE", "0")),
+        "cache_ttl": float(cache_ttl) if cache_ttl else None,
+        "prefix_cache_size": int(os.getenv("PREFIX_CACHE_SIZE", "0")),
+    }
+    if os.getenv("STORAGE_SEARCH", "").lower() in ("1", "true", "yes"):
+        options.setdefault("storage_search", True)
+    refresh_interval = float(os.getenv("REFRESH_INTERVAL") or 0)
+    if refresh_interval > 0:
+        # Refreshed from a background thread.
+        options.setdefault("refresh_interval", refresh_interval)
+        options["thread_safe"] = True
+    build_workers = int(os.getenv("BUILD_WORKERS") or 0)
+    if build_workers > 1:
+        options.setdefault("build_workers", build_workers)
 
-    db_type = input("Enter database type (file/mongo): ").strip().lower()
+    if db_type is None:
+        db_type = (
+            input("Enter database type (file/log/indexed/sqlite/mongo): ")
+            .strip()
+            .lower()
+        )
     if db_type == "file":
-        db = DbFactory.create_db(DbType.FILE, file_path)
+        compact = os.getenv("COMPACT_STORAGE", "").lower() in ("1", "true", "yes")
+        db = DbFactory.create_db(DbType.FILE, file_path, **cache, compact=compact)
+    elif db_type == "log":
+        db = DbFactory.create_db(DbType.LOG, log_path, **cache)
+    elif db_type == "indexed":
+        db = DbFactory.create_db(DbType.INDEXED, indexed_path, **cache)
+    elif db_type == "sqlite":
+        db = DbFactory.create_db(DbType.SQLITE, sqlite_path, **cache)
+        # Prefix searches run in SQLite, so the vocabulary need not fit in memory.
+        options.setdefault("storage_search", True)
     elif db_type == "mongo":
         db = DbFactory.create_db(
-            DbType.MONGO, mongo_connection, mongo_db, mongo_collection
+            DbType.MONGO,
+            mongo_connection,
+            mongo_db,
+            mongo_collection,
+            **cache,
+            **mongo_client_options(),
         )
     else:
         print("Invalid database type")
         return None
 
-    return Dictionary(db=db)
+    return Dictionary(
+        db=db,
+        snapshot_path=snapshot_path,
+        index_path=index_path,
+        metrics=metrics,
+        **options,
+    )
+
+
+def print_stats(stats: dict):
+    trie = stats.get("trie")
+    if trie is None:
+        print("Trie: not built")
+    else:
+        print(f"Trie: {trie['words']} words, {trie['nodes']} nodes")
+    if "cache" in stats:
+        cache = stats["cache"]
+        print(
+            f"Cache: {cache['hits']} hits, {cache['misses']} "
+            f"misses, {cache['size']}/{cache['capacity']} words"
+        )
+    operations = stats.get("operations")
+    if operations is None:
+        print("Latency metrics are off; set METRICS=1 to record them.")
+        return
+    print(
+        f"{'operation':<28} {'count':>8} {'errors':>7} {'per s':>8}"
+        f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for name, summary in operations.items():
+        print(
+            f"{name:<28} {summary['count']:>8} "
+            f"{summary['errors']:>7} {summary['per_second']:>8.1f}"
+            + "".join(
+                f" {summary[key] * 1000:>9.3f}" for key in ("p50", "p95", "p99", "max")
+            )
+        )
+
+
+def export_metrics(dictionary: Dictionary):
+    """
+    Writes the metrics to METRICS_PATH, when both are set.
+    """
+    path = os.getenv("METRICS_PATH")
+    if path and dictionary.metrics is not None:
+        stats = dictionary.stats()
+        extra = {"trie": stats["trie"]} if "trie" in stats else {}
+        dictionary.metrics.export(path, **extra)
+
+
+def read_import_entries(path: str, file_format: str):
+    """
+    Lazily yields word entries from a CSV or JSONL file.
+    CSV files need a header with a "word" column; every other column except
+    "weight" is a language code holding the meaning in that language.
+    JSONL files hold one {"word", "meanings"[, "weight"]} object per line.
+    Rows without a word are skipped.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if file_format == "csv":
+            for row in csv.DictReader(f):
+                word = (row.pop("word", None) or "").strip()
+                weight = (row.pop("weight", None) or "").strip()
+                meanings = {
+                    lang.strip(): meaning.strip()
+                    for lang, meaning in row.items()
+                    if lang and meaning and meaning.strip()
+                }
+                if not word:
+                    continue
+                entry = {"word": word, "meanings": meanings}
+                if weight:
+                    entry["weight"] = int(weight)
+                yield entry
+        else:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry.get("word"):
+                        yield entry
+
+
+def import_cli(
+    dictionary: Dictionary, path: str, file_format: str = None, chunk_size: int = 1000
+) -> int:
+    """
+    Imports a CSV or JSONL file chunk by chunk, so the file never has to fit in memory.
+    """
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    entries = read_import_entries(path, file_format)
+    total = created = 0
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            break
+        total += len(chunk)
+        created += len(dictionary.write_many(chunk))
+    print(f"Imported {created} new words out of {total} entries from '{path}'.")
+    return created
 
 
 def actions_cli(dictionary: Dictionary):
@@ -34,11 +204,17 @@ def actions_cli(dictionary: Dictionary):
     print("  add    - Define a new word")
     print("  update         - Update an existing word")
     print("  search  - Search words by prefix")
+    print("  reverse        - Find words by a term of their meaning")
+    print("  stats          - Show the trie size and operation latencies")
     print("  exit           - Quit the application")
 
     while True:
         operation = input("\nEnter operation: ").strip().lower()
         if operation == "exit":
+            dictionary.close()
+            dictionary.save_snapshot()
+            dictionary.save_index()
+            export_metrics(dictionary)
             print("Exiting the dictionary CLI.")
             break
 
@@ -50,6 +226,13 @@ def actions_cli(dictionary: Dictionary):
                 print(f"Meaning for '{word}' in '{lang}': {result}")
             except Exception as e:
                 print(e)
+                suggestions = [
+                    match
+                    for match in dictionary.suggest(word, limit=6)
+                    if match != word
+                ]
+                if suggestions:
+                    print(f"Did you mean: {', '.join(suggestions[:5])}?")
 
         elif operation == "add":
             word = input("Enter the word: ").strip()
@@ -119,6 +302,18 @@ def actions_cli(dictionary: Dictionary):
             except Exception as e:
                 print(e)
 
+        elif operation == "reverse":
+            term = input("Enter the term: ").strip()
+            lang = input("Enter language code: ").strip()
+            words = dictionary.reverse_search(term, lang)
+            if words:
+                print(f"Words meaning '{term}' in '{lang}':", words)
+            else:
+                print("No words found with that meaning.")
+
+        elif operation == "stats":
+            print_stats(dictionary.stats())
+
         else:
             print(
                 "Invalid operation. Please choose from get, define_word, update, prefix_search, or exit."
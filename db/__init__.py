@@ -1,5 +1,6 @@
 from enum import Enum
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 
 
 class DbInterface(ABC):
@@ -19,14 +20,151 @@ class DbInterface(ABC):
         pass
 
     @abstractmethod
-    def get_or_none(self, key: str):
-        pass
+    def get_or_none(self, key: str, lang: str = None):
+        """
+        Returns the stored entry of `key`, None if there is none. With `lang`,
+        backends may leave out the meanings in other languages.
+        """
 
     @abstractmethod
     def update(self, key: str, data: dict):
         pass
 
+    @abstractmethod
+    def increment(self, key: str, field: str, amount: int = 1):
+        pass
+
+    def version(self):
+        """
+        Returns a token that changes whenever a word may have been added or its
+        meanings changed (but not on weight increments), so indexes built from the
+        stored words can tell whether they are stale. None means the backend cannot
+        tell.
+        """
+        return None
+
+    def revision(self):
+        """
+        Returns the revision of the latest stored change: every word added or
+        rewritten (but not a weight increment) gets a higher one than the words
+        changed before it. None means the backend keeps no revisions.
+        """
+        return None
+
+    def changes_since(self, revision: int):
+        """
+        Returns (latest revision, entries) with the entries added or rewritten
+        after `revision`, by this process or any other sharing the storage, so that
+        indexes built from the stored words can catch up without re-reading them
+        all. Pass the returned revision to the next call. None means the backend
+        cannot tell, at all or from that far back.
+        """
+        return None
+
+    def iter_words(self):
+        """
+        Yields (word, weight) for every stored word. Backends override it to
+        read only those two fields and to stream instead of loading everything.
+        """
+        data = self.get_whole_data()
+        docs = data.values() if isinstance(data, Mapping) else data
+        for doc in docs:
+            word = doc.get("word")
+            if word:
+                yield word, doc.get("weight", 0)
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        """
+        Fetches several words at once and returns the found ones keyed by word.
+        With `lang`, backends may leave out the meanings in other languages.
+        """
+        found = {}
+        for key in keys:
+            data = self.get_or_none(key)
+            if data is not None:
+                found[key] = data
+        return found
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        for key in keys:
+            self.increment(key, field, amount)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        """
+        Adds to the `field` of every stored key in `amounts` its own amount.
+        Backends override it to apply them all in a single write.
+        """
+        for key, amount in amounts.items():
+            self.increment(key, field, amount)
+
+    def insert_if_absent(self, data: dict) -> bool:
+        """
+        Stores `data` unless its word is already stored. Returns whether it was stored.
+        Backends override it to make the check and the insert one atomic step.
+        """
+        if self.exists(data["word"]):
+            return False
+        self.write(data)
+        return True
+
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        """
+        Returns the subset of `keys` that is already stored.
+        Backends override it to answer with a single query.
+        """
+        return {key for key in keys if self.exists(key)}
+
+    def insert_many(self, data: list[dict]):
+        """
+        Stores the entries whose word is not stored yet; existing words are left
+        untouched. Backends override it to use a single round trip or flush.
+        """
+        for entry in data:
+            if not self.exists(entry["word"]):
+                self.write(entry)
+
+
+class AsyncDbInterface(ABC):
+    """
+    Asynchronous counterpart of DbInterface, for callers running on an event loop.
+    """
+
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+
+    async def prepare(self):
+        """
+        One-time asynchronous setup, awaited before the first call.
+        """
+
+    @abstractmethod
+    async def get_or_none(self, key: str):
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        pass
+
+    @abstractmethod
+    async def insert_if_absent(self, data: dict) -> bool:
+        pass
+
+    @abstractmethod
+    async def update(self, key: str, data: dict):
+        pass
+
+    @abstractmethod
+    async def increment(self, key: str, field: str, amount: int = 1):
+        pass
+
+    @abstractmethod
+    async def get_whole_data(self):
+        pass
+
 
 class DbType(Enum):
     FILE = "file"
+    LOG = "log"
+    INDEXED = "indexed"
+    SQLITE = "sqlite"
     MONGO = "mongo"
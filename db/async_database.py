@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import Executor
+
+from pymongo import AsyncMongoClient
+from pymongo.errors import DuplicateKeyError
+
+from . import AsyncDbInterface, DbInterface
+from .database import DbFile, DbLogFile
+from .mongo import PROJECTION, STAMP, _absent, _projection
+
+
+class AsyncExecutorDb(AsyncDbInterface):
+    """
+    Runs a synchronous backend in an executor so its I/O never blocks the event loop.
+    Reads run concurrently; writes are serialized, since the file backends
+    rewrite or append to a single file.
+    """
+
+    def __init__(self, db: DbInterface, executor: Executor = None):
+        super().__init__(db.connection_string)
+        self.db = db
+        self.executor = executor
+        self._write_lock = asyncio.Lock()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, func, *args
+        )
+
+    async def _write(self, func, *args):
+        async with self._write_lock:
+            return await self._run(func, *args)
+
+    async def get_or_none(self, key: str):
+        return await self._run(self.db.get_or_none, key)
+
+    async def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        return await self._run(self.db.get_many, keys, lang)
+
+    async def insert_if_absent(self, data: dict) -> bool:
+        return await self._write(self.db.insert_if_absent, data)
+
+    async def update(self, key: str, data: dict):
+        await self._write(self.db.update, key, data)
+
+    async def increment(self, key: str, field: str, amount: int = 1):
+        await self._write(self.db.increment, key, field, amount)
+
+    async def get_whole_data(self):
+        return await self._run(self.db.get_whole_data)
+
+
+class AsyncDbFile(AsyncExecutorDb):
+    def __init__(self, connection_string: str, executor: Executor = None, **options):
+        super().__init__(DbFile(connection_string, **options), executor)
+
+
+class AsyncDbLogFile(AsyncExecutorDb):
+    def __init__(self, connection_string: str, executor: Executor = None, **options):
+        super().__init__(DbLogFile(connection_string, **options), executor)
+
+
+class AsyncDbMongo(AsyncDbInterface):
+    """
+    MongoDB through pymongo's asyncio client, stamping revisions like `DbMongo`
+    so that synchronous processes sharing the collection see its writes.
+    client: An already built client, e.g. an in-process stand-in for tests.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        db_name: str,
+        collection_name: str,
+        client=None,
+        **client_options,
+    ):
+        super().__init__(connection_string)
+        if client is None:
+            client = AsyncMongoClient(connection_string, **client_options)
+        self.client = client
+        self.db = self.client[db_name]
+        self.collection = self.db[collection_name]
+
+    async def prepare(self):
+        await self.collection.create_index("word", unique=True)
+        await self.collection.create_index("revision")
+
+    async def get_or_none(self, key: str):
+        return await self.collection.find_one({"word": key}, PROJECTION)
+
+    async def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        cursor = self.collection.find({"word": {"$in": list(keys)}}, _projection(lang))
+        return {doc["word"]: doc for doc in await cursor.to_list(None)}
+
+    async def insert_if_absent(self, data: dict) -> bool:
+        try:
+            await self.collection.update_one(
+                _absent(data["word"]), {"$setOnInsert": data, **STAMP}, upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def update(self, key: str, data: dict):
+        await self.collection.update_one(
+            {"word": key}, {"$set": data, **STAMP}, upsert=True
+        )
+
+    async def increment(self, key: str, field: str, amount: int = 1):
+        await self.collection.update_one({"word": key}, {"$inc": {field: amount}})
+
+    async def get_whole_data(self):
+        return await self.collection.find({}, PROJECTION).to_list(None)
@@ -0,0 +1,275 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from . import DbInterface
+
+_MISSING = object()
+
+
+class CachedDb(DbInterface):
+    """
+    Read-through LRU cache in front of any DbInterface backend.
+
+    capacity: Maximum number of cached keys; the least recently used goes first.
+    ttl: Seconds after which a cached entry is fetched again, None to never expire.
+    cache_misses: Also remember keys that were not found (negative caching).
+    prefix_capacity: Number of `keys_with_prefix` results to keep, for backends
+    answering prefix searches themselves; 0 to always ask the backend. The
+    wrapper only has `keys_with_prefix` when the backend does.
+
+    Every write goes straight to the backend and drops the affected keys from the
+    cache, and a new word the prefix results it belongs to. What was fetched
+    while a write was under way is not kept, as it may predate the write.
+    Methods the wrapper does not define are forwarded to the backend.
+    """
+
+    def __init__(
+        self,
+        db: DbInterface,
+        capacity: int = 10_000,
+        ttl: float = None,
+        cache_misses: bool = True,
+        prefix_capacity: int = 0,
+    ):
+        super().__init__(db.connection_string)
+        self.db = db
+        self.capacity = capacity
+        self.ttl = ttl
+        self.cache_misses = cache_misses
+        self._entries = OrderedDict()
+        # Bumped by every write, so that an entry fetched meanwhile is not kept.
+        self._generation = 0
+        self.prefix_capacity = prefix_capacity
+        self._prefixes = OrderedDict()
+        # Bumped by every new word, so that a result fetched meanwhile is not kept.
+        self._prefix_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+        if hasattr(db, "keys_with_prefix"):
+            self.keys_with_prefix = self._keys_with_prefix
+        elif prefix_capacity > 0:
+            raise ValueError("prefix_capacity needs a backend with keys_with_prefix.")
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def _cached(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(self, key: str, value, generation: int):
+        # `generation` is the one read before fetching `value`.
+        if self.capacity <= 0:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def _invalidate_prefixes(self, *words: str):
+        if not self.prefix_capacity:
+            return
+        with self._lock:
+            self._prefix_generation += 1
+            stale = [
+                key
+                for key in self._prefixes
+                if any(word.startswith(key[0]) for word in words)
+            ]
+            for key in stale:
+                del self._prefixes[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._prefixes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "prefix_hits": self.prefix_hits,
+            "prefix_misses": self.prefix_misses,
+        }
+
+    def read(self):
+        return self.db.read()
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        # Whole entries are fetched whatever `lang`, so that they can be cached.
+        value = self._cached(key)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = self.db.get_or_none(key)
+        if value is not None or self.cache_misses:
+            self._store(key, value, generation)
+        return value
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        found, unknown = {}, []
+        for key in keys:
+            value = self._cached(key)
+            if value is _MISSING:
+                unknown.append(key)
+            elif value is not None:
+                found[key] = value
+        if unknown:
+            generation = self._generation
+            fetched = self.db.get_many(unknown, lang)
+            for key in unknown:
+                value = fetched.get(key)
+                if value is not None:
+                    found[key] = value
+                    # A single-language projection is not the whole entry.
+                    if lang is None:
+                        self._store(key, value, generation)
+                elif self.cache_misses:
+                    self._store(key, None, generation)
+        return found
+
+    def exists(self, key: str) -> bool:
+        return self.get_or_none(key) is not None
+
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        existing, unknown = set(), []
+        for key in keys:
+            value = self._cached(key)
+            if value is _MISSING:
+                unknown.append(key)
+            elif value is not None:
+                existing.add(key)
+        if unknown:
+            existing.update(self.db.existing_keys(unknown))
+        return existing
+
+    def _keys_with_prefix(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        if not self.prefix_capacity:
+            return list(self.db.keys_with_prefix(prefix, limit, offset, after))
+        key = (prefix, limit, offset, after)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._prefixes.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                self._prefixes.move_to_end(key)
+                self.prefix_hits += 1
+                return list(entry[0])
+            self.prefix_misses += 1
+            generation = self._prefix_generation
+        words = list(self.db.keys_with_prefix(prefix, limit, offset, after))
+        expires_at = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            if generation != self._prefix_generation:
+                return words
+            self._prefixes[key] = (words, expires_at)
+            self._prefixes.move_to_end(key)
+            while len(self._prefixes) > self.prefix_capacity:
+                self._prefixes.popitem(last=False)
+        return list(words)
+
+    def write(self, data: dict):
+        self.db.write(data)
+        self.invalidate(data["word"])
+        self._invalidate_prefixes(data["word"])
+
+    def insert_if_absent(self, data: dict) -> bool:
+        inserted = self.db.insert_if_absent(data)
+        self.invalidate(data["word"])
+        if inserted:
+            self._invalidate_prefixes(data["word"])
+        return inserted
+
+    def insert_many(self, data: list[dict]):
+        self.db.insert_many(data)
+        words = [entry["word"] for entry in data]
+        self.invalidate(*words)
+        self._invalidate_prefixes(*words)
+
+    def update(self, key: str, data: dict):
+        self.db.update(key, data)
+        self.invalidate(key)
+
+    def _patch_counter(self, key: str, field: str, amount: int):
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None:
+                value, expires_at = entry
+                value = {**value, field: value.get(field, 0) + amount}
+                self._entries[key] = (value, expires_at)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        # Lookup counting increments on every read, so the cached entry is
+        # patched in place instead of being dropped.
+        self.db.increment(key, field, amount)
+        self._patch_counter(key, field, amount)
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        self.db.increment_many(keys, field, amount)
+        for key in keys:
+            self._patch_counter(key, field, amount)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        self.db.increment_amounts(amounts, field)
+        for key, amount in amounts.items():
+            self._patch_counter(key, field, amount)
+
+    def get_whole_data(self):
+        return self.db.get_whole_data()
+
+    def version(self):
+        return self.db.version()
+
+    def revision(self):
+        return self.db.revision()
+
+    def changes_since(self, revision: int):
+        """
+        Also drops the changed words, which another process may have changed,
+        from the cache; everything when the backend cannot tell what changed.
+        """
+        changes = self.db.changes_since(revision)
+        if changes is None:
+            self.clear()
+            return None
+        words = [entry["word"] for entry in changes[1]]
+        self.invalidate(*words)
+        self._invalidate_prefixes(*words)
+        return changes
+
+    def iter_words(self):
+        return self.db.iter_words()
@@ -0,0 +1,196 @@
+from array import array
+from collections.abc import MutableMapping
+
+# The meanings of a row are found in the buffer through one 64-bit number, their
+# offset shifted left by LENGTH_BITS plus their length in bytes, written at once so
+# that readers never see half of it. The buffer can grow to 2**40 bytes.
+LENGTH_BITS = 24
+LENGTH_MASK = (1 << LENGTH_BITS) - 1
+# Between the meanings of a row, in the order of the row's languages.
+SEPARATOR = "\0"
+HAS_MEANINGS = 1
+HAS_WEIGHT = 2
+# Layout of the rows whose entry the columns cannot hold, kept whole in `others`.
+WHOLE = 0
+MAX_LAYOUTS = 1 << 16
+FIELDS = {"word", "meanings", "weight"}
+# Rows are rewritten without the replaced ones once there are as many of those
+# as live ones, and at least this many.
+MIN_GARBAGE_ROWS = 1024
+
+
+class _Rows:
+    """
+    The columns of a CompactStorage, one row per stored entry: its layout (which
+    fields and languages it has, as an index into `layouts`), its weight and where
+    its meanings are in `texts`. Rows are only ever appended: a replaced entry gets
+    a new row and `ids` then points to it, so a reader holding a row id always
+    reads the entry that was stored there.
+    """
+
+    __slots__ = (
+        "ids",
+        "kinds",
+        "weights",
+        "offsets",
+        "texts",
+        "layouts",
+        "layout_ids",
+        "others",
+    )
+
+    def __init__(self):
+        self.ids = {}
+        self.kinds = array("H")
+        self.weights = array("q")
+        self.offsets = array("Q")
+        self.texts = bytearray()
+        # (fields, languages) by layout id, the first one for whole entries.
+        self.layouts = [None]
+        self.layout_ids = {}
+        self.others = {}
+
+    def entry(self, word: str, row: int) -> dict:
+        layout = self.layouts[self.kinds[row]]
+        if layout is None:
+            return self.others[row]
+        fields, languages = layout
+        entry = {"word": word}
+        if fields & HAS_MEANINGS:
+            if languages:
+                packed = self.offsets[row]
+                start = packed >> LENGTH_BITS
+                texts = self.texts[start : start + (packed & LENGTH_MASK)].decode(
+                    "utf-8"
+                )
+                entry["meanings"] = dict(zip(languages, texts.split(SEPARATOR)))
+            else:
+                entry["meanings"] = {}
+        if fields & HAS_WEIGHT:
+            entry["weight"] = self.weights[row]
+        return entry
+
+    def append(self, word: str, entry: dict):
+        row = len(self.kinds)
+        layout, texts = self._layout(word, entry)
+        if layout == WHOLE:
+            self.others[row] = entry
+            weight = 0
+        else:
+            weight = entry.get("weight", 0)
+        self.offsets.append(len(self.texts) << LENGTH_BITS | len(texts))
+        self.texts += texts
+        self.weights.append(weight)
+        self.kinds.append(layout)
+        self.ids[word] = row
+
+    def _layout(self, word: str, entry: dict) -> tuple[int, bytes]:
+        # Returns the layout id of an entry and its encoded meanings, WHOLE when
+        # the columns cannot hold it.
+        if entry.get("word") != word or not entry.keys() <= FIELDS:
+            return WHOLE, b""
+        weight = entry.get("weight", 0)
+        if type(weight) is not int or not -(1 << 63) <= weight < 1 << 63:
+            return WHOLE, b""
+        meanings = entry.get("meanings", {})
+        if type(meanings) is not dict or not all(
+            type(text) is str for text in meanings.values()
+        ):
+            return WHOLE, b""
+        joined = SEPARATOR.join(meanings.values())
+        texts = joined.encode("utf-8")
+        if len(texts) > LENGTH_MASK or joined.count(SEPARATOR) != max(
+            len(meanings) - 1, 0
+        ):
+            return WHOLE, b""
+        fields = HAS_MEANINGS if "meanings" in entry else 0
+        if "weight" in entry:
+            fields |= HAS_WEIGHT
+        layout = (fields, tuple(meanings))
+        layout_id = self.layout_ids.get(layout)
+        if layout_id is None:
+            if len(self.layouts) == MAX_LAYOUTS:
+                return WHOLE, b""
+            layout_id = self.layout_ids[layout] = len(self.layouts)
+            self.layouts.append(layout)
+        return layout_id, texts
+
+
+class CompactStorage(MutableMapping):
+    """
+    A dict of DbFile entries ({word: {"word", "meanings", "weight"}}) stored in
+    columns instead of a dict of dicts per word: a row id per word, the weights in
+    an array and all the meanings, UTF-8 encoded, in one buffer with an array of
+    offsets. Which fields and languages a row has is shared by all the rows with
+    the same ones. An entry is only built, as a new dict, when it is read. Entries
+    with other fields or types are kept whole.
+
+    Changing an entry stores a new one rather than changing it in place, as with
+    DbFile's dict. One thread may write while any number read.
+    """
+
+    def __init__(self, entries: dict = None):
+        self._rows = _Rows()
+        self._garbage = 0
+        if entries:
+            for word, entry in entries.items():
+                self[word] = entry
+
+    def __getitem__(self, word: str) -> dict:
+        rows = self._rows
+        return rows.entry(word, rows.ids[word])
+
+    def get(self, word: str, default=None):
+        rows = self._rows
+        row = rows.ids.get(word)
+        return default if row is None else rows.entry(word, row)
+
+    def __contains__(self, word) -> bool:
+        return word in self._rows.ids
+
+    def __setitem__(self, word: str, entry: dict):
+        rows = self._rows
+        if word in rows.ids:
+            self._garbage += 1
+        rows.append(word, entry)
+        self._maybe_rewrite()
+
+    def __delitem__(self, word: str):
+        del self._rows.ids[word]
+        self._garbage += 1
+        self._maybe_rewrite()
+
+    def __iter__(self):
+        return iter(self._rows.ids)
+
+    def __len__(self) -> int:
+        return len(self._rows.ids)
+
+    def __repr__(self) -> str:
+        return f"CompactStorage({len(self)} entries)"
+
+    def _maybe_rewrite(self):
+        # Builds the columns again from the live entries only, then swaps them in:
+        # readers keep reading the old ones meanwhile.
+        if self._garbage < max(len(self._rows.ids), MIN_GARBAGE_ROWS):
+            return
+        old = self._rows
+        rows = _Rows()
+        for word, row in old.ids.items():
+            rows.append(word, old.entry(word, row))
+        self._rows = rows
+        self._garbage = 0
+
+    def word_weights(self):
+        """
+        Yields (word, weight) for every entry with a word, reading only the weights.
+        """
+        rows = self._rows
+        kinds, weights, others = rows.kinds, rows.weights, rows.others
+        for word, row in rows.ids.items():
+            if kinds[row] == WHOLE:
+                entry = others[row]
+                if entry.get("word"):
+                    yield entry["word"], entry.get("weight", 0)
+            elif word:
+                yield word, weights[row]
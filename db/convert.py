@@ -0,0 +1,27 @@
+"""
+Converts a JSON database written by DbFile into the DbIndexedFile format, or
+into the DbLogFile format with `--log`.
+
+    python -m db.convert database.json database.idx
+    python -m db.convert --log database.json database.log
+"""
+
+import sys
+
+from db.database import convert_json_to_indexed, convert_json_to_log
+
+
+def main(argv: list[str]):
+    convert = convert_json_to_indexed
+    if argv[:1] == ["--log"]:
+        convert, argv = convert_json_to_log, argv[1:]
+    if len(argv) != 2:
+        print("usage: python -m db.convert [--log] <database.json> <target file>")
+        return 1
+    count = convert(argv[0], argv[1])
+    print(f"Converted {count} words into '{argv[1]}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,87 @@
+import heapq
 import json
-from pymongo import MongoClient
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
 from . import DbInterface, DbType
+from .cache import CachedDb
+from .compact import CompactStorage
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: DbFile then has no lock between processes.
+    fcntl = None
 
 
 class DbFile(DbInterface):
-    def __init__(self, connection_string: str):
+    """
+    The whole database in one JSON file, loaded on open and rewritten, atomically,
+    on every change.
+
+    Several processes may share the file. Each change is also appended to a log
+    (`<path>.changes`) under a lock (`<path>.lock`), and a process replays what the
+    others appended before changing anything, so none of their changes is lost.
+    Lookups do not read the log: a process sees the others' changes from its next
+    change or `changes_since` on. The log is emptied once it reaches
+    `CHANGES_LOG_LIMIT` bytes, as everything in it is in the file too; a process
+    that missed a whole log reloads the file instead. Sharing needs POSIX file
+    locks; elsewhere the log is kept but only one process may write.
+    `changes_since` knows the latest `CHANGES_KEPT` changes or so; callers further
+    behind get None and rebuild.
+
+    compact: Hold the entries in a CompactStorage, in columns, rather than in a
+    dict of dicts: a fraction of the memory, for an entry built on every read.
+    """
+
+    CHANGES_LOG_LIMIT = 1 << 20
+    CHANGES_KEPT = 100_000
+
+    def __init__(self, connection_string: str, compact: bool = False):
         super().__init__(connection_string)
-        self.storage = self.read()
+        self.compact = compact
+        # Writers take turns; readers never wait.
+        self._lock = threading.Lock()
+        self.version_path = connection_string + ".version"
+        self.changes_path = connection_string + ".changes"
+        self.lock_path = connection_string + ".lock"
+        with self._file_lock(exclusive=False):
+            self.storage = self._read_storage()
+            self._version = self._read_version()
+            # Opened, and created if need be, now: a log emptied later is still
+            # read to its end through this handle.
+            self._changes_log = open(self.changes_path, "a+b")
+            self._changes_log.seek(0, os.SEEK_END)
+        # (revision, word) of every change made or replayed after `_changes_from`.
+        self._changes = []
+        self._changes_from = self._version
+
+    def _read_version(self) -> int:
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_version(self):
+        self._version += 1
+        with open(self.version_path, "w", encoding="utf-8") as f:
+            f.write(str(self._version))
+
+    def version(self) -> int:
+        return self._version
+
+    def revision(self) -> int:
+        return self._version
 
     def read(self) -> dict:
         try:
@@ -15,53 +90,1085 @@ class DbFile(DbInterface):
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
 
+    def _read_storage(self):
+        storage = self.read()
+        if not self.compact:
+            return storage
+        compact = CompactStorage()
+        # Emptied along the way, so that both are never whole in memory at once.
+        for word in list(storage):
+            compact[word] = storage.pop(word)
+        return compact
+
+    def _save(self):
+        # Renamed into place, so other processes never read a half-written file.
+        temp_path = self.connection_string + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            if isinstance(self.storage, dict):
+                json.dump(self.storage, f, indent=4)
+            else:
+                _dump_entries(self.storage, f)
+        os.replace(temp_path, self.connection_string)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = True):
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    @contextmanager
+    def _changing(self):
+        """
+        Holds the locks of a change and brings the storage up to date first.
+        """
+        with self._lock, self._file_lock():
+            self._replay_changes()
+            self._trim_changes()
+            yield
+
+    def _replay_changes(self):
+        # Called with the locks held.
+        while True:
+            for line in self._changes_log:
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn by a crash mid-append.
+                    continue
+                if "data" in change or "amounts" in change:
+                    self._apply_change(change)
+                elif change["revision"] > self._version:
+                    # The first line of an emptied log: this one was emptied again
+                    # before this process read it.
+                    self._reload()
+                    return
+            try:
+                current = os.stat(self.changes_path).st_ino
+            except FileNotFoundError:
+                return
+            if current == os.fstat(self._changes_log.fileno()).st_ino:
+                return
+            self._changes_log.close()
+            self._changes_log = open(self.changes_path, "a+b")
+            self._changes_log.seek(0)
+
+    def _reload(self):
+        self.storage = self._read_storage()
+        self._version = self._read_version()
+        self._changes_log.seek(0, os.SEEK_END)
+        self._changes = []
+        self._changes_from = self._version
+
+    def _trim_changes(self):
+        # Called with the lock held. Drops the older half of the changes once more
+        # than CHANGES_KEPT are known, so that they do not grow with every change.
+        if len(self._changes) <= self.CHANGES_KEPT:
+            return
+        dropped = len(self._changes) // 2
+        self._changes_from = self._changes[dropped - 1][0]
+        del self._changes[:dropped]
+
+    def _apply_change(self, change: dict):
+        if "data" in change:
+            entry = change["data"]
+            self.storage[entry["word"]] = entry
+            self._changes.append((change["revision"], entry["word"]))
+            self._version = max(self._version, change["revision"])
+            return
+        field = change["field"]
+        for key, amount in change["amounts"].items():
+            entry = self.storage.get(key)
+            if entry is not None:
+                self.storage[key] = {**entry, field: entry.get(field, 0) + amount}
+
+    def _log_changes(self, *changes: dict):
+        # Called with the locks held, right after `_replay_changes`: the handle is
+        # at the end of the log, and stays past these lines once they are written.
+        lines = [json.dumps(change, ensure_ascii=False) + "\n" for change in changes]
+        self._changes_log.write("".join(lines).encode("utf-8"))
+        self._changes_log.flush()
+
+    def _maybe_empty_log(self):
+        # Called with the locks held, once the change is saved. The new log starts
+        # with the revision it follows, for processes still reading the old one.
+        if fcntl is None or self._changes_log.tell() < self.CHANGES_LOG_LIMIT:
+            return
+        temp_path = self.changes_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(json.dumps({"revision": self._version}).encode("utf-8") + b"\n")
+        os.replace(temp_path, self.changes_path)
+        self._changes_log.close()
+        self._changes_log = open(self.changes_path, "a+b")
+        self._changes_log.seek(0, os.SEEK_END)
+
+    def _store(self, entries: list[dict]):
+        """
+        Stores `entries` under the next revision. Called inside `_changing`.
+        """
+        revision = self._version + 1
+        self._log_changes(*({"revision": revision, "data": entry} for entry in entries))
+        for entry in entries:
+            self.storage[entry["word"]] = entry
+            self._changes.append((revision, entry["word"]))
+        self._save()
+        self._bump_version()
+        self._maybe_empty_log()
+
+    def changes_since(self, revision: int):
+        """
+        Replays the changes of other processes, then returns the entries changed
+        after `revision`, known from the revision the file was opened (or reloaded)
+        at on.
+        """
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._replay_changes()
+            self._trim_changes()
+            if revision < self._changes_from:
+                return None
+            start = bisect_right(self._changes, revision, key=itemgetter(0))
+            words = dict.fromkeys(word for _, word in self._changes[start:])
+            storage = self.storage
+            return self._version, [storage[word] for word in words]
+
+    def close(self):
+        self._changes_log.close()
+
     def write(self, data: dict):
-        self.storage.update({data["word"]: data})
-        with open(self.connection_string, "w", encoding="utf-8") as f:
-            json.dump(self.storage, f, indent=4)
+        with self._changing():
+            self._store([data])
+
+    def insert_many(self, data: list[dict]):
+        with self._changing():
+            new_entries = {}
+            for entry in data:
+                if entry["word"] not in self.storage:
+                    new_entries.setdefault(entry["word"], entry)
+            self._store(list(new_entries.values()))
 
     def exists(self, key: str) -> bool:
         return key in self.storage
 
-    def get_or_none(self, key: str) -> dict:
+    def get_or_none(self, key: str, lang: str = None) -> dict:
         return self.storage.get(key)
 
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        storage = self.storage
+        return {key: storage[key] for key in keys if key in storage}
+
+    # Entries are replaced rather than changed in place, so an entry handed out
+    # to a reader never changes under it.
+
     def update(self, key: str, data: dict):
+        with self._changing():
+            self._store([{**self.storage.get(key, {"word": key}), **data}])
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        self.increment_many([key], field, amount)
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        self.increment_amounts(dict.fromkeys(keys, amount), field)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        with self._changing():
+            storage = self.storage
+            amounts = {key: amount for key, amount in amounts.items() if key in storage}
+            if not amounts:
+                return
+            change = {"amounts": amounts, "field": field}
+            self._log_changes(change)
+            self._apply_change(change)
+            self._save()
+            self._maybe_empty_log()
+
+    def iter_words(self):
+        if isinstance(self.storage, CompactStorage):
+            # Reads the weights without building the entries.
+            return self.storage.word_weights()
+        return super().iter_words()
+
+    def get_whole_data(self) -> dict:
+        return self.storage
+
+
+def _dump_entries(storage, f):
+    # Writes what json.dump(dict(storage), f, indent=4) would, one entry at a time.
+    separator = "{\n    "
+    for word, entry in storage.items():
+        document = json.dumps(entry, indent=4).replace("\n", "\n    ")
+        f.write(f"{separator}{json.dumps(word)}: {document}")
+        separator = ",\n    "
+    f.write("{}" if separator == "{\n    " else "\n}")
+
+
+class DbLogFile(DbInterface):
+    """
+    Log-structured file storage. Every mutation is appended to the file as one
+    JSON line and the log is replayed on open, so a write costs one append
+    instead of rewriting the whole database.
+
+    compaction_ratio: Rewrite the log once it holds this many records per live word.
+    compaction_min_records: Never compact logs shorter than this.
+    background_compaction: Compact in a background thread instead of inside the write.
+    fsync_interval: None leaves flushing to the OS, 0 fsyncs every write and a
+    positive number fsyncs at most once per that many seconds (group commit).
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        compaction_ratio: float = 2.0,
+        compaction_min_records: int = 1000,
+        background_compaction: bool = False,
+        fsync_interval: float = None,
+    ):
+        super().__init__(connection_string)
+        self.compaction_ratio = compaction_ratio
+        self.compaction_min_records = compaction_min_records
+        self.background_compaction = background_compaction
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._compaction_buffer = None
+        self._compaction_thread = None
+        self._last_sync = time.monotonic()
+        self.log_records = 0
+        self._version = 0
+        self.storage = self.read()
+        self._log = open(self.connection_string, "a", encoding="utf-8")
+
+    def read(self) -> dict:
+        storage = {}
+        self.log_records = 0
+        self._version = 0
+        try:
+            with open(self.connection_string, "rb") as f:
+                first_line = f.readline()
+                if first_line.strip() and not self._is_record(first_line):
+                    raise ValueError(
+                        f"'{self.connection_string}' is not a log database file."
+                    )
+                f.seek(0)
+                # End of the last whole record, and whether its line is ended.
+                end, ended = 0, True
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn record from a crash mid-append, nothing follows it.
+                        break
+                    self._apply(storage, record)
+                    self._count(record)
+                    self.log_records += 1
+                    end += len(line)
+                    ended = line.endswith(b"\n")
+                size = f.seek(0, os.SEEK_END)
+        except FileNotFoundError:
+            return storage
+        if end < size or not ended:
+            # Cut the torn record and end the last line, so that the next append
+            # starts a line of its own instead of being lost with the torn one.
+            with open(self.connection_string, "r+b") as f:
+                f.truncate(end)
+                if not ended:
+                    f.seek(end)
+                    f.write(b"\n")
+        return storage
+
+    @staticmethod
+    def _is_record(line: bytes) -> bool:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return False
+        return isinstance(record, dict) and "op" in record
+
+    def _count(self, record: dict):
+        """
+        Keeps the version: the number of records that could have changed the words.
+        """
+        op = record["op"]
+        if op == "set" or op == "update":
+            self._version += 1
+        elif op == "version":
+            self._version = record["value"]
+
+    def version(self) -> int:
+        return self._version
+
+    @staticmethod
+    def _apply(storage: dict, record: dict):
+        op, key = record["op"], record.get("key")
+        if op == "set" or op == "load":
+            storage[key] = record["data"]
+        elif op == "update":
+            storage[key] = {**storage.get(key, {}), **record["data"]}
+        elif op == "inc" and key in storage:
+            entry = storage[key]
+            field = record["field"]
+            storage[key] = {**entry, field: entry.get(field, 0) + record["amount"]}
+
+    def _append(self, *records: dict):
+        with self._lock:
+            lines = []
+            for record in records:
+                self._apply(self.storage, record)
+                self._count(record)
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            self._log.writelines(lines)
+            self._log.flush()
+            if self._compaction_buffer is not None:
+                self._compaction_buffer.extend(lines)
+            self.log_records += len(lines)
+            self._maybe_sync()
+            self._maybe_compact()
+
+    def _maybe_sync(self):
+        if self.fsync_interval is None:
+            return
+        now = time.monotonic()
+        if now - self._last_sync >= self.fsync_interval:
+            os.fsync(self._log.fileno())
+            self._last_sync = now
+
+    def _maybe_compact(self):
+        if self.log_records < self.compaction_min_records:
+            return
+        if self.log_records < self.compaction_ratio * max(len(self.storage), 1):
+            return
+        if not self.background_compaction:
+            self.compact()
+        elif self._compaction_thread is None:
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+
+    def _write_snapshot(self, storage: dict, version: int) -> str:
+        temp_path = self.connection_string + ".compact"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "version", "value": version}) + "\n")
+            for key, data in storage.items():
+                # Not counted by `_count`: the version record covers them.
+                record = {"op": "load", "key": key, "data": data}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return temp_path
+
+    @staticmethod
+    def _finish_snapshot(temp_path: str, tail: list[str], target: str):
+        with open(temp_path, "a", encoding="utf-8") as f:
+            f.writelines(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, target)
+
+    def compact(self):
+        """
+        Rewrites the log with one record per live word. The new log is written
+        next to the old one and atomically renamed over it, so a crash leaves
+        either the old or the new log intact. Writes made meanwhile are carried over.
+        """
+        with self._lock:
+            snapshot = dict(self.storage)
+            version = self._version
+            self._compaction_buffer = []
+        try:
+            # Records are copy-on-write, so the shallow snapshot cannot change under us.
+            temp_path = self._write_snapshot(snapshot, version)
+            with self._lock:
+                self._log.close()
+                self._finish_snapshot(
+                    temp_path, self._compaction_buffer, self.connection_string
+                )
+                self._log = open(self.connection_string, "a", encoding="utf-8")
+                self.log_records = 1 + len(snapshot) + len(self._compaction_buffer)
+        finally:
+            with self._lock:
+                self._compaction_buffer = None
+                self._compaction_thread = None
+
+    def sync(self):
+        with self._lock:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            if not self._log.closed:
+                self.sync()
+                self._log.close()
+
+    def set(self, key: str, data: dict, changes_version: bool = True):
+        """
+        changes_version: False when `data` only differs from the stored entry by
+        weights, so that indexes built from the words are not considered stale.
+        """
+        self.set_many({key: data}, changes_version)
+
+    def set_many(self, entries: Mapping[str, dict], changes_version: bool = True):
+        """
+        Stores every entry of `entries`, by key, in a single append.
+        """
+        op = "set" if changes_version else "load"
+        self._append(
+            *({"op": op, "key": key, "data": data} for key, data in entries.items())
+        )
+
+    def write(self, data: dict):
+        self.set(data["word"], data)
+
+    def insert_many(self, data: list[dict]):
+        new_entries = {}
+        for entry in data:
+            if entry["word"] not in self.storage:
+                new_entries.setdefault(entry["word"], entry)
+        self._append(
+            *(
+                {"op": "set", "key": word, "data": entry}
+                for word, entry in new_entries.items()
+            )
+        )
+
+    def exists(self, key: str) -> bool:
+        return key in self.storage
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        return self.storage.get(key)
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        storage = self.storage
+        return {key: storage[key] for key in keys if key in storage}
+
+    def update(self, key: str, data: dict):
+        self._append({"op": "update", "key": key, "data": data})
+
+    def increment(self, key: str, field: str, amount: int = 1):
         if key in self.storage:
-            self.storage[key].update(data)
-        else:
-            self.storage[key] = data
-        with open(self.connection_string, "w", encoding="utf-8") as f:
-            json.dump(self.storage, f, indent=4)
+            self._append({"op": "inc", "key": key, "field": field, "amount": amount})
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        self.increment_amounts(dict.fromkeys(keys, amount), field)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        self._append(
+            *(
+                {"op": "inc", "key": key, "field": field, "amount": amount}
+                for key, amount in amounts.items()
+                if key in self.storage
+            )
+        )
 
     def get_whole_data(self) -> dict:
         return self.storage
 
 
-class DbMongo(DbInterface):
-    def __init__(self, connection_string: str, db_name: str, collection_name: str):
+class DbIndexedFile(DbInterface):
+    """
+    Read-optimized file storage. The file is an immutable segment of entries
+    sorted by word, followed by a fixed-width index, and is memory-mapped
+    instead of loaded: a lookup binary-searches the index and decodes only the
+    entry it finds. Writes go to a small DbLogFile next to it (`<path>.log`)
+    and are merged into a new segment once it holds `merge_threshold` words.
+
+    Layout: header (magic, entry count, index offset), then per entry the
+    UTF-8 word followed by its JSON document, then one
+    (word offset, word length, document length) record per entry.
+    """
+
+    MAGIC = b"DICTIDX1"
+    HEADER = struct.Struct("<8sQQ")
+    INDEX_ENTRY = struct.Struct("<QII")
+
+    def __init__(self, connection_string: str, merge_threshold: int = 10_000):
+        super().__init__(connection_string)
+        self.merge_threshold = merge_threshold
+        self._file = None
+        self._map = None
+        self.count = 0
+        self._index_offset = 0
+        self._open_segment()
+        self.delta = DbLogFile(connection_string + ".log", compaction_min_records=1000)
+
+    def _open_segment(self):
+        try:
+            self._file = open(self.connection_string, "rb")
+        except FileNotFoundError:
+            return
+        if os.fstat(self._file.fileno()).st_size < self.HEADER.size:
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._index_offset = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            raise ValueError(
+                f"'{self.connection_string}' is not an indexed database file."
+            )
+
+    def _close_segment(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.count = 0
+
+    def close(self):
+        self.delta.close()
+        self._close_segment()
+
+    @classmethod
+    def build(cls, path: str, entries):
+        """
+        Writes a segment from `(word, document)` pairs, which must be sorted by word.
+        `document` may be a dict or its already encoded JSON bytes.
+        The file is written next to `path` and atomically renamed over it.
+        """
+        temp_path = path + ".build"
+        index = []
+        with open(temp_path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, 0, 0))
+            offset = cls.HEADER.size
+            for word, document in entries:
+                key = word.encode("utf-8")
+                if not isinstance(document, bytes):
+                    document = json.dumps(document, ensure_ascii=False).encode("utf-8")
+                f.write(key)
+                f.write(document)
+                index.append(cls.INDEX_ENTRY.pack(offset, len(key), len(document)))
+                offset += len(key) + len(document)
+            f.writelines(index)
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, len(index), offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _entry(self, position: int):
+        return self.INDEX_ENTRY.unpack_from(
+            self._map, self._index_offset + position * self.INDEX_ENTRY.size
+        )
+
+    def _key_at(self, position: int) -> bytes:
+        offset, key_length, _ = self._entry(position)
+        return self._map[offset : offset + key_length]
+
+    def _document_at(self, position: int) -> bytes:
+        offset, key_length, length = self._entry(position)
+        start = offset + key_length
+        return self._map[start : start + length]
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        position = self._lower_bound(encoded)
+        if position < self.count and self._key_at(position) == encoded:
+            return position
+        return -1
+
+    def _segment_items(self):
+        for position in range(self.count):
+            yield self._key_at(position).decode("utf-8"), self._document_at(position)
+
+    def read(self) -> dict:
+        return self.get_whole_data()
+
+    def exists(self, key: str) -> bool:
+        return self.delta.exists(key) or self._find(key) >= 0
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        data = self.delta.get_or_none(key)
+        if data is not None:
+            return data
+        position = self._find(key)
+        if position < 0:
+            return None
+        return json.loads(self._document_at(position))
+
+    def write(self, data: dict):
+        self.delta.write(data)
+        self._maybe_merge()
+
+    def insert_many(self, data: list[dict]):
+        self.delta.insert_many(
+            [entry for entry in data if not self.exists(entry["word"])]
+        )
+        self._maybe_merge()
+
+    def update(self, key: str, data: dict):
+        self.delta.set(key, {**(self.get_or_none(key) or {}), **data})
+        self._maybe_merge()
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        entry = self.get_or_none(key)
+        if entry is not None:
+            self.delta.set(
+                key,
+                {**entry, field: entry.get(field, 0) + amount},
+                changes_version=False,
+            )
+            self._maybe_merge()
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        entries = {}
+        for key, amount in amounts.items():
+            entry = self.get_or_none(key)
+            if entry is not None:
+                entries[key] = {**entry, field: entry.get(field, 0) + amount}
+        if entries:
+            self.delta.set_many(entries, changes_version=False)
+            self._maybe_merge()
+
+    def version(self) -> str:
+        segment = os.stat(self.connection_string).st_mtime_ns if self._map else 0
+        return f"{segment}:{self.delta.version()}"
+
+    def iter_words(self):
+        for word, data in self.delta.storage.items():
+            yield word, data.get("weight", 0)
+        for word, document in self._segment_items():
+            if word not in self.delta.storage:
+                yield word, json.loads(document).get("weight", 0)
+
+    def keys_with_prefix(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ):
+        """
+        Yields the stored words starting with `prefix` in sorted order, straight
+        from the index, paged like `Dictionary.search`. The index is walked from
+        the first match on, and only as far as the page needs.
+        """
+        delta_keys = sorted(
+            key
+            for key in self.delta.storage
+            if key.startswith(prefix) and (after is None or key > after)
+        )
+        keys = heapq.merge(self._segment_keys(prefix, after), delta_keys)
+        stop = None if limit is None else offset + max(limit, 0)
+        yield from islice(self._unique(keys), offset, stop)
+
+    def _segment_keys(self, prefix: str, after: str = None):
+        # UTF-8 bytes sort like the str they encode: the index order is the str order.
+        encoded = prefix.encode("utf-8")
+        start = encoded
+        if after is not None:
+            start = max(start, after.encode("utf-8"))
+        position = self._lower_bound(start)
+        while position < self.count:
+            key = self._key_at(position)
+            if not key.startswith(encoded):
+                return
+            position += 1
+            word = key.decode("utf-8")
+            if after is None or word > after:
+                yield word
+
+    @staticmethod
+    def _unique(keys):
+        # A word in both the segment and the delta comes out of the merge twice.
+        previous = None
+        for key in keys:
+            if key != previous:
+                yield key
+                previous = key
+
+    def _merged_items(self):
+        delta = self.delta.get_whole_data()
+        pending = sorted(delta)
+        i = 0
+        for word, document in self._segment_items():
+            while i < len(pending) and pending[i] < word:
+                yield pending[i], delta[pending[i]]
+                i += 1
+            if i < len(pending) and pending[i] == word:
+                yield word, delta[word]
+                i += 1
+            else:
+                yield word, document
+        for word in pending[i:]:
+            yield word, delta[word]
+
+    def _maybe_merge(self):
+        if len(self.delta.storage) >= self.merge_threshold:
+            self.merge()
+
+    def merge(self):
+        """
+        Folds the pending writes into a new segment and empties the write log.
+        """
+        # The old segment stays mapped while the new one is renamed over it.
+        self.build(self.connection_string, self._merged_items())
+        self._close_segment()
+        self._open_segment()
+        log_path = self.delta.connection_string
+        self.delta.close()
+        os.remove(log_path)
+        self.delta = DbLogFile(log_path, compaction_min_records=1000)
+
+    def get_whole_data(self) -> dict:
+        """
+        Decodes every entry; meant for building in-memory indexes, not for lookups.
+        """
+        data = {word: json.loads(document) for word, document in self._segment_items()}
+        data.update(self.delta.get_whole_data())
+        return data
+
+
+def convert_json_to_log(json_path: str, log_path: str) -> int:
+    """
+    Converts a database.json written by DbFile into the DbLogFile format.
+    Returns the number of converted words.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        storage = json.load(f)
+    db = DbLogFile(log_path)
+    db.insert_many(list(storage.values()))
+    db.close()
+    return len(storage)
+
+
+def convert_json_to_indexed(json_path: str, indexed_path: str) -> int:
+    """
+    Converts a database.json written by DbFile into the DbIndexedFile format.
+    Returns the number of converted words.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        storage = json.load(f)
+    DbIndexedFile.build(
+        indexed_path, ((word, storage[word]) for word in sorted(storage))
+    )
+    return len(storage)
+
+
+class DbSqlite(DbInterface):
+    """
+    SQLite storage for single-node deployments that outgrow a JSON file.
+    Words and weights live in a table keyed by word, and meanings in their own
+    table with one row per word and language. A single-language lookup only reads
+    that meaning, and prefix searches are range scans over the primary key.
+    Every word also keeps the version of the transaction that last added or
+    rewrote it as its revision, indexed for `changes_since`.
+
+    The database runs in WAL mode, so readers do not wait for the writer. Every
+    thread gets its own connection; the statements are fixed strings taking
+    parameters, so each connection prepares them once and reuses them.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS words ("
+        "word TEXT PRIMARY KEY, weight INTEGER NOT NULL DEFAULT 0, "
+        "revision INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS meanings ("
+        "word TEXT NOT NULL, lang TEXT NOT NULL, meaning TEXT NOT NULL, "
+        "PRIMARY KEY (word, lang)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS meta ("
+        "key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    )
+    # Databases created before words had a revision.
+    ADD_REVISION = "ALTER TABLE words ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+    CREATE_REVISION_INDEX = (
+        "CREATE INDEX IF NOT EXISTS words_revision ON words (revision)"
+    )
+    # Key lists are sent as one JSON array parameter, so that the statement does
+    # not change with the number of keys.
+    SELECT_ENTRY = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word WHERE w.word = ?"
+    )
+    SELECT_ENTRY_IN_LANG = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word AND m.lang = ? WHERE w.word = ?"
+    )
+    SELECT_ENTRIES = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word "
+        "WHERE w.word IN (SELECT value FROM json_each(?))"
+    )
+    SELECT_ENTRIES_IN_LANG = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word AND m.lang = ? "
+        "WHERE w.word IN (SELECT value FROM json_each(?))"
+    )
+    SELECT_ALL = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word ORDER BY w.word"
+    )
+    SELECT_CHANGES = (
+        "SELECT w.word, w.weight, m.lang, m.meaning FROM words w "
+        "LEFT JOIN meanings m ON m.word = w.word "
+        "WHERE w.revision > ? AND w.revision <= ?"
+    )
+    SELECT_EXISTING = (
+        "SELECT word FROM words WHERE word IN (SELECT value FROM json_each(?))"
+    )
+    # Every change bumps the version at the end of its transaction: until then,
+    # the revision it gives to words is the version plus one.
+    NEXT_REVISION = (
+        "(SELECT COALESCE(MAX(value), 0) + 1 FROM meta WHERE key = 'version')"
+    )
+    INSERT_WORD = (
+        "INSERT OR IGNORE INTO words (word, weight, revision) "
+        f"VALUES (?, ?, {NEXT_REVISION})"
+    )
+    UPSERT_WORD = (
+        f"INSERT INTO words (word, weight, revision) VALUES (?, ?, {NEXT_REVISION}) "
+        "ON CONFLICT (word) DO UPDATE SET "
+        "weight = excluded.weight, revision = excluded.revision"
+    )
+    SET_REVISION = f"UPDATE words SET revision = {NEXT_REVISION} WHERE word = ?"
+    INSERT_MEANING = (
+        "INSERT OR REPLACE INTO meanings (word, lang, meaning) VALUES (?, ?, ?)"
+    )
+    DELETE_MEANINGS = "DELETE FROM meanings WHERE word = ?"
+    SET_WEIGHT = "UPDATE words SET weight = ? WHERE word = ?"
+    ADD_WEIGHT = "UPDATE words SET weight = weight + ? WHERE word = ?"
+    BUMP_VERSION = (
+        "INSERT INTO meta (key, value) VALUES ('version', 1) "
+        "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+    )
+    SELECT_VERSION = "SELECT value FROM meta WHERE key = 'version'"
+
+    def __init__(self, connection_string: str, busy_timeout: float = 30.0):
+        """
+        busy_timeout: Seconds a writer waits for another process's write to finish.
+        """
         super().__init__(connection_string)
-        self.client = MongoClient(connection_string)
-        self.db = self.client[db_name]
-        self.collection = self.db[collection_name]
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            columns = [
+                column[1] for column in connection.execute("PRAGMA table_info(words)")
+            ]
+            if "revision" not in columns:
+                connection.execute(self.ADD_REVISION)
+            connection.execute(self.CREATE_REVISION_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.connection_string,
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+            )
+            # Durable at every checkpoint rather than every commit, as WAL allows.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @staticmethod
+    def _documents(rows) -> dict[str, dict]:
+        documents = {}
+        for word, weight, lang, meaning in rows:
+            document = documents.get(word)
+            if document is None:
+                document = documents[word] = {
+                    "word": word,
+                    "meanings": {},
+                    "weight": weight,
+                }
+            if lang is not None:
+                document["meanings"][lang] = meaning
+        return documents
+
+    def _store(self, connection, data: dict):
+        meanings = data.get("meanings", {})
+        connection.executemany(
+            self.INSERT_MEANING,
+            [(data["word"], lang, meaning) for lang, meaning in meanings.items()],
+        )
 
-    def read(self):
-        return list(self.collection.find({}, {"_id": 0}))
+    def read(self) -> dict:
+        return self.get_whole_data()
 
     def write(self, data: dict):
-        self.collection.update_one({"word": data["word"]}, {"$set": data}, upsert=True)
+        connection = self._connection()
+        with connection:
+            connection.execute(self.UPSERT_WORD, (data["word"], data.get("weight", 0)))
+            connection.execute(self.DELETE_MEANINGS, (data["word"],))
+            self._store(connection, data)
+            connection.execute(self.BUMP_VERSION)
+
+    def insert_if_absent(self, data: dict) -> bool:
+        connection = self._connection()
+        with connection:
+            inserted = connection.execute(
+                self.INSERT_WORD, (data["word"], data.get("weight", 0))
+            ).rowcount
+            if inserted:
+                self._store(connection, data)
+                connection.execute(self.BUMP_VERSION)
+        return bool(inserted)
+
+    def insert_many(self, data: list[dict]):
+        if not data:
+            return
+        connection = self._connection()
+        with connection:
+            existing = self.existing_keys([entry["word"] for entry in data])
+            new = {}
+            for entry in data:
+                if entry["word"] not in existing:
+                    new.setdefault(entry["word"], entry)
+            connection.executemany(
+                self.INSERT_WORD,
+                [(word, entry.get("weight", 0)) for word, entry in new.items()],
+            )
+            connection.executemany(
+                self.INSERT_MEANING,
+                [
+                    (word, lang, meaning)
+                    for word, entry in new.items()
+                    for lang, meaning in entry.get("meanings", {}).items()
+                ],
+            )
+            connection.execute(self.BUMP_VERSION)
 
     def exists(self, key: str) -> bool:
-        return self.collection.count_documents({"word": key}, limit=1) > 0
+        return bool(self.existing_keys([key]))
 
-    def get_or_none(self, key: str) -> dict:
-        return self.collection.find_one({"word": key}, {"_id": 0})
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        rows = self._connection().execute(
+            self.SELECT_EXISTING, (json.dumps(list(keys)),)
+        )
+        return {word for word, in rows}
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        """
+        With `lang` only that meaning is read.
+        """
+        if lang is None:
+            rows = self._connection().execute(self.SELECT_ENTRY, (key,))
+        else:
+            rows = self._connection().execute(self.SELECT_ENTRY_IN_LANG, (lang, key))
+        return self._documents(rows).get(key)
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        """
+        One query; with `lang` only that meaning is read.
+        """
+        encoded = json.dumps(list(keys))
+        if lang is None:
+            rows = self._connection().execute(self.SELECT_ENTRIES, (encoded,))
+        else:
+            rows = self._connection().execute(
+                self.SELECT_ENTRIES_IN_LANG, (lang, encoded)
+            )
+        return self._documents(rows)
 
     def update(self, key: str, data: dict):
-        self.collection.update_one({"word": key}, {"$set": data}, upsert=True)
+        connection = self._connection()
+        with connection:
+            connection.execute(self.INSERT_WORD, (key, data.get("weight", 0)))
+            connection.execute(self.SET_REVISION, (key,))
+            if "weight" in data:
+                connection.execute(self.SET_WEIGHT, (data["weight"], key))
+            if "meanings" in data:
+                connection.execute(self.DELETE_MEANINGS, (key,))
+                self._store(connection, {"word": key, "meanings": data["meanings"]})
+            connection.execute(self.BUMP_VERSION)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        self.increment_many([key], field, amount)
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        self.increment_amounts(dict.fromkeys(keys, amount), field)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        if field != "weight":
+            raise ValueError(f"Only the weight can be incremented, not '{field}'.")
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                self.ADD_WEIGHT, [(amount, key) for key, amount in amounts.items()]
+            )
+
+    def version(self) -> int:
+        row = self._connection().execute(self.SELECT_VERSION).fetchone()
+        return row[0] if row else 0
+
+    def revision(self) -> int:
+        return self.version()
+
+    def changes_since(self, revision: int):
+        """
+        One query over the revision index. A change committed meanwhile is left
+        for the next call, as its revision is above the one returned.
+        """
+        latest = self.version()
+        rows = self._connection().execute(self.SELECT_CHANGES, (revision, latest))
+        return latest, list(self._documents(rows).values())
 
-    def get_whole_data(self):
-        return list(self.collection.find({}, {"_id": 0}))
+    def iter_words(self):
+        yield from self._connection().execute(
+            "SELECT word, weight FROM words ORDER BY word"
+        )
+
+    def keys_with_prefix(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        """
+        Returns the stored words starting with `prefix` in sorted order, paged like
+        `Dictionary.search`, from a range scan of the primary key.
+        """
+        # SQLite compares text as UTF-8 bytes, which sorts like Python compares str.
+        conditions, parameters = [], []
+        if prefix:
+            conditions.append("word >= ?")
+            parameters.append(prefix)
+            upper = _prefix_upper_bound(prefix)
+            if upper is not None:
+                conditions.append("word < ?")
+                parameters.append(upper)
+        if after is not None:
+            conditions.append("word > ?")
+            parameters.append(after)
+        query = "SELECT word FROM words"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY word LIMIT ? OFFSET ?"
+        parameters += [-1 if limit is None else limit, offset]
+        return [word for word, in self._connection().execute(query, parameters)]
+
+    def get_whole_data(self) -> dict:
+        return self._documents(self._connection().execute(self.SELECT_ALL))
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """
+    Returns the smallest string greater than every string starting with `prefix`,
+    None if there is none.
+    """
+    while prefix and prefix[-1] == chr(sys.maxunicode):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
 
 class DbFactory:
@@ -71,14 +1178,50 @@ class DbFactory:
         connection_string: str,
         db_name: str = None,
         collection_name: str = None,
+        cache_size: int = 0,
+        cache_ttl: float = None,
+        prefix_cache_size: int = 0,
+        **options,
     ):
+        """
+        cache_size: When positive, wraps the backend in a CachedDb of that many words.
+        cache_ttl: Seconds a cached word stays valid, None for no expiry.
+        prefix_cache_size: When positive, the CachedDb also keeps that many prefix
+        search results, for backends answering prefix searches themselves.
+        options: Backend specific settings.
+        """
         if db_type == DbType.FILE:
-            return DbFile(connection_string)
+            db = DbFile(connection_string, **options)
+        elif db_type == DbType.LOG:
+            db = DbLogFile(connection_string, **options)
+        elif db_type == DbType.INDEXED:
+            db = DbIndexedFile(connection_string, **options)
+        elif db_type == DbType.SQLITE:
+            db = DbSqlite(connection_string, **options)
         elif db_type == DbType.MONGO:
+            from .mongo import DbMongo
+
             if not db_name or not collection_name:
                 raise ValueError(
                     "MongoDB requires both a database name and collection name."
                 )
-            return DbMongo(connection_string, db_name, collection_name)
+            db = DbMongo(connection_string, db_name, collection_name, **options)
         else:
             raise ValueError("Unsupported database type")
+        if cache_size > 0 or prefix_cache_size > 0:
+            db = CachedDb(
+                db,
+                capacity=cache_size,
+                ttl=cache_ttl,
+                prefix_capacity=prefix_cache_size,
+            )
+        return db
+
+
+def __getattr__(name):
+    # DbMongo lives in db.mongo, so that pymongo is only imported when it is used.
+    if name == "DbMongo":
+        from .mongo import DbMongo
+
+        return DbMongo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,225 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from . import DbInterface
+
+# Upper bounds of the latency buckets: each 10% above the previous one, from
+# one microsecond to a few minutes.
+BUCKET_GROWTH = 1.1
+BUCKET_BOUNDS = [1e-6 * BUCKET_GROWTH**i for i in range(200)]
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """
+    Latency distribution of one operation in fixed logarithmic buckets, so it
+    takes the same memory after a billion calls as after one. Percentiles are
+    the upper bound of their bucket, at most 10% above the exact value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, failed: bool = False):
+        index = bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            if failed:
+                self.errors += 1
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self, elapsed: float) -> dict:
+        with self._lock:
+            return self._summary(elapsed)
+
+    def _summary(self, elapsed: float) -> dict:
+        summary = {
+            "count": self.count,
+            "errors": self.errors,
+            "per_second": self.count / elapsed if elapsed > 0 else 0.0,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = self.percentile(percent)
+        return summary
+
+
+class Metrics:
+    """
+    Call counts and latency histograms per named operation, shared by the
+    instrumented Dictionary and storage. Times are in seconds.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def histogram(self, name: str) -> Histogram:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            return histogram
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        self.histogram(name).record(seconds, failed)
+
+    def timed(self, name: str, func):
+        """
+        Returns `func` recording how long every call took under `name`, as an error
+        if it raised.
+        """
+        record = self.histogram(name).record
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def timed_func(*args, **kwargs):
+            start = clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                record(clock() - start, True)
+                raise
+            record(clock() - start)
+            return result
+
+        return timed_func
+
+    def snapshot(self) -> dict:
+        """
+        Returns, per operation, its count, error count, calls per second since
+        the start (or the last reset), mean, max and p50/p95/p99 latency.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            histograms = sorted(self._histograms.items())
+        return {
+            name: histogram.summary(elapsed)
+            for name, histogram in histograms
+            if histogram.count
+        }
+
+    def reset(self):
+        # The histograms are emptied in place: timed functions hold on to theirs.
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
+            self.started = time.monotonic()
+
+    def export(self, path: str, **extra) -> None:
+        """
+        Writes the snapshot and any `extra` sections as JSON, atomically replacing
+        `path`.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"operations": self.snapshot(), **extra}, f, indent=4)
+        os.replace(temp_path, path)
+
+
+class InstrumentedDb(DbInterface):
+    """
+    Records every call to the wrapped backend in `metrics` as "db.<method>".
+    Methods the wrapper does not define are forwarded to the backend untimed.
+    `version`, `revision` and `changes_since` are only forwarded when the backend
+    has them; otherwise the wrapper answers None like DbInterface.
+    """
+
+    def __init__(self, db: DbInterface, metrics: Metrics):
+        super().__init__(getattr(db, "connection_string", None))
+        self.db = db
+        self.metrics = metrics
+        self._iter_words = metrics.histogram("db.iter_words")
+        self._timed = {}
+        for name in ("version", "revision", "changes_since"):
+            if hasattr(db, name):
+                setattr(self, name, self._call(name))
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def _call(self, name: str):
+        timed = self._timed.get(name)
+        if timed is None:
+            timed = self._timed[name] = self.metrics.timed(
+                f"db.{name}", getattr(self.db, name)
+            )
+        return timed
+
+    def read(self):
+        return self._call("read")()
+
+    def write(self, data: dict):
+        return self._call("write")(data)
+
+    def exists(self, key: str) -> bool:
+        return self._call("exists")(key)
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        return self._call("get_or_none")(key, lang)
+
+    def update(self, key: str, data: dict):
+        return self._call("update")(key, data)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        return self._call("increment")(key, field, amount)
+
+    def iter_words(self):
+        # Timed from the first word to the last, not just the generator creation.
+        iter_words = getattr(self.db, "iter_words", None)
+        if iter_words is None:
+            iter_words = super().iter_words
+        start = time.perf_counter()
+        yield from iter_words()
+        self._iter_words.record(time.perf_counter() - start)
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        return self._call("get_many")(keys, lang)
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        return self._call("increment_many")(keys, field, amount)
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        return self._call("increment_amounts")(amounts, field)
+
+    def insert_if_absent(self, data: dict) -> bool:
+        return self._call("insert_if_absent")(data)
+
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        return self._call("existing_keys")(keys)
+
+    def insert_many(self, data: list[dict]):
+        return self._call("insert_many")(data)
+
+    def get_whole_data(self):
+        return self._call("get_whole_data")()
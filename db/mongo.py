@@ -0,0 +1,207 @@
+import re
+from collections import defaultdict
+from collections.abc import Mapping
+
+from bson import Timestamp
+from pymongo import ASCENDING, DESCENDING, InsertOne, MongoClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from . import DbInterface
+
+# Documents handed out leave out the bookkeeping fields.
+PROJECTION = {"_id": 0, "revision": 0}
+# Stamps the written words with a server timestamp as their revision: seconds
+# and a counter, which only increases, so no two writes share one.
+STAMP = {"$currentDate": {"revision": {"$type": "timestamp"}}}
+
+
+def _projection(lang: str = None) -> dict:
+    if lang is None:
+        return PROJECTION
+    return {"_id": 0, "word": 1, "weight": 1, f"meanings.{lang}": 1}
+
+
+def _absent(key: str) -> dict:
+    # Matches no stored document, so an upsert with it inserts or hits the unique index.
+    return {"word": key, "_id": {"$exists": False}}
+
+
+def _revision(stamp: Timestamp) -> int:
+    return stamp.time << 32 | stamp.inc
+
+
+def _stamp(revision: int) -> Timestamp:
+    return Timestamp(revision >> 32, revision & 0xFFFFFFFF)
+
+
+class DbMongo(DbInterface):
+    """
+    Every word added or rewritten is stamped by the server, in the same round
+    trip, with a timestamp of its own as the revision, in an indexed field; the
+    latest revision is also the version. A reader can, rarely, see a write
+    before an earlier one lands: `changes_since` may then miss that word until
+    it changes again.
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        db_name: str,
+        collection_name: str,
+        **client_options,
+    ):
+        """
+        client_options: Passed to MongoClient, e.g. maxPoolSize or
+        serverSelectionTimeoutMS.
+        """
+        super().__init__(connection_string)
+        self.client = MongoClient(connection_string, **client_options)
+        self.db = self.client[db_name]
+        self.collection = self.db[collection_name]
+        self.collection.create_index("word", unique=True)
+        self.collection.create_index("revision")
+
+    def version(self) -> int:
+        return self.revision()
+
+    def revision(self) -> int:
+        doc = self.collection.find_one(
+            {"revision": {"$exists": True}},
+            {"_id": 0, "revision": 1},
+            sort=[("revision", DESCENDING)],
+        )
+        return _revision(doc["revision"]) if doc else 0
+
+    def changes_since(self, revision: int):
+        """
+        One query over the revision index.
+        """
+        latest, entries = revision, []
+        # An empty Timestamp(0, 0) stands for the current time in places, so the
+        # first call asks for every stamped word instead.
+        since = {"$gt": _stamp(revision)} if revision else {"$exists": True}
+        cursor = self.collection.find({"revision": since}, {"_id": 0})
+        for entry in cursor:
+            latest = max(latest, _revision(entry.pop("revision")))
+            entries.append(entry)
+        return latest, entries
+
+    def iter_words(self):
+        """
+        Streams only the word and weight fields from the cursor.
+        """
+        cursor = self.collection.find(
+            {}, {"_id": 0, "word": 1, "weight": 1}, batch_size=10_000
+        )
+        for doc in cursor:
+            yield doc["word"], doc.get("weight", 0)
+
+    def read(self):
+        return list(self.collection.find({}, PROJECTION))
+
+    def write(self, data: dict):
+        self.collection.update_one(
+            {"word": data["word"]}, {"$set": data, **STAMP}, upsert=True
+        )
+
+    def insert_many(self, data: list[dict]):
+        """
+        One bulk insert, then one update stamping the words it inserted.
+        """
+        if not data:
+            return
+        requests = [InsertOne(dict(entry)) for entry in data]
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            # Only words stored meanwhile by another writer are expected.
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        finally:
+            words = [entry["word"] for entry in data]
+            self.collection.update_many(
+                {"word": {"$in": words}, "revision": {"$exists": False}}, STAMP
+            )
+
+    def insert_if_absent(self, data: dict) -> bool:
+        """
+        Inserts in a single round trip; the unique index on `word` rejects the
+        insert atomically when another writer stored the word first.
+        """
+        try:
+            self.collection.update_one(
+                _absent(data["word"]), {"$setOnInsert": data, **STAMP}, upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def exists(self, key: str) -> bool:
+        return self.collection.count_documents({"word": key}, limit=1) > 0
+
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        cursor = self.collection.find(
+            {"word": {"$in": list(keys)}}, {"word": 1, "_id": 0}
+        )
+        return {doc["word"] for doc in cursor}
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        """
+        With `lang` only that meaning is sent back over the wire.
+        """
+        return self.collection.find_one({"word": key}, _projection(lang))
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        """
+        One $in query; with `lang` only that meaning is sent back over the wire.
+        """
+        cursor = self.collection.find({"word": {"$in": list(keys)}}, _projection(lang))
+        return {doc["word"]: doc for doc in cursor}
+
+    def update(self, key: str, data: dict):
+        self.collection.update_one({"word": key}, {"$set": data, **STAMP}, upsert=True)
+
+    def increment(self, key: str, field: str, amount: int = 1):
+        self.collection.update_one({"word": key}, {"$inc": {field: amount}})
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        self.collection.update_many(
+            {"word": {"$in": list(keys)}}, {"$inc": {field: amount}}
+        )
+
+    def increment_amounts(self, amounts: Mapping[str, int], field: str):
+        """
+        One update_many per distinct amount; lookup counts are mostly the same few.
+        """
+        keys_by_amount = defaultdict(list)
+        for key, amount in amounts.items():
+            keys_by_amount[amount].append(key)
+        for amount, keys in keys_by_amount.items():
+            self.increment_many(keys, field, amount)
+
+    def keys_with_prefix(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        """
+        Returns the stored words starting with `prefix` in sorted order, paged like
+        `Dictionary.search`. An anchored, case-sensitive regex is a range scan of
+        the unique `word` index, which also yields the words already sorted.
+        """
+        condition = {}
+        if prefix:
+            condition["$regex"] = "^" + re.escape(prefix)
+        if after is not None:
+            condition["$gt"] = after
+        cursor = self.collection.find(
+            {"word": condition} if condition else {}, {"_id": 0, "word": 1}
+        ).sort("word", ASCENDING)
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit is not None:
+            if limit <= 0:
+                return []
+            cursor = cursor.limit(limit)
+        return [doc["word"] for doc in cursor]
+
+    def get_whole_data(self):
+        return list(self.collection.find({}, PROJECTION))
@@ -0,0 +1,139 @@
+import asyncio
+from collections import Counter
+from collections.abc import Mapping
+
+from dictionary.keyboard import suggest
+from dictionary.tie import TrieFactory, TrieType
+from dictionary.word import AsyncWordCRUD
+from models.lookup import LookupResult, LookupStatus
+
+
+class AsyncDictionary:
+    """
+    Dictionary for asyncio services, backed by an AsyncDbInterface.
+
+    Concurrent `read`s of the same word share one backend call, and lookup
+    counts are added up and written back in the background, one increment per
+    word instead of one per lookup. Build it with `await AsyncDictionary.create(db)`.
+    """
+
+    def __init__(
+        self,
+        db,
+        trie_type: TrieType = TrieType.STANDARD,
+        record_lookups: bool = True,
+    ):
+        self.db = db
+        self.record_lookups = record_lookups
+        self.trie = TrieFactory.create_trie(trie_type)
+        self.crud = AsyncWordCRUD(db)
+        self._inflight = {}
+        self._pending_lookups = Counter()
+        self._flush_task = None
+
+    @classmethod
+    async def create(cls, db, **options) -> "AsyncDictionary":
+        dictionary = cls(db, **options)
+        await db.prepare()
+        await dictionary.update_trie()
+        return dictionary
+
+    async def update_trie(self):
+        data = await self.db.get_whole_data()
+        if isinstance(data, Mapping):
+            data = data.values()
+        for doc in data:
+            word = doc.get("word")
+            if word:
+                self.trie.insert(word, doc.get("weight", 0))
+
+    async def _get_coalesced(self, key: str):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.db.get_or_none(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded, so a cancelled caller does not cancel the lookup of the others.
+        return await asyncio.shield(task)
+
+    def _record_lookup(self, key: str):
+        self.trie.set_weight(key, (self.trie.weight(key) or 0) + 1)
+        self._pending_lookups[key] += 1
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_lookups())
+
+    async def _flush_lookups(self):
+        try:
+            await asyncio.sleep(0)
+            while self._pending_lookups:
+                counts, self._pending_lookups = self._pending_lookups, Counter()
+                await asyncio.gather(
+                    *(
+                        self.crud.record_lookup(key, amount)
+                        for key, amount in counts.items()
+                    )
+                )
+        finally:
+            self._flush_task = None
+
+    async def flush(self):
+        """
+        Waits until the recorded lookup counts have reached the backend.
+        """
+        if self._flush_task is not None:
+            await self._flush_task
+
+    async def write(
+        self, new_word: str, meanings: dict[str, str], weight: int = 0
+    ) -> bool:
+        created = await self.crud.create(
+            new_word=new_word, meanings=meanings, weight=weight
+        )
+        if created:
+            self.trie.insert(new_word, weight)
+        return created
+
+    async def read(self, key: str, lang: str) -> str:
+        word = await self._get_coalesced(key)
+        if not word:
+            raise Exception(f"The word '{key}' was not found!")
+        meaning = word.get("meanings", {}).get(lang)
+        if not meaning:
+            raise Exception(f"The word '{key}' does not have a definition in {lang}.")
+        if self.record_lookups:
+            self._record_lookup(key)
+        return meaning
+
+    async def read_many(self, keys: list[str], lang: str) -> dict[str, LookupResult]:
+        keys = list(dict.fromkeys(keys))
+        words = await self.crud.get_many(keys, lang)
+        results = {}
+        for key in keys:
+            word = words.get(key)
+            if word is None:
+                results[key] = LookupResult(LookupStatus.MISSING)
+                continue
+            meaning = word.get("meanings", {}).get(lang)
+            if not meaning:
+                results[key] = LookupResult(LookupStatus.NO_MEANING)
+                continue
+            results[key] = LookupResult(LookupStatus.FOUND, meaning)
+            if self.record_lookups:
+                self._record_lookup(key)
+        return results
+
+    async def update(self, key: str, lang: str, definition) -> None:
+        await self.crud.update(key, lang, definition)
+
+    async def search(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        return list(self.trie.starts_with(prefix, limit, offset, after))
+
+    async def complete(self, prefix: str, k: int = 10) -> list[str]:
+        return self.trie.top_k(prefix, k)
+
+    async def suggest(
+        self, word: str, max_distance: int = 2, limit: int = None
+    ) -> list[str]:
+        return suggest(self.trie, word, max_distance, limit)
@@ -1,59 +1,725 @@
+import gc
+import sys
+import threading
+import time
+import weakref
+from bisect import bisect_right
+from collections import Counter, deque
+from collections.abc import Mapping
+from contextlib import contextmanager, nullcontext
+
 from db.database import *
-from dictionary.tie import Trie
+from db.metrics import InstrumentedDb, Metrics
+from dictionary.inverted import InvertedIndex
+from dictionary.keyboard import suggest
+from dictionary.ngram import NGramIndex
+from dictionary.snapshot import iter_snapshot, read_snapshot_version, save_snapshot
+from dictionary.tie import TrieFactory, TrieType
 from dictionary.word import WordCRUD
+from models.lookup import LookupResult, LookupStatus
+
+# Recorded as "dictionary.<name>" and "crud.<name>"; the gap between a crud
+# call and the db calls it makes is spent validating the WordModel.
+TIMED_METHODS = (
+    "read",
+    "read_many",
+    "write",
+    "write_many",
+    "update",
+    "search",
+    "search_contains",
+    "search_suffix",
+    "complete",
+    "suggest",
+    "reverse_search",
+    "update_trie",
+    "refresh",
+    "flush_lookups",
+    "load_snapshot",
+    "save_snapshot",
+)
+TIMED_CRUD_METHODS = ("create", "create_many", "get", "get_many", "update")
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Building or copying trie nodes allocates a lot and creates no cycles, so the
+    cyclic collector would only rescan the (large, long-lived) trie over and over.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _run_periodically(
+    dictionary_ref, method: str, interval: float, stopped: threading.Event
+):
+    # Holds the Dictionary weakly, so that dropping it also ends the runs.
+    while not stopped.wait(interval):
+        dictionary = dictionary_ref()
+        if dictionary is None:
+            return
+        try:
+            getattr(dictionary, method)()
+        except Exception as e:
+            # An unreachable storage is tried again on the next round.
+            print(f"Dictionary.{method} failed: {e}", file=sys.stderr)
+        del dictionary
 
 
 class Dictionary:
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        trie_type: TrieType = TrieType.STANDARD,
+        record_lookups: bool = True,
+        snapshot_path: str = None,
+        index_path: str = None,
+        thread_safe: bool = False,
+        metrics: Metrics = None,
+        lazy_trie: bool = False,
+        storage_search: bool = False,
+        refresh_interval: float = None,
+        build_workers: int = None,
+        flush_interval: float = 5.0,
+    ):
+        """
+        record_lookups: Count every successful `read` in the word's weight,
+        which ranks the completions returned by `complete`. Reads only count in
+        memory; the counts are added to the stored weights in batches, see
+        `flush_lookups`.
+        snapshot_path: File to persist the trie in. On startup the trie is loaded
+        from it when it was built from the current storage version, and rebuilt
+        (then saved) otherwise. Only used with backends that report a version.
+        index_path: File to persist the reverse (meaning to word) index in, reused
+        the same way. The index is only built on the first `reverse_search`.
+        thread_safe: Allow calls from several threads. Writers take turns behind a
+        lock and publish a new trie, sharing all but the changed nodes with the
+        previous one, so searches and lookups never wait and never see a half-done
+        change.
+        metrics: Records the count and latency of the Dictionary operations and of
+        every storage call in it; see `stats`. Nothing is timed without it.
+        lazy_trie: Build (or load) the trie on its first use instead of on startup,
+        so that lookups and writes can start right away.
+        storage_search: Answer `search` from the storage's own sorted index
+        (`keys_with_prefix`, which DbSqlite and DbIndexedFile have) rather than from
+        the trie. The trie is then only built, on first use, for the other searches,
+        so very large vocabularies need not fit in memory.
+        refresh_interval: Seconds between two `refresh` calls made from a background
+        thread, to pick up what other processes store; needs `thread_safe` and a
+        storage keeping revisions. Stopped by `close`.
+        build_workers: Build the trie from the storage in that many processes (see
+        `TrieFactory.build_trie`), worth it for millions of words on as many cores.
+        flush_interval: Seconds between two flushes of the lookup counts: from a
+        background thread with `thread_safe`, else along with the next write once
+        they are due. None to only flush on `flush_lookups`, `refresh` and `close`.
+        """
+        if storage_search and not hasattr(db, "keys_with_prefix"):
+            raise ValueError("storage_search needs a storage with keys_with_prefix.")
+        if refresh_interval is not None and not thread_safe:
+            raise ValueError(
+                "refresh_interval needs thread_safe, as refreshes run in a thread."
+            )
+        self.metrics = metrics
+        if metrics is not None:
+            db = InstrumentedDb(db, metrics)
+            for name in TIMED_METHODS:
+                setattr(
+                    self, name, metrics.timed(f"dictionary.{name}", getattr(self, name))
+                )
         self.db = db
-        self.trie = Trie()
-        self.update_trie()
+        self.thread_safe = thread_safe
+        self._lock = threading.RLock() if thread_safe else nullcontext()
+        self.record_lookups = record_lookups
+        self.snapshot_path = snapshot_path
+        self.index_path = index_path
+        self.storage_search = storage_search
+        self.reverse_index = None
+        self.trie_type = trie_type
+        self.build_workers = build_workers
+        # Substring and suffix indexes, built from the trie on their first search.
+        self.ngram_index = None
+        self.suffix_trie = None
+        self._trie = None
+        # Words looked up before the trie was built: their stored weight may be
+        # ahead of the one in the snapshot.
+        self._touched = set()
+        # Storage revision the trie and the reverse index were last brought up to.
+        self._revision = None
+        # Storage versions the trie and the reverse index hold every word of,
+        # None when unknown.
+        self._trie_version = None
+        self._index_version = None
+        # Lookups counted since the last flush. Readers of a thread-safe Dictionary
+        # only append to a deque, which needs no lock.
+        self._lookups = deque() if thread_safe else Counter()
+        self.flush_interval = flush_interval
+        self._flushed_at = time.monotonic()
+        self._stopped = threading.Event()
         self.crud = WordCRUD(db)
+        if metrics is not None:
+            for name in TIMED_CRUD_METHODS:
+                setattr(
+                    self.crud,
+                    name,
+                    metrics.timed(f"crud.{name}", getattr(self.crud, name)),
+                )
+        # Whether the saved indexes can catch up with the storage before being saved.
+        self._keeps_revisions = (
+            bool(snapshot_path or index_path) and self._storage_revision() is not None
+        )
+        if not lazy_trie and not storage_search:
+            self._load_trie()
+        if refresh_interval is not None:
+            if self._storage_revision() is None:
+                raise ValueError("refresh_interval needs a storage keeping revisions.")
+            self._start_periodically("refresh", refresh_interval)
+        if thread_safe and record_lookups and flush_interval is not None:
+            self._start_periodically("flush_lookups", flush_interval)
+
+    def _start_periodically(self, method: str, interval: float):
+        threading.Thread(
+            target=_run_periodically,
+            args=(weakref.ref(self), method, interval, self._stopped),
+            daemon=True,
+        ).start()
+
+    @property
+    def trie(self):
+        trie = self._trie
+        if trie is None:
+            trie = self._load_trie()
+        return trie
+
+    @trie.setter
+    def trie(self, trie):
+        self._trie = trie
 
-    def write(self, new_word: str, meanings: dict[str, str]) -> bool:
+    def _load_trie(self):
+        """
+        Loads the trie from the snapshot, or rebuilds it from the storage and saves
+        the snapshot, unless another thread did it meanwhile.
+        """
+        with self._lock:
+            if self._trie is not None:
+                return self._trie
+            with _gc_paused():
+                loaded = self.load_snapshot()
+                if not loaded:
+                    self.update_trie()
+            if not loaded:
+                self.save_snapshot()
+            return self._trie
+
+    def load_snapshot(self) -> bool:
+        """
+        Fills the trie from the snapshot file if it matches the storage version.
+        Returns whether the snapshot was used.
+        """
+        if not self.snapshot_path:
+            return False
+        revision = self._storage_revision()
+        version = self.db.version()
+        if version is None or read_snapshot_version(self.snapshot_path) != version:
+            return False
+        trie = TrieFactory.build_trie(
+            self.trie_type, iter_snapshot(self.snapshot_path), self.build_workers
+        )
+        with self._lock:
+            # The stored weights of the touched words then include their lookups.
+            self.flush_lookups()
+            if self._touched:
+                for word, doc in self.db.get_many(list(self._touched)).items():
+                    trie.set_weight(word, doc.get("weight", 0))
+            self._publish(trie, revision, version)
+        return True
+
+    def save_snapshot(self) -> None:
+        """
+        Persists the trie, weights included, to `snapshot_path`, stamped with the
+        storage version it holds every word of. With a storage keeping revisions,
+        it first catches up with what was stored since it was built; otherwise a
+        trie that fell behind is stamped with an older version, so that the next
+        start rebuilds it instead of loading it.
+        Weight changes do not invalidate a snapshot, so call this before shutting
+        down to keep the popularity counted since the last save.
+        """
+        if not self.snapshot_path or (self._trie is None and not self._touched):
+            # A trie never built has nothing the snapshot lacks.
+            return
+        with self._lock:
+            # Built now if only lookups were counted so far.
+            self.trie
+            if self._trie_version != self._storage_version() and self._keeps_revisions:
+                self.refresh()
+            trie, version = self._trie, self._trie_version
+        if version is not None:
+            save_snapshot(trie, self.snapshot_path, version)
+
+    def write(self, new_word: str, meanings: dict[str, str], weight: int = 0) -> bool:
         """
         Adds a new word with its meanings to the database.
         meanings: A dictionary with language keys ("fa", "en", "fe") and their respective translations.
+        weight: Initial popularity of the word for `complete`.
         """
-        creations_response = self.crud.create(new_word=new_word, meanings=meanings)
-        if creations_response:
-            self.update_trie()
+        with self._lock, self._changing():
+            creations_response = self.crud.create(
+                new_word=new_word, meanings=meanings, weight=weight
+            )
+            if creations_response:
+                self._insert(new_word, weight)
+                if self.reverse_index is not None:
+                    self.reverse_index.add(new_word, meanings)
+            self._flush_if_due()
         return creations_response
 
+    def write_many(self, entries: list[dict]) -> list[str]:
+        """
+        Adds a batch of words in one validation pass and one storage write.
+        entries: Dictionaries with "word", "meanings" and optionally "weight".
+        Returns the words that were created; existing words are left untouched.
+        """
+        firsts = {}
+        for entry in entries:
+            firsts.setdefault(entry["word"], entry)
+        with self._lock, self._changing():
+            created = self.crud.create_many(entries)
+            self._insert_many(
+                [(word, firsts[word].get("weight", 0)) for word in created]
+            )
+            if self.reverse_index is not None:
+                for word in created:
+                    self.reverse_index.add(word, firsts[word]["meanings"])
+            self._flush_if_due()
+        return created
+
     def read(self, key: str, lang: str) -> str:
         """
         Fetches the meaning of a word in the specified language.
         key: The word to lookup.
         lang: The language in which to retrieve the meaning.
         """
-        word = self.crud.get(key)
+        word = self.crud.get(key, lang)
         meaning = word.get("meanings", {}).get(lang)
         if not meaning:
             raise Exception(f"The word '{key}' does not have a definition in {lang}.")
+        if self.record_lookups:
+            self._count_lookups([key])
         return meaning
 
+    def read_many(self, keys: list[str], lang: str) -> dict[str, LookupResult]:
+        """
+        Fetches the meanings of several words in one storage call.
+        Returns a LookupResult per distinct key, in the order given, telling whether
+        the word was found, is missing, or has no meaning in `lang`.
+        """
+        keys = list(dict.fromkeys(keys))
+        words = self.crud.get_many(keys, lang)
+        results = {}
+        found = []
+        for key in keys:
+            word = words.get(key)
+            if word is None:
+                results[key] = LookupResult(LookupStatus.MISSING)
+                continue
+            meaning = word.get("meanings", {}).get(lang)
+            if not meaning:
+                results[key] = LookupResult(LookupStatus.NO_MEANING)
+                continue
+            results[key] = LookupResult(LookupStatus.FOUND, meaning)
+            found.append(key)
+        if self.record_lookups:
+            self._count_lookups(found)
+        return results
+
     def update(self, key: str, lang: str, definition) -> None:
-        update_status = self.crud.update(key, lang, definition)
-        if update_status:
-            self.update_trie()
+        # Updates only touch meanings of an existing word, so the trie stays as is.
+        with self._lock, self._changing():
+            meanings = self.crud.update(key, lang, definition)
+            if self.reverse_index is not None:
+                self.reverse_index.add(key, meanings)
+            self._flush_if_due()
+
+    def _count_lookups(self, keys: list[str]):
+        if self.thread_safe:
+            # The trie gets them on the next flush: changing it publishes a new one.
+            self._lookups.extend(keys)
+        else:
+            self._lookups.update(keys)
+            self._add_weights(dict.fromkeys(keys, 1))
+
+    def _flush_if_due(self):
+        # Called with the lock held.
+        interval = self.flush_interval
+        if interval is not None and time.monotonic() - self._flushed_at >= interval:
+            self.flush_lookups()
+
+    def flush_lookups(self) -> None:
+        """
+        Adds the lookups counted since the last flush to the stored weights, one
+        storage call per distinct count, and, with `thread_safe`, to the trie.
+        """
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            lookups = self._lookups
+            if self.thread_safe:
+                # Only as many as there are now: readers may be appending meanwhile.
+                counts = Counter(lookups.popleft() for _ in range(len(lookups)))
+            else:
+                counts, self._lookups = lookups, Counter()
+            if not counts:
+                return
+            self.crud.record_lookups(counts)
+            if self.thread_safe:
+                self._add_weights(counts)
+
+    @contextmanager
+    def _changing(self):
+        """
+        Wraps a write made through this Dictionary, with the lock held. Without
+        revisions to catch up from, the trie and the reverse index only keep a
+        known version when the storage had not changed since they got it; the
+        write then moves it along.
+        """
+        versions = (self._trie_version, self._index_version)
+        if versions == (None, None) or self._keeps_revisions:
+            yield
+            return
+        before = self._storage_version()
+        self._trie_version = self._index_version = None
+        yield
+        if before in versions:
+            after = self._storage_version()
+            if versions[0] == before:
+                self._trie_version = after
+            if versions[1] == before:
+                self._index_version = after
+
+    def _storage_version(self):
+        # Only needed to stamp what is saved, and not every storage has one.
+        if not self.snapshot_path and not self.index_path:
+            return None
+        version = getattr(self.db, "version", None)
+        return version() if version is not None else None
+
+    def _publish(self, trie, revision=None, version=None):
+        """
+        Makes `trie`, built from the storage at `revision` and `version`, the one
+        searched. The substring and suffix indexes are dropped to be rebuilt from
+        it on their next search.
+        """
+        with self._lock:
+            self.trie = trie
+            self.ngram_index = None
+            self.suffix_trie = None
+            self._touched = set()
+            self._trie_version = version
+            self._built_at(revision)
+
+    def _built_at(self, revision):
+        # The trie and the reverse index may be built at different revisions: the
+        # next refresh starts from the older one, and changes the other already
+        # has are applied again, to no effect.
+        if self._revision is None or revision is None or revision < self._revision:
+            self._revision = revision
+
+    def _insert(self, word: str, weight: int):
+        self._insert_many([(word, weight)])
+
+    def _insert_many(self, items: list[tuple[str, int]]):
+        # Called with the lock held. A trie not built yet is built from the storage.
+        if not items or self._trie is None:
+            return
+        reversed_items = [(word[::-1], None) for word, _ in items]
+        if self.thread_safe:
+            with _gc_paused():
+                self.trie = self.trie.with_words(items)
+                if self.ngram_index is not None:
+                    self.suffix_trie = self.suffix_trie.with_words(reversed_items)
+                    self.ngram_index = self.ngram_index.with_words(
+                        word for word, _ in items
+                    )
+        else:
+            for word, weight in items:
+                self.trie.insert(word, weight)
+            if self.ngram_index is not None:
+                for word, _ in reversed_items:
+                    self.suffix_trie.insert(word)
+                for word, _ in items:
+                    self.ngram_index.add(word)
+
+    def _add_weights(self, counts: Mapping[str, int]):
+        # Called with the lock held; adds each word's count of lookups to its weight.
+        trie = self._trie
+        if trie is None:
+            # Only a trie loaded from the snapshot lacks them; one built from the
+            # storage reads them, and storage_search may never build one.
+            if self.snapshot_path and not self.storage_search:
+                self._touched.update(counts)
+            return
+        weights = []
+        for word, count in counts.items():
+            weight = trie.weight(word)
+            if weight is not None:
+                weights.append((word, weight + count))
+        self._set_weights(weights)
+
+    def _set_weights(self, weights: list[tuple[str, int]]):
+        # Called with the lock held, once the trie is built.
+        if self.thread_safe:
+            with _gc_paused():
+                self.trie = self._trie.with_weights(weights)
+        else:
+            for word, weight in weights:
+                self._trie.set_weight(word, weight)
 
     def update_trie_with_list_data(self, data: list, trie):
         for doc in data:
             word = doc.get("word")
             if word:
-                trie.insert(word)
+                trie.insert(word, doc.get("weight", 0))
 
-    def update_trie_with_dict_data(self, data: list, trie):
-        for word in data.keys():
-            trie.insert(word)
+    def update_trie_with_dict_data(self, data: dict, trie):
+        for word, doc in data.items():
+            trie.insert(word, doc.get("weight", 0))
 
     def update_trie(self):
-        trie = self.trie
+        """
+        Rebuilds the trie from the stored words. Writers wait meanwhile, so that
+        none of their words is lost when the new trie replaces the current one.
+        """
+        with self._lock:
+            self.flush_lookups()
+            revision = self._storage_revision()
+            version = self._storage_version()
+            trie = TrieFactory.build_trie(
+                self.trie_type, self._stored_words(), self.build_workers
+            )
+            self._publish(trie, revision, version)
+
+    def _storage_revision(self):
+        revision = getattr(self.db, "revision", None)
+        return revision() if revision is not None else None
+
+    def refresh(self) -> None:
+        """
+        Catches up with the words other processes sharing the storage added or
+        rewrote: only those are read, from `changes_since`, and applied to the
+        trie and the reverse index, whichever are built. With a storage keeping no
+        revisions, or none from that far back, whatever was built is rebuilt instead.
+        Weights counted elsewhere are only picked up for the words that changed.
+        """
+        with self._lock:
+            self.flush_lookups()
+            # Read first: the changes fetched next are at least as recent.
+            version = self._storage_version()
+            since = (
+                self._revision
+                if self._revision is not None
+                else self._storage_revision()
+            )
+            changes_since = getattr(self.db, "changes_since", None)
+            changes = (
+                None if since is None or changes_since is None else changes_since(since)
+            )
+            if changes is None:
+                self._revision = None
+                if self._trie is not None:
+                    self.update_trie()
+                self.reverse_index = None
+                self._index_version = None
+                return
+            self._revision, entries = changes
+            trie = self._trie
+            if trie is not None:
+                added, weights = [], []
+                for entry in entries:
+                    word, weight = entry["word"], entry.get("weight", 0)
+                    current = trie.weight(word)
+                    if current is None:
+                        added.append((word, weight))
+                    elif current != weight:
+                        weights.append((word, weight))
+                self._insert_many(added)
+                if weights:
+                    self._set_weights(weights)
+                self._trie_version = version
+            if self.reverse_index is not None:
+                for entry in entries:
+                    self.reverse_index.add(entry["word"], entry.get("meanings", {}))
+                self._index_version = version
+
+    def close(self) -> None:
+        """
+        Stops the background refreshes and flushes, then flushes the lookup counts.
+        The storage stays open.
+        """
+        self._stopped.set()
+        self.flush_lookups()
+
+    def _stored_words(self):
+        iter_words = getattr(self.db, "iter_words", None)
+        if iter_words is not None:
+            # Streams (word, weight) pairs instead of materializing whole documents.
+            yield from iter_words()
+            return
         data = self.db.get_whole_data()
         if isinstance(data, list):
-            self.update_trie_with_list_data(data, trie)
-        elif isinstance(data, dict):
-            self.update_trie_with_dict_data(data, trie)
+            for doc in data:
+                word = doc.get("word")
+                if word:
+                    yield word, doc.get("weight", 0)
+        elif isinstance(data, Mapping):
+            for word, doc in data.items():
+                yield word, doc.get("weight", 0)
+
+    def search(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        """
+        Returns the words starting with `prefix` in lexicographic order.
+        limit/offset select a page; passing the last word of a page as `after`
+        fetches the next page without walking the previous ones again.
+        """
+        if self.storage_search:
+            return list(self.db.keys_with_prefix(prefix, limit, offset, after))
+        return list(self.trie.starts_with(prefix, limit, offset, after))
+
+    def search_contains(
+        self, substring: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        """
+        Returns the words containing `substring` in lexicographic order, paged like
+        `search`.
+        """
+        ngram_index = self.ngram_index
+        if ngram_index is None:
+            with self._lock:
+                ngram_index = self._word_indexes()[0]
+        return _page(ngram_index.search_sorted(substring), limit, offset, after)
+
+    def search_suffix(
+        self, suffix: str, limit: int = None, offset: int = 0, after: str = None
+    ) -> list[str]:
+        """
+        Returns the words ending with `suffix`, paged like `search`. They are ordered
+        by their reversed spelling, so words sharing a longer ending come together.
+        """
+        suffix_trie = self.suffix_trie
+        if suffix_trie is None:
+            with self._lock:
+                suffix_trie = self._word_indexes()[1]
+        reversed_after = after[::-1] if after is not None else None
+        return [
+            word[::-1]
+            for word in suffix_trie.starts_with(
+                suffix[::-1], limit, offset, reversed_after
+            )
+        ]
+
+    def _word_indexes(self) -> tuple[NGramIndex, object]:
+        # Called with the lock held.
+        if self.ngram_index is None:
+            ngram_index = NGramIndex()
+            with _gc_paused():
+                words = [word for word, _ in self.trie.items()]
+                for word in words:
+                    ngram_index.add(word)
+                suffix_trie = TrieFactory.build_trie(
+                    self.trie_type, [(word[::-1], 0) for word in words]
+                )
+            self.ngram_index, self.suffix_trie = ngram_index, suffix_trie
+        return self.ngram_index, self.suffix_trie
+
+    def complete(self, prefix: str, k: int = 10) -> list[str]:
+        """
+        Returns the `k` most popular words starting with `prefix`, most popular first.
+        """
+        return self.trie.top_k(prefix, k)
+
+    def reverse_search(self, term: str, lang: str) -> list[str]:
+        """
+        Returns, sorted, the words whose meaning in `lang` contains every word of
+        `term`. Matching ignores case and the Arabic/Persian spelling variants of a
+        letter.
+        """
+        with self._lock:
+            if self.reverse_index is None:
+                revision = self._storage_revision()
+                version = self._storage_version()
+                self.reverse_index = self.load_reverse_index()
+                self._index_version = version
+                self._built_at(revision)
+            return self.reverse_index.search(term, lang)
+
+    def load_reverse_index(self) -> InvertedIndex:
+        """
+        Loads the reverse index from `index_path` if it matches the storage version,
+        builds it from the stored meanings (and saves it) otherwise.
+        """
+        version = self.db.version() if self.index_path else None
+        if version is not None:
+            index = InvertedIndex.load(self.index_path, version)
+            if index is not None:
+                return index
+        index = InvertedIndex()
+        data = self.db.get_whole_data()
+        for doc in data.values() if isinstance(data, Mapping) else data:
+            if doc.get("word"):
+                index.add(doc["word"], doc.get("meanings", {}))
+        if version is not None:
+            index.save(self.index_path, version)
+        return index
+
+    def save_index(self) -> None:
+        """
+        Persists the reverse index, if it was built, to `index_path`, stamped
+        with the storage version it holds every word of, like `save_snapshot`.
+        """
+        if not self.index_path or self.reverse_index is None:
+            return
+        with self._lock:
+            if self._index_version != self._storage_version() and self._keeps_revisions:
+                self.refresh()
+            index, version = self.reverse_index, self._index_version
+        if index is not None and version is not None:
+            index.save(self.index_path, version)
+
+    def suggest(self, word: str, max_distance: int = 2, limit: int = None) -> list[str]:
+        """
+        Returns the stored words within `max_distance` typos of `word`, closest
+        first and, at equal distance, most popular first. `word` is also tried as
+        if typed with the wrong keyboard layout (Latin keys for Farsi and back).
+        """
+        return suggest(self.trie, word, max_distance, limit)
+
+    def stats(self) -> dict:
+        """
+        Returns the trie size, if it was built, the cache counters of a cached
+        storage and, with `metrics`, the count and latency percentiles of every
+        timed operation.
+        """
+        stats = {}
+        trie = self._trie
+        if trie is not None:
+            # Not built for stats alone: lazy_trie and storage_search rely on it.
+            stats["trie"] = trie.stats()
+        cache_stats = getattr(self.db, "stats", None)
+        if cache_stats is not None:
+            stats["cache"] = cache_stats()
+        if self.metrics is not None:
+            stats["operations"] = self.metrics.snapshot()
+        return stats
+
 
-    def search(self, prefix: str) -> list[str]:
-        return self.trie.starts_with(prefix)
+def _page(
+    words: list[str], limit: int = None, offset: int = 0, after: str = None
+) -> list[str]:
+    start = bisect_right(words, after) if after is not None else 0
+    stop = None if limit is None else start + offset + limit
+    return words[start + offset : stop]
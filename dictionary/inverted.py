@@ -0,0 +1,123 @@
+import json
+import os
+import re
+
+# Arabic code points commonly typed for their Persian look-alikes.
+PERSIAN_EQUIVALENTS = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "ة": "ه",
+        "ۀ": "ه",
+        "أ": "ا",
+        "إ": "ا",
+        "ٱ": "ا",
+        "ؤ": "و",
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    }
+)
+# Diacritics (harakat, superscript alef) and the tatweel only change how a word
+# is drawn.
+IGNORED_MARKS = re.compile("[\u064b-\u065f\u0670\u0640]")
+# A zero-width non-joiner splits the parts of one word (می‌روم): join them.
+ZWNJ = "\u200c"
+TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    text = text.translate(PERSIAN_EQUIVALENTS).replace(ZWNJ, "")
+    return IGNORED_MARKS.sub("", text).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits a meaning into normalized words, Latin and Persian script alike.
+    """
+    return TOKEN.findall(normalize(text))
+
+
+class InvertedIndex:
+    """
+    Maps the tokens of every meaning back to the words having that meaning, per
+    language.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.tokens = {}
+
+    def add(self, word: str, meanings: dict[str, str]) -> None:
+        """
+        Indexes the meanings of `word`, replacing whatever was indexed for it before.
+        """
+        self.remove(word)
+        tokens = {
+            lang: sorted(set(tokenize(meaning)))
+            for lang, meaning in meanings.items()
+            if meaning
+        }
+        self._link(word, tokens)
+
+    def _link(self, word: str, tokens: dict[str, list[str]]) -> None:
+        self.tokens[word] = tokens
+        for lang, lang_tokens in tokens.items():
+            postings = self.postings.setdefault(lang, {})
+            for token in lang_tokens:
+                postings.setdefault(token, set()).add(word)
+
+    def remove(self, word: str) -> None:
+        for lang, lang_tokens in self.tokens.pop(word, {}).items():
+            postings = self.postings[lang]
+            for token in lang_tokens:
+                words = postings[token]
+                words.discard(word)
+                if not words:
+                    del postings[token]
+
+    def search(self, query: str, lang: str) -> list[str]:
+        """
+        Returns, sorted, the words whose meaning in `lang` contains every token of
+        `query`.
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        postings = self.postings.get(lang, {})
+        matches = sorted((postings.get(token, set()) for token in tokens), key=len)
+        # Intersecting from the rarest token keeps the intermediate sets small.
+        words = set(matches[0])
+        for candidates in matches[1:]:
+            words &= candidates
+        return sorted(words)
+
+    def save(self, path: str, version) -> None:
+        """
+        Writes the index stamped with the storage `version`, atomically replacing
+        `path`.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": version, "tokens": self.tokens}, f, ensure_ascii=False
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str, version) -> "InvertedIndex":
+        """
+        Reads an index saved by `save`. None when there is none or it was built from
+        another version.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("version") != version:
+            return None
+        index = cls()
+        for word, tokens in data["tokens"].items():
+            index._link(word, tokens)
+        return index
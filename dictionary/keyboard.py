@@ -0,0 +1,66 @@
+# Keys of the standard Persian layout (ISIRI 9147) by the QWERTY key they sit on.
+LATIN_TO_FARSI = {
+    "q": "ض",
+    "w": "ص",
+    "e": "ث",
+    "r": "ق",
+    "t": "ف",
+    "y": "غ",
+    "u": "ع",
+    "i": "ه",
+    "o": "خ",
+    "p": "ح",
+    "[": "ج",
+    "]": "چ",
+    "a": "ش",
+    "s": "س",
+    "d": "ی",
+    "f": "ب",
+    "g": "ل",
+    "h": "ا",
+    "j": "ت",
+    "k": "ن",
+    "l": "م",
+    ";": "ک",
+    "'": "گ",
+    "z": "ظ",
+    "x": "ط",
+    "c": "ز",
+    "v": "ر",
+    "b": "ذ",
+    "n": "د",
+    "m": "پ",
+    ",": "و",
+    "C": "ژ",
+    " ": " ",
+}
+FARSI_TO_LATIN = {farsi: latin for latin, farsi in LATIN_TO_FARSI.items()}
+
+
+def switch_layout(text: str) -> str:
+    """
+    Returns what `text` would have been had it been typed with the other keyboard
+    layout active, Farsi for Latin and Latin for Farsi. None when `text` mixes both
+    or contains characters found on neither layout.
+    """
+    for mapping in (LATIN_TO_FARSI, FARSI_TO_LATIN):
+        if text and all(ch in mapping for ch in text):
+            return "".join(mapping[ch] for ch in text)
+    return None
+
+
+def suggest(trie, word: str, max_distance: int, limit: int = None) -> list[str]:
+    """
+    Ranks the words of `trie` close to `word`, or to `word` typed with the other layout,
+    by edit distance and then by weight.
+    """
+    distances = dict(trie.fuzzy(word, max_distance, limit))
+    switched = switch_layout(word)
+    if switched is not None:
+        for match, distance in trie.fuzzy(switched, max_distance, limit):
+            if distance < distances.get(match, max_distance + 1):
+                distances[match] = distance
+    ranked = sorted(
+        distances, key=lambda match: (distances[match], -trie.weight(match), match)
+    )
+    return ranked[:limit]
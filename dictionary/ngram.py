@@ -0,0 +1,102 @@
+class NGramIndex:
+    """
+    Finds the words containing a substring through the n-grams (runs of `n`
+    characters) of every word: a word contains the substring only if it has all
+    of the substring's n-grams, so only those candidates are checked.
+    """
+
+    # Sorted results kept, so that paging through a search does not redo it.
+    SORTED_SEARCHES = 32
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.postings = {}
+        # Words shorter than n have no n-gram; there are few of them.
+        self.short_words = set()
+        self._sorted = {}
+
+    def grams(self, text: str) -> set[str]:
+        n = self.n
+        return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, word: str) -> None:
+        self._sorted = {}
+        if len(word) < self.n:
+            self.short_words.add(word)
+            return
+        for gram in self.grams(word):
+            self.postings.setdefault(gram, set()).add(word)
+
+    def remove(self, word: str) -> None:
+        self._sorted = {}
+        if len(word) < self.n:
+            self.short_words.discard(word)
+            return
+        for gram in self.grams(word):
+            words = self.postings.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self.postings[gram]
+
+    def with_words(self, words) -> "NGramIndex":
+        """
+        Returns a new index also holding `words`, leaving this one untouched. Only
+        the postings the words change are copied, the rest is shared, so readers
+        can keep searching this index while the new one is built.
+        """
+        index = NGramIndex(self.n)
+        index.postings = dict(self.postings)
+        index.short_words = self.short_words
+        copied = set()
+        for word in words:
+            if len(word) < self.n:
+                if index.short_words is self.short_words:
+                    index.short_words = set(self.short_words)
+                index.short_words.add(word)
+                continue
+            for gram in self.grams(word):
+                if gram not in copied:
+                    index.postings[gram] = set(index.postings.get(gram, ()))
+                    copied.add(gram)
+                index.postings[gram].add(word)
+        return index
+
+    def search_sorted(self, substring: str) -> list[str]:
+        """
+        Returns the words containing `substring` in lexicographic order. The
+        latest results are kept, so the next pages of a search are not sorted again.
+        """
+        sorted_searches = self._sorted
+        words = sorted_searches.get(substring)
+        if words is None:
+            words = sorted(self.search(substring))
+            if len(sorted_searches) >= self.SORTED_SEARCHES:
+                # Replaced rather than emptied, as readers may be using it.
+                sorted_searches = self._sorted = {}
+            sorted_searches[substring] = words
+        return words
+
+    def search(self, substring: str) -> set[str]:
+        """
+        Returns the words containing `substring`.
+        """
+        if len(substring) < self.n:
+            # Too short to have an n-gram: gather the n-grams that contain it instead.
+            words = {word for word in self.short_words if substring in word}
+            for gram, gram_words in self.postings.items():
+                if substring in gram:
+                    words |= gram_words
+            return words
+        candidates = sorted(
+            (self.postings.get(gram, set()) for gram in self.grams(substring)), key=len
+        )
+        words = set(candidates[0])
+        for gram_words in candidates[1:]:
+            words &= gram_words
+            if not words:
+                return words
+        if len(substring) > self.n:
+            # Having every n-gram does not mean having them in sequence.
+            words = {word for word in words if substring in word}
+        return words
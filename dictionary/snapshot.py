@@ -0,0 +1,65 @@
+import json
+import mmap
+import os
+import struct
+
+MAGIC = b"DICTTRIE1\n"
+HEADER_LENGTH = struct.Struct("<I")
+RECORD = struct.Struct("<QI")
+
+
+def save_snapshot(trie, path: str, version) -> int:
+    """
+    Writes every (word, weight) of `trie`, in lexicographic order, to a compact
+    binary file stamped with the storage `version` it was built from.
+    The file is written next to `path` and atomically renamed over it.
+    Returns the number of saved words.
+    """
+    header = json.dumps({"version": version}).encode("utf-8")
+    temp_path = path + ".tmp"
+    count = 0
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for word, weight in trie.items():
+            encoded = word.encode("utf-8")
+            f.write(RECORD.pack(weight, len(encoded)))
+            f.write(encoded)
+            count += 1
+    os.replace(temp_path, path)
+    return count
+
+
+def read_snapshot_version(path: str):
+    """
+    Returns the storage version a snapshot was built from, None if there is no
+    valid snapshot.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            return json.loads(f.read(length))["version"]
+    except (FileNotFoundError, struct.error, ValueError, KeyError):
+        return None
+
+
+def iter_snapshot(path: str):
+    """
+    Yields (word, weight) from a snapshot file through a memory map, in
+    lexicographic order.
+    """
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        offset = len(MAGIC)
+        (length,) = HEADER_LENGTH.unpack_from(data, offset)
+        offset += HEADER_LENGTH.size + length
+        end = len(data)
+        while offset < end:
+            weight, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            yield data[offset : offset + length].decode("utf-8"), weight
+            offset += length
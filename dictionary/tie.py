@@ -1,20 +1,393 @@
+import copy
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from enum import Enum
+from heapq import heappop, heappush
+from itertools import islice
+from operator import itemgetter
+
+# Each build worker gets this many partitions of the words, so that the parent
+# process creates the nodes of the first ones while the workers describe the rest.
+PARTITIONS_PER_WORKER = 4
+
+
+class TrieType(Enum):
+    STANDARD = "standard"
+    RADIX = "radix"
+
+
 class TrieNode:
+    __slots__ = ("children", "is_end_of_word", "weight", "max_weight")
+
     def __init__(self):
         self.children = {}
         self.is_end_of_word = False
+        self.weight = 0
+        self.max_weight = 0
+
+    def copy(self) -> "TrieNode":
+        node = TrieNode()
+        node.children = dict(self.children)
+        node.is_end_of_word = self.is_end_of_word
+        node.weight = self.weight
+        node.max_weight = self.max_weight
+        return node
+
+
+class BaseTrie(ABC):
+    """
+    Prefix search shared by the trie implementations. Subclasses provide
+    `_locate(prefix)`, `_children(node)`, `_labelled_children(node)` and
+    `_edges(node)`, the labelled children in lexicographic order.
+
+    Every word carries a weight and every node the highest weight found below
+    it (`max_weight`), which lets `top_k` visit only the best branches.
+    """
+
+    @abstractmethod
+    def _locate(self, prefix: str):
+        pass
+
+    @abstractmethod
+    def _children(self, node):
+        pass
+
+    @abstractmethod
+    def _labelled_children(self, node):
+        pass
+
+    @abstractmethod
+    def _edges(self, node):
+        pass
+
+    @abstractmethod
+    def _copy_path(self, word: str, owned: set):
+        """
+        Replaces, in this trie, the nodes an update of `word` would change with
+        copies, except those already copied, which are in `owned`.
+        """
+
+    def _evolve(self, items, update) -> "BaseTrie":
+        trie = copy.copy(self)
+        trie.root = self.root.copy()
+        owned = {trie.root}
+        for word, weight in items:
+            trie._copy_path(word, owned)
+            update(trie, word, weight)
+        return trie
+
+    def with_words(self, items) -> "BaseTrie":
+        """
+        Returns a new trie holding the (word, weight) pairs as `insert` would,
+        leaving this one untouched. Only the nodes on the way to the words are
+        copied, the rest is shared, so readers can keep walking this trie while
+        the new one is being built.
+        """
+        return self._evolve(items, BaseTrie._insert_weighted)
+
+    def with_word(self, word: str, weight: int = None) -> "BaseTrie":
+        return self.with_words([(word, weight)])
+
+    def with_weights(self, items) -> "BaseTrie":
+        """
+        Returns a new trie where each stored word of the (word, weight) pairs
+        weighs its new weight, leaving this one untouched.
+        """
+        return self._evolve(items, BaseTrie.set_weight)
+
+    def with_weight(self, word: str, weight: int) -> "BaseTrie":
+        return self.with_weights([(word, weight)])
+
+    def _insert_weighted(self, word: str, weight: int):
+        self.insert(word, weight)
+
+    @classmethod
+    def from_sorted(cls, words: list[str], weights: list[int]) -> "BaseTrie":
+        """
+        Builds a trie from distinct `words` in lexicographic order and their
+        `weights`. Inserting them in that order is faster than in any other, as
+        every word walks the nodes the previous one just created.
+        """
+        trie = cls()
+        for word, weight in zip(words, weights):
+            trie.insert(word, weight)
+        return trie
+
+    def _set_weight(self, path: list, existed: bool, weight: int = None):
+        """
+        Stores the weight of the word ending at `path[-1]` and fixes the
+        max-weight annotations of the nodes on the way to it.
+        """
+        node = path[-1]
+        old_weight = node.weight if existed else 0
+        if weight is None:
+            weight = old_weight
+        node.weight = weight
+        if weight >= old_weight:
+            for node in path:
+                if node.max_weight < weight:
+                    node.max_weight = weight
+        else:
+            self._refresh_max_weights(path)
 
+    def _refresh_max_weights(self, path: list):
+        for node in reversed(path):
+            best = node.weight if node.is_end_of_word else 0
+            for child in self._children(node):
+                if child.max_weight > best:
+                    best = child.max_weight
+            node.max_weight = best
 
-class Trie:
+    def collect_words(self, node, prefix: str, after: str = None):
+        """
+        Yields the words below `node` in lexicographic order, `prefix` being the
+        path of `node`. When `after` is given, only words greater than it are
+        yielded and the subtrees that come entirely before it are skipped.
+        """
+        for word, _ in self._walk(node, prefix, after):
+            yield word
+
+    def items(self):
+        """
+        Yields (word, weight) for every stored word, in lexicographic order.
+        """
+        for word, node in self._walk(self.root, ""):
+            yield word, node.weight
+
+    def stats(self) -> dict:
+        """
+        Returns the number of words and of nodes, walking the whole trie.
+        """
+        words = nodes = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            words += node.is_end_of_word
+            stack.extend(self._children(node))
+        return {"words": words, "nodes": nodes}
+
+    def _walk(self, node, prefix: str, after: str = None):
+        if node.is_end_of_word and (after is None or prefix > after):
+            yield prefix, node
+        parts = [prefix]
+        stack = [iter(self._edges(node))]
+        while stack:
+            edge = next(stack[-1], None)
+            if edge is None:
+                stack.pop()
+                parts.pop()
+                continue
+            label, child = edge
+            parts.append(label)
+            emit = child.is_end_of_word
+            if after is not None:
+                path = "".join(parts)
+                if after.startswith(path):
+                    emit = False
+                    if path == after:
+                        after = None
+                elif path < after:
+                    parts.pop()
+                    continue
+                else:
+                    after = None
+            if emit:
+                yield "".join(parts), child
+            stack.append(iter(self._edges(child)))
+
+    def starts_with(
+        self, prefix: str, limit: int = None, offset: int = 0, after: str = None
+    ):
+        """
+        Lazily yields the stored words starting with `prefix`, in lexicographic order.
+        limit/offset page through the matches; `after` resumes right after a
+        previously returned word without walking the words before it.
+        """
+        node, path = self._locate(prefix)
+        if node is None:
+            return iter(())
+        words = self.collect_words(node, path, after)
+        stop = None if limit is None else offset + limit
+        return islice(words, offset, stop)
+
+    def top_k(self, prefix: str, k: int) -> list[str]:
+        """
+        Returns the `k` heaviest words starting with `prefix`, heaviest first and
+        alphabetically among equal weights. Branches are expanded best-first by
+        their max weight, so only the nodes leading to the results are visited.
+        """
+        node, path = self._locate(prefix)
+        if node is None or k <= 0:
+            return []
+        words = []
+        heap = [(-node.max_weight, path, False, node)]
+        while heap and len(words) < k:
+            negative_weight, path, is_word, node = heappop(heap)
+            if is_word:
+                words.append(path)
+                continue
+            if node.is_end_of_word:
+                heappush(heap, (-node.weight, path, True, node))
+            for label, child in self._labelled_children(node):
+                heappush(heap, (-child.max_weight, path + label, False, child))
+        return words
+
+    def fuzzy(
+        self, word: str, max_distance: int, limit: int = None
+    ) -> list[tuple[str, int]]:
+        """
+        Returns (stored word, edit distance) for the words at most `max_distance`
+        insertions, deletions or substitutions away from `word`, closest first, then
+        most popular first. The trie is walked once with one Levenshtein row per node;
+        a branch is abandoned as soon as every cell of its row is over the limit.
+        """
+        size = len(word)
+        # Only the cells within `max_distance` of the diagonal can stay under the
+        # limit, the others are left at `over`.
+        over = max_distance + 1
+        matches = []
+        if self.root.is_end_of_word and size <= max_distance:
+            matches.append((size, -self.root.weight, ""))
+        first_row = [i if i <= max_distance else over for i in range(size + 1)]
+        stack = [(self.root, "", first_row)]
+        while stack:
+            node, prefix, parent_row = stack.pop()
+            for label, child in self._labelled_children(node):
+                row = parent_row
+                depth = len(prefix)
+                for ch in label:
+                    depth += 1
+                    previous = row
+                    row = [over] * (size + 1)
+                    best = row[0] = depth if depth < over else over
+                    for i in range(
+                        max(depth - max_distance, 1),
+                        min(depth + max_distance, size) + 1,
+                    ):
+                        cost = (
+                            previous[i - 1]
+                            if word[i - 1] == ch
+                            else previous[i - 1] + 1
+                        )
+                        if previous[i] < cost:
+                            cost = previous[i] + 1
+                        if row[i - 1] < cost:
+                            cost = row[i - 1] + 1
+                        row[i] = cost
+                        if cost < best:
+                            best = cost
+                    if best > max_distance:
+                        break
+                else:
+                    path = prefix + label
+                    if child.is_end_of_word and row[size] <= max_distance:
+                        matches.append((row[size], -child.weight, path))
+                    stack.append((child, path, row))
+        matches.sort()
+        return [(path, distance) for distance, _, path in matches[:limit]]
+
+    def weight(self, word: str) -> int:
+        node, path = self._locate(word)
+        if node is None or path != word or not node.is_end_of_word:
+            return None
+        return node.weight
+
+    def set_weight(self, word: str, weight: int) -> bool:
+        """
+        Changes the weight of a stored word. Returns False when the word is not stored.
+        """
+        path = self._path(word)
+        if path is None or not path[-1].is_end_of_word:
+            return False
+        self._set_weight(path, True, weight)
+        return True
+
+
+class Trie(BaseTrie):
     def __init__(self):
         self.root = TrieNode()
 
-    def insert(self, word: str):
+    def insert(self, word: str, weight: int = None):
+        """
+        Adds a word. `weight` defaults to the current weight of the word, or 0 for a
+        new one.
+        """
         node = self.root
+        path = [node]
         for ch in word:
             if ch not in node.children:
                 node.children[ch] = TrieNode()
             node = node.children[ch]
+            path.append(node)
+        existed = node.is_end_of_word
         node.is_end_of_word = True
+        self._set_weight(path, existed, weight)
+
+    def _attach(self, description: tuple):
+        # Creates the nodes of a `_describe` result below the root, a chain of
+        # nodes for every label.
+        labels, counts, weights, max_weights = description
+        root = self.root
+        root.max_weight = max(root.max_weight, max_weights[0])
+        stack = [[root.children, counts[0]]]
+        for i in range(1, len(labels)):
+            top = stack[-1]
+            children = top[0]
+            max_weight = max_weights[i]
+            for ch in labels[i]:
+                node = children[ch] = TrieNode()
+                node.max_weight = max_weight
+                children = node.children
+            weight = weights[i]
+            if weight is not None:
+                node.is_end_of_word = True
+                node.weight = weight
+            top[1] -= 1
+            if counts[i]:
+                stack.append([children, counts[i]])
+            else:
+                while stack and not stack[-1][1]:
+                    stack.pop()
+
+    def delete(self, word: str) -> bool:
+        """
+        Removes a word from the trie and prunes the nodes that no longer lead to any
+        word. Returns False when the word was not stored.
+        """
+        path = self._path(word)
+        if path is None or not path[-1].is_end_of_word:
+            return False
+        path[-1].is_end_of_word = False
+        path[-1].weight = 0
+        for i in range(len(word), 0, -1):
+            node = path[i]
+            if node.children or node.is_end_of_word:
+                break
+            del path[i - 1].children[word[i - 1]]
+        self._refresh_max_weights(path)
+        return True
+
+    def _copy_path(self, word: str, owned: set):
+        node = self.root
+        for ch in word:
+            child = node.children.get(ch)
+            if child is None:
+                return
+            if child not in owned:
+                node.children[ch] = child = child.copy()
+                owned.add(child)
+            node = child
+
+    def _path(self, word: str):
+        path = [self.root]
+        for ch in word:
+            node = path[-1].children.get(ch)
+            if node is None:
+                return None
+            path.append(node)
+        return path
 
     def search_prefix(self, prefix: str):
         node = self.root
@@ -24,16 +397,390 @@ class Trie:
             node = node.children[ch]
         return node
 
-    def collect_words(self, node, prefix: str):
-        words = []
-        if node.is_end_of_word:
-            words.append(prefix)
-        for ch, child in node.children.items():
-            words.extend(self.collect_words(child, prefix + ch))
-        return words
+    def _locate(self, prefix: str):
+        return self.search_prefix(prefix), prefix
 
-    def starts_with(self, prefix: str):
-        node = self.search_prefix(prefix)
-        if not node:
-            return []
-        return self.collect_words(node, prefix)
+    def _children(self, node):
+        return node.children.values()
+
+    def _labelled_children(self, node):
+        return node.children.items()
+
+    def _edges(self, node):
+        return sorted(node.children.items())
+
+
+class RadixNode:
+    """
+    A node of the compressed trie. `label` is the edge leading into the node,
+    `keys` holds the first character of every child edge in sorted order and
+    `nodes` the matching children, so a node costs two small objects instead of a dict.
+    """
+
+    __slots__ = ("label", "keys", "nodes", "is_end_of_word", "weight", "max_weight")
+
+    def __init__(self, label: str = "", is_end_of_word: bool = False):
+        self.label = label
+        self.keys = ""
+        self.nodes = None
+        self.is_end_of_word = is_end_of_word
+        self.weight = 0
+        self.max_weight = 0
+
+    def copy(self) -> "RadixNode":
+        node = RadixNode(self.label, self.is_end_of_word)
+        node.keys = self.keys
+        node.nodes = list(self.nodes) if self.nodes is not None else None
+        node.weight = self.weight
+        node.max_weight = self.max_weight
+        return node
+
+    def child(self, ch: str):
+        index = self.keys.find(ch)
+        if index < 0:
+            return None
+        return self.nodes[index]
+
+    def add_child(self, node: "RadixNode"):
+        ch = node.label[0]
+        if self.nodes is None:
+            self.keys = ch
+            self.nodes = [node]
+            return
+        index = bisect_left(self.keys, ch)
+        self.keys = self.keys[:index] + ch + self.keys[index:]
+        self.nodes.insert(index, node)
+
+    def replace_child(self, node: "RadixNode"):
+        self.nodes[self.keys.find(node.label[0])] = node
+
+    def remove_child(self, ch: str):
+        index = self.keys.find(ch)
+        self.keys = self.keys[:index] + self.keys[index + 1 :]
+        del self.nodes[index]
+        if not self.nodes:
+            self.nodes = None
+
+    def merge_with_only_child(self):
+        child = self.nodes[0]
+        self.label += child.label
+        self.keys = child.keys
+        self.nodes = child.nodes
+        self.is_end_of_word = child.is_end_of_word
+        self.weight = child.weight
+        self.max_weight = child.max_weight
+
+
+def _common_prefix_length(label: str, word: str, start: int) -> int:
+    length = 0
+    limit = min(len(label), len(word) - start)
+    while length < limit and label[length] == word[start + length]:
+        length += 1
+    return length
+
+
+def _groups(words: list[str], lo: int, hi: int, depth: int):
+    """
+    Splits the sorted words[lo:hi], all longer than `depth`, by their character
+    at `depth`. Yields (label, lo, hi, depth) for every group: the radix edge
+    leading to it, longest common prefix of the group from `depth` on, and where
+    it ends.
+    """
+    key = itemgetter(depth)
+    while lo < hi:
+        first = words[lo]
+        end = bisect_right(words, first[depth], lo, hi, key=key)
+        if end - lo == 1:
+            yield first[depth:], lo, end, len(first)
+        else:
+            last = words[end - 1]
+            i = depth + 1
+            stop = min(len(first), len(last))
+            while i < stop and first[i] == last[i]:
+                i += 1
+            yield first[depth:i], lo, end, i
+        lo = end
+
+
+def _describe(items: list) -> tuple:
+    """
+    Runs in a build worker. Sorts the (word, weight) pairs, none of them the empty
+    word, and describes the nodes of the radix trie they make, in preorder: their
+    labels, numbers of children, weights (None when not a word) and max weights,
+    the root first. Flat lists are far cheaper to send back than the nodes.
+    """
+    index = dict(items)
+    words = sorted(index)
+    weights = [index[word] or 0 for word in words]
+    labels, counts, node_weights, max_weights = [], [], [], []
+    stack = [("", 0, len(words), 0)]
+    while stack:
+        label, lo, hi, depth = stack.pop()
+        labels.append(label)
+        if hi - lo == 1 and len(words[lo]) == depth:
+            counts.append(0)
+            node_weights.append(weights[lo])
+            max_weights.append(weights[lo])
+            continue
+        max_weights.append(max(weights[lo:hi]))
+        if len(words[lo]) == depth:
+            node_weights.append(weights[lo])
+            lo += 1
+        else:
+            node_weights.append(None)
+        children = list(_groups(words, lo, hi, depth))
+        counts.append(len(children))
+        stack.extend(reversed(children))
+    return labels, counts, node_weights, max_weights
+
+
+def _partition(buckets: dict, parts: int) -> list[list]:
+    # Joins the buckets of consecutive first characters into about `parts`
+    # partitions of similar sizes, in lexicographic order.
+    target = sum(map(len, buckets.values())) / parts
+    partitions, current = [], []
+    for ch in sorted(buckets):
+        current += buckets[ch]
+        if len(current) >= target:
+            partitions.append(current)
+            current = []
+    if current:
+        partitions.append(current)
+    return partitions
+
+
+class RadixTrie(BaseTrie):
+    """
+    Compressed (radix) trie with the same interface as `Trie`. Chains of
+    single-child nodes are collapsed into one node with a multi-character label.
+    """
+
+    def __init__(self):
+        self.root = RadixNode()
+
+    def insert(self, word: str, weight: int = None):
+        """
+        Adds a word. `weight` defaults to the current weight of the word, or 0 for a
+        new one.
+        """
+        node = self.root
+        path = [node]
+        i = 0
+        while i < len(word):
+            child = node.child(word[i])
+            if child is None:
+                node = RadixNode(word[i:], True)
+                path[-1].add_child(node)
+                path.append(node)
+                self._set_weight(path, False, weight)
+                return
+            if word.startswith(child.label, i):
+                node = child
+                path.append(node)
+                i += len(child.label)
+                continue
+            common = _common_prefix_length(child.label, word, i)
+            middle = RadixNode(child.label[:common])
+            middle.max_weight = child.max_weight
+            child.label = child.label[common:]
+            middle.add_child(child)
+            node.replace_child(middle)
+            path.append(middle)
+            if i + common == len(word):
+                middle.is_end_of_word = True
+            else:
+                leaf = RadixNode(word[i + common :], True)
+                middle.add_child(leaf)
+                path.append(leaf)
+            self._set_weight(path, False, weight)
+            return
+        existed = node.is_end_of_word
+        node.is_end_of_word = True
+        self._set_weight(path, existed, weight)
+
+    @classmethod
+    def from_sorted(cls, words: list[str], weights: list[int]) -> "RadixTrie":
+        """
+        Builds a trie from distinct `words` in lexicographic order and their
+        `weights`: every node is created once, with its final label, children and
+        max_weight, instead of splitting edges as the words come.
+        """
+        trie = cls()
+        stack = [(trie.root, 0, len(words), 0)] if words else []
+        while stack:
+            node, lo, hi, depth = stack.pop()
+            node.max_weight = weights[lo] if hi - lo == 1 else max(weights[lo:hi])
+            if len(words[lo]) == depth:
+                node.is_end_of_word = True
+                node.weight = weights[lo]
+                lo += 1
+            if lo == hi:
+                continue
+            keys, nodes = [], []
+            for label, lo, end, length in _groups(words, lo, hi, depth):
+                child = RadixNode(label)
+                keys.append(label[0])
+                nodes.append(child)
+                stack.append((child, lo, end, length))
+            node.keys = "".join(keys)
+            node.nodes = nodes
+        return trie
+
+    def _attach(self, description: tuple):
+        # Creates the nodes of a `_describe` result below the root.
+        labels, counts, weights, max_weights = description
+        root = self.root
+        root.max_weight = max(root.max_weight, max_weights[0])
+        stack = [[root, list(root.keys), root.nodes or [], counts[0]]]
+        for i in range(1, len(labels)):
+            label = labels[i]
+            node = RadixNode(label)
+            weight = weights[i]
+            if weight is not None:
+                node.is_end_of_word = True
+                node.weight = weight
+            node.max_weight = max_weights[i]
+            top = stack[-1]
+            top[1].append(label[0])
+            top[2].append(node)
+            top[3] -= 1
+            if counts[i]:
+                stack.append([node, [], [], counts[i]])
+                continue
+            while stack and not stack[-1][3]:
+                parent, keys, nodes, _ = stack.pop()
+                parent.keys = "".join(keys)
+                parent.nodes = nodes
+
+    def delete(self, word: str) -> bool:
+        """
+        Removes a word and re-merges the edges the removal leaves with a single child.
+        Returns False when the word was not stored.
+        """
+        path = self._path(word)
+        if path is None or not path[-1].is_end_of_word:
+            return False
+        node = path[-1]
+        node.is_end_of_word = False
+        node.weight = 0
+        if len(path) > 1:
+            parent = path[-2]
+            if node.nodes is None:
+                parent.remove_child(node.label[0])
+                path.pop()
+                if (
+                    parent is not self.root
+                    and not parent.is_end_of_word
+                    and len(parent.nodes) == 1
+                ):
+                    parent.merge_with_only_child()
+            elif len(node.nodes) == 1:
+                node.merge_with_only_child()
+        self._refresh_max_weights(path)
+        return True
+
+    def _copy_path(self, word: str, owned: set):
+        # Also copies the edge `word` leaves in the middle of: inserting splits it.
+        node = self.root
+        i = 0
+        while i < len(word):
+            child = node.child(word[i])
+            if child is None:
+                return
+            if child not in owned:
+                child = child.copy()
+                node.replace_child(child)
+                owned.add(child)
+            if not word.startswith(child.label, i):
+                return
+            node = child
+            i += len(child.label)
+
+    def _path(self, word: str):
+        path = [self.root]
+        i = 0
+        while i < len(word):
+            child = path[-1].child(word[i])
+            if child is None or not word.startswith(child.label, i):
+                return None
+            path.append(child)
+            i += len(child.label)
+        return path
+
+    def _locate(self, prefix: str):
+        """
+        Returns the highest node whose path starts with `prefix`, along with that path.
+        """
+        node, i = self.root, 0
+        while i < len(prefix):
+            index = node.keys.find(prefix[i])
+            if index < 0:
+                return None, None
+            child = node.nodes[index]
+            if prefix.startswith(child.label, i):
+                node = child
+                i += len(child.label)
+                continue
+            if child.label.startswith(prefix[i:]):
+                return child, prefix[:i] + child.label
+            return None, None
+        return node, prefix
+
+    def search_prefix(self, prefix: str):
+        return self._locate(prefix)[0]
+
+    def _children(self, node):
+        return node.nodes or ()
+
+    def _edges(self, node):
+        return ((child.label, child) for child in node.nodes or ())
+
+    _labelled_children = _edges
+
+
+class TrieFactory:
+    @staticmethod
+    def trie_class(trie_type: TrieType = TrieType.STANDARD) -> type:
+        if trie_type == TrieType.STANDARD:
+            return Trie
+        elif trie_type == TrieType.RADIX:
+            return RadixTrie
+        else:
+            raise ValueError("Unsupported trie type")
+
+    @staticmethod
+    def create_trie(trie_type: TrieType = TrieType.STANDARD):
+        return TrieFactory.trie_class(trie_type)()
+
+    @staticmethod
+    def build_trie(trie_type: TrieType, items, workers: int = None):
+        """
+        Builds a trie from (word, weight) pairs in any order, as inserting them
+        would: a repeated word keeps its last weight, and None counts as 0. The
+        words are sorted and loaded in bulk (`from_sorted`).
+        With `workers` > 1, the words are split by first character among that many
+        processes, which sort them and describe their part of the trie, and this
+        process only creates the nodes, which no worker can do for it.
+        """
+        trie_class = TrieFactory.trie_class(trie_type)
+        if workers is None or workers < 2:
+            index = dict(items)
+            words = sorted(index)
+            return trie_class.from_sorted(words, [index[word] or 0 for word in words])
+        # Only imported when needed: it loads multiprocessing, slow to import.
+        from concurrent.futures import ProcessPoolExecutor
+
+        buckets = defaultdict(list)
+        for item in items:
+            buckets[item[0][:1]].append(item)
+        trie = trie_class()
+        empty = buckets.pop("", None)
+        if empty:
+            trie.root.is_end_of_word = True
+            trie.root.weight = trie.root.max_weight = empty[-1][1] or 0
+        if buckets:
+            with ProcessPoolExecutor(workers) as executor:
+                partitions = _partition(buckets, workers * PARTITIONS_PER_WORKER)
+                for description in executor.map(_describe, partitions):
+                    trie._attach(description)
+        return trie
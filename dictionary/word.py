@@ -1,28 +1,109 @@
-from models.words import WordModel
+import functools
+
+
+@functools.cache
+def _validators():
+    """
+    Imports pydantic on the first write instead of on startup: reads never validate.
+    Returns the WordModel class and a validator for lists of words.
+    """
+    from pydantic import TypeAdapter
+
+    from models.words import WordModel
+
+    return WordModel, TypeAdapter(list[WordModel])
 
 
 class WordCRUD:
     def __init__(self, db):
         self.db = db
 
-    def create(self, new_word: str, meanings: dict[str, str]) -> bool:
-        if not self.db.exists(new_word):
-            word_entry = WordModel(word=new_word, meanings=meanings)
-            self.db.write(word_entry.serialize())
-            return True
-        return False
+    def create(self, new_word: str, meanings: dict[str, str], weight: int = 0) -> bool:
+        word_model, _ = _validators()
+        word_entry = word_model(word=new_word, meanings=meanings, weight=weight)
+        return self.db.insert_if_absent(word_entry.serialize())
+
+    def create_many(self, entries: list[dict]) -> list[str]:
+        """
+        Validates and stores a batch of {"word", "meanings"[, "weight"]} entries
+        in one write. Words already stored, or repeated within the batch, are
+        skipped. Returns the words that were created.
+        """
+        _, word_list_adapter = _validators()
+        words = word_list_adapter.validate_python(entries)
+        existing = self.db.existing_keys([word.word for word in words])
+        created = {}
+        for word in words:
+            if word.word not in existing and word.word not in created:
+                created[word.word] = word.serialize()
+        self.db.insert_many(list(created.values()))
+        return list(created)
 
-    def get(self, key: str) -> str:
-        result = self.db.get_or_none(key)
+    def get(self, key: str, lang: str = None) -> dict:
+        """
+        With `lang`, the storage may leave out the meanings in other languages.
+        """
+        result = self.db.get_or_none(key, lang)
         if not result:
             raise Exception(f"The word '{key}' was not found!")
         return result
 
-    def update(self, key: str, lang: str, definition) -> None:
+    def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        return self.db.get_many(keys, lang)
+
+    def update(self, key: str, lang: str, definition) -> dict[str, str]:
+        """
+        Returns the meanings of the word after the update.
+        """
         word = self.get(key)
-        meanings = word.get("meanings", {})
+        # A copy: the stored entry may be shared with readers and the cache.
+        meanings = dict(word.get("meanings", {}))
         if isinstance(definition, dict):
             meanings.update(definition)
         else:
             meanings[lang] = definition
         self.db.update(key, {"meanings": meanings})
+        return meanings
+
+    def record_lookups(self, counts: dict[str, int]) -> None:
+        """
+        Adds each word's count of lookups to its weight, in a single write.
+        """
+        self.db.increment_amounts(counts, "weight")
+
+
+class AsyncWordCRUD:
+    """
+    WordCRUD for an AsyncDbInterface backend.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def create(
+        self, new_word: str, meanings: dict[str, str], weight: int = 0
+    ) -> bool:
+        word_model, _ = _validators()
+        word_entry = word_model(word=new_word, meanings=meanings, weight=weight)
+        return await self.db.insert_if_absent(word_entry.serialize())
+
+    async def get(self, key: str) -> dict:
+        result = await self.db.get_or_none(key)
+        if not result:
+            raise Exception(f"The word '{key}' was not found!")
+        return result
+
+    async def get_many(self, keys: list[str], lang: str = None) -> dict[str, dict]:
+        return await self.db.get_many(keys, lang)
+
+    async def update(self, key: str, lang: str, definition) -> None:
+        word = await self.get(key)
+        meanings = dict(word.get("meanings", {}))
+        if isinstance(definition, dict):
+            meanings.update(definition)
+        else:
+            meanings[lang] = definition
+        await self.db.update(key, {"meanings": meanings})
+
+    async def record_lookup(self, key: str, amount: int = 1) -> None:
+        await self.db.increment(key, "weight", amount)
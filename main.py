@@ -1,11 +1,52 @@
-from cli import actions_cli, create_dictionary_cli
+import argparse
 
+from cli import actions_cli, create_dictionary_cli, export_metrics, import_cli
+from server import serve_socket, serve_stdio
 
-def main():
-    dictionary = create_dictionary_cli()
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Dictionary CLI")
+    parser.add_argument(
+        "--db",
+        choices=["file", "log", "indexed", "sqlite", "mongo"],
+        help="database type, asked interactively when omitted",
+    )
+    commands = parser.add_subparsers(dest="command")
+    importer = commands.add_parser(
+        "import", help="import words from a CSV or JSONL file"
+    )
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "jsonl"], dest="file_format")
+    importer.add_argument("--chunk-size", type=int, default=1000)
+    server = commands.add_parser(
+        "serve", help="answer NDJSON requests from stdin or a socket"
+    )
+    server.add_argument(
+        "--socket", help="Unix socket path to listen on instead of stdin"
+    )
+    args = parser.parse_args(argv)
+
+    serving_socket = args.command == "serve" and args.socket
+    # The server answers searches from the start; elsewhere the trie waits for the
+    # first one.
+    dictionary = create_dictionary_cli(
+        args.db, thread_safe=bool(serving_socket), lazy_trie=args.command != "serve"
+    )
     if dictionary is None:
         return
-    actions_cli(dictionary)
+    if args.command == "import":
+        import_cli(dictionary, args.path, args.file_format, args.chunk_size)
+    elif args.command == "serve":
+        if serving_socket:
+            serve_socket(dictionary, args.socket)
+        else:
+            serve_stdio(dictionary)
+        dictionary.close()
+        dictionary.save_snapshot()
+        dictionary.save_index()
+        export_metrics(dictionary)
+    else:
+        actions_cli(dictionary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+from enum import Enum
+from typing import NamedTuple
+
+
+class LookupStatus(Enum):
+    FOUND = "found"
+    MISSING = "missing"
+    NO_MEANING = "no_meaning"
+
+
+class LookupResult(NamedTuple):
+    status: LookupStatus
+    meaning: str = None
@@ -1,5 +1,5 @@
 from enum import Enum
-from pymongo import MongoClient
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -12,6 +12,7 @@ class SupportedLanguage(Enum):
 class WordModel(BaseModel):
     word: str = Field(..., min_length=1)
     meanings: dict[str, str]
+    weight: int = Field(0, ge=0)
 
     @field_validator("meanings")
     def validate_meanings(cls, v):
@@ -21,5 +22,5 @@ class WordModel(BaseModel):
             raise ValueError("All keys and values in meanings must be strings.")
         return v
 
-    def serialize(self) -> dict[str, str]:
-        return {"word": self.word, "meanings": self.meanings}
+    def serialize(self) -> dict:
+        return {"word": self.word, "meanings": self.meanings, "weight": self.weight}
@@ -0,0 +1,241 @@
+"""
+Non-interactive mode: newline-delimited JSON requests in, one JSON response per
+request out, in the same order, over stdin/stdout or a Unix socket.
+
+    {"id": 1, "op": "get", "word": "hello", "lang": "en"}
+    {"id": 1, "ok": true, "result": "greeting"}
+
+Operations: get, add, update, search, complete, suggest, stats, refresh and batch, whose
+"requests" are answered together in one "result" list. Clients may send any
+number of requests without waiting for the responses: whatever arrived together
+is answered together in one write, and consecutive gets in the same language
+are looked up in one storage call.
+"""
+
+import gc
+import json
+import os
+import socketserver
+import sys
+
+from dictionary.dictionary import Dictionary
+from models.lookup import LookupStatus
+
+CHUNK_SIZE = 1 << 16
+_INVALID = object()
+
+
+def _get_error(word: str, lang: str, status: LookupStatus) -> str:
+    # Same messages as Dictionary.read.
+    if status == LookupStatus.MISSING:
+        return f"The word '{word}' was not found!"
+    return f"The word '{word}' does not have a definition in {lang}."
+
+
+def _handle_one(dictionary: Dictionary, request: dict):
+    op = request.get("op")
+    if op == "get":
+        return dictionary.read(request["word"], request["lang"])
+    if op == "add":
+        return dictionary.write(
+            request["word"], request["meanings"], request.get("weight", 0)
+        )
+    if op == "update":
+        dictionary.update(request["word"], request.get("lang"), request["meaning"])
+        return None
+    if op == "search":
+        return dictionary.search(
+            request.get("prefix", ""),
+            request.get("limit"),
+            request.get("offset", 0),
+            request.get("after"),
+        )
+    if op == "complete":
+        return dictionary.complete(request.get("prefix", ""), request.get("k", 10))
+    if op == "suggest":
+        return dictionary.suggest(
+            request["word"], request.get("max_distance", 2), request.get("limit")
+        )
+    if op == "stats":
+        return dictionary.stats()
+    if op == "refresh":
+        dictionary.refresh()
+        return None
+    if op == "batch":
+        return handle_requests(dictionary, request["requests"])
+    raise ValueError(f"Unknown operation: {op!r}")
+
+
+def _respond(request: dict, result=None, error: str = None) -> dict:
+    response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+    if error is None:
+        response["ok"] = True
+        response["result"] = result
+    else:
+        response["ok"] = False
+        response["error"] = error
+    return response
+
+
+def _is_get(request) -> bool:
+    return (
+        isinstance(request, dict)
+        and request.get("op") == "get"
+        and isinstance(request.get("word"), str)
+        and isinstance(request.get("lang"), str)
+    )
+
+
+def handle_requests(dictionary: Dictionary, requests: list) -> list[dict]:
+    """
+    Answers `requests` in order. Runs of gets in one language, each word at most
+    once, go through a single `read_many`; lookups are counted exactly as with `read`.
+    """
+    responses = []
+    i = 0
+    while i < len(requests):
+        request = requests[i]
+        if _is_get(request):
+            lang = request["lang"]
+            group = [request]
+            words = {request["word"]}
+            i += 1
+            while (
+                i < len(requests)
+                and _is_get(requests[i])
+                and requests[i]["lang"] == lang
+                and requests[i]["word"] not in words
+            ):
+                group.append(requests[i])
+                words.add(requests[i]["word"])
+                i += 1
+            try:
+                results = dictionary.read_many([get["word"] for get in group], lang)
+            except Exception as e:
+                responses.extend(_respond(get, error=str(e)) for get in group)
+                continue
+            for get in group:
+                result = results[get["word"]]
+                if result.status == LookupStatus.FOUND:
+                    responses.append(_respond(get, result.meaning))
+                else:
+                    responses.append(
+                        _respond(
+                            get, error=_get_error(get["word"], lang, result.status)
+                        )
+                    )
+            continue
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+            responses.append(_respond(request, _handle_one(dictionary, request)))
+        except KeyError as e:
+            responses.append(_respond(request, error=f"Missing field: {e.args[0]}"))
+        except Exception as e:
+            responses.append(_respond(request, error=str(e)))
+        i += 1
+    return responses
+
+
+def handle_lines(dictionary: Dictionary, lines: list[bytes]) -> bytes:
+    """
+    Answers the NDJSON request lines received together, returning the response lines.
+    """
+    requests = []
+    errors = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            requests.append(json.loads(line))
+        except ValueError as e:
+            requests.append(_INVALID)
+            errors.append(f"Invalid JSON: {e}")
+    errors = iter(errors)
+    responses = iter(
+        handle_requests(dictionary, [r for r in requests if r is not _INVALID])
+    )
+    out = []
+    for request in requests:
+        if request is _INVALID:
+            response = _respond(None, error=next(errors))
+        else:
+            response = next(responses)
+        out.append(json.dumps(response, ensure_ascii=False))
+    return ("\n".join(out) + "\n").encode("utf-8") if out else b""
+
+
+def serve_stream(dictionary: Dictionary, read, write) -> None:
+    """
+    Answers requests until `read(size)` returns b"". Each chunk is answered as a
+    whole, so a pipelined burst costs one write instead of one per request.
+    """
+    pending = b""
+    while True:
+        chunk = read(CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if lines:
+            write(handle_lines(dictionary, lines))
+    if pending.strip():
+        write(handle_lines(dictionary, [pending]))
+
+
+def _freeze_heap():
+    # The warm Dictionary lives as long as the server: keep the cyclic collector
+    # from rescanning it. Copy-on-write updates still free replaced nodes.
+    gc.collect()
+    gc.freeze()
+
+
+def serve_stdio(dictionary: Dictionary) -> None:
+    _freeze_heap()
+    stdin = sys.stdin.fileno()
+    stdout = sys.stdout.buffer
+
+    def write(data: bytes):
+        stdout.write(data)
+        stdout.flush()
+
+    serve_stream(dictionary, lambda size: os.read(stdin, size), write)
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        serve_stream(self.server.dictionary, self.request.recv, self.request.sendall)
+
+
+class DictionaryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves a Dictionary on a Unix socket, one thread per connection, so the
+    Dictionary must be thread-safe.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, dictionary: Dictionary):
+        if not dictionary.thread_safe:
+            raise ValueError(
+                "Serving a socket needs a Dictionary created with thread_safe=True."
+            )
+        if os.path.exists(path):
+            os.unlink(path)
+        self.dictionary = dictionary
+        super().__init__(path, _ConnectionHandler)
+        _freeze_heap()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve_socket(dictionary: Dictionary, path: str) -> None:
+    with DictionaryServer(path, dictionary) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,22 @@
 import sys
 import os
 
+import mongomock.filtering
+import pytest
+from bson import Timestamp
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture(autouse=True)
+def mongomock_timestamps(monkeypatch):
+    """
+    Teaches mongomock where the BSON timestamps DbMongo stamps revisions with
+    stand in the comparison order, right after dates, as MongoDB sorts them.
+    """
+    compare_type = mongomock.filtering._get_compare_type
+
+    def with_timestamps(value):
+        return 47 if isinstance(value, Timestamp) else compare_type(value)
+
+    monkeypatch.setattr(mongomock.filtering, "_get_compare_type", with_timestamps)
@@ -0,0 +1,178 @@
+import asyncio
+
+import mongomock
+import pytest
+
+from db.async_database import AsyncDbFile, AsyncDbLogFile, AsyncDbMongo, AsyncExecutorDb
+from db.database import DbLogFile
+from db.mongo import DbMongo
+from dictionary.async_dictionary import AsyncDictionary
+from models.lookup import LookupStatus
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    async def to_list(self, length):
+        return list(self.cursor)
+
+
+class AsyncCollection:
+    """
+    In-process stand-in for an asyncio MongoDB collection, backed by mongomock.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.calls = 0
+
+    def find(self, *args, **kwargs):
+        self.calls += 1
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncClient:
+    def __init__(self):
+        self.client = mongomock.MongoClient()
+        self.collections = {}
+
+    def __getitem__(self, db_name):
+        client = self
+
+        class Database:
+            def __getitem__(self, collection_name):
+                key = (db_name, collection_name)
+                if key not in client.collections:
+                    client.collections[key] = AsyncCollection(
+                        client.client[db_name][collection_name]
+                    )
+                return client.collections[key]
+
+        return Database()
+
+
+class SlowDb(DbLogFile):
+    def __init__(self, connection_string: str):
+        super().__init__(connection_string)
+        self.lookups = 0
+
+    def get_or_none(self, key: str) -> dict:
+        self.lookups += 1
+        return super().get_or_none(key)
+
+
+@pytest.fixture
+def mongo():
+    return AsyncDbMongo(
+        "mongodb://localhost:27017/", "testdb", "words", client=AsyncClient()
+    )
+
+
+def test_async_dictionary_on_mongo(mongo):
+    async def scenario():
+        dictionary = await AsyncDictionary.create(mongo)
+        assert await dictionary.write("hello", {"en": "greeting", "fa": "سلام"}) is True
+        assert await dictionary.write("hello", {"en": "hi"}) is False
+        assert await dictionary.write("help", {"en": "assistance"}) is True
+        assert await dictionary.read("hello", "en") == "greeting"
+        await dictionary.update("hello", "en", "hi")
+        assert await dictionary.read("hello", "en") == "hi"
+        assert await dictionary.search("hel") == ["hello", "help"]
+        with pytest.raises(Exception, match="was not found"):
+            await dictionary.read("missing", "en")
+        with pytest.raises(Exception, match="does not have a definition"):
+            await dictionary.read("help", "fe")
+        results = await dictionary.read_many(["help", "missing"], "en")
+        assert results["help"].meaning == "assistance"
+        assert results["missing"].status == LookupStatus.MISSING
+        await dictionary.flush()
+        assert (await mongo.get_or_none("hello"))["weight"] == 2
+        restarted = await AsyncDictionary.create(mongo)
+        assert await restarted.complete("hel", 2) == ["hello", "help"]
+
+    asyncio.run(scenario())
+
+
+def test_async_mongo_unique_index(mongo):
+    async def scenario():
+        await mongo.prepare()
+        assert await mongo.insert_if_absent({"word": "a", "meanings": {}}) is True
+        assert await mongo.insert_if_absent({"word": "a", "meanings": {}}) is False
+        found = await mongo.get_many(["a", "b"], "en")
+        assert found == {"a": {"word": "a", "meanings": {}}}
+
+    asyncio.run(scenario())
+
+
+def test_async_mongo_writes_are_seen_by_sync_processes(mongo, monkeypatch):
+    monkeypatch.setattr(
+        "db.mongo.MongoClient", lambda *args, **kwargs: mongo.client.client
+    )
+    sync = DbMongo("mongodb://localhost:27017/", "testdb", "words")
+
+    async def scenario():
+        await mongo.prepare()
+        await mongo.insert_if_absent({"word": "hello", "meanings": {"en": "greeting"}})
+        revision, entries = sync.changes_since(0)
+        assert revision == sync.version() > 0
+        assert entries == [{"word": "hello", "meanings": {"en": "greeting"}}]
+        await mongo.update("hello", {"meanings": {"en": "hi"}})
+        assert sync.changes_since(revision)[1] == [
+            {"word": "hello", "meanings": {"en": "hi"}}
+        ]
+        assert await mongo.get_or_none("hello") == {
+            "word": "hello",
+            "meanings": {"en": "hi"},
+        }
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reads_are_coalesced(tmp_path):
+    backend = SlowDb(str(tmp_path / "db.log"))
+    backend.write({"word": "hello", "meanings": {"en": "greeting"}, "weight": 0})
+
+    async def scenario():
+        dictionary = await AsyncDictionary.create(AsyncExecutorDb(backend))
+        meanings = await asyncio.gather(
+            *(dictionary.read("hello", "en") for _ in range(50))
+        )
+        assert meanings == ["greeting"] * 50
+        await dictionary.flush()
+        return dictionary
+
+    dictionary = asyncio.run(scenario())
+    assert backend.lookups < 50
+    assert backend.get_or_none("hello")["weight"] == 50
+    assert dictionary.trie.weight("hello") == 50
+
+
+@pytest.mark.parametrize("db_class", [AsyncDbFile, AsyncDbLogFile])
+def test_async_file_backends(tmp_path, db_class):
+    path = str(tmp_path / "db")
+
+    async def scenario():
+        dictionary = await AsyncDictionary.create(db_class(path))
+        created = await asyncio.gather(
+            *(dictionary.write(f"word{i}", {"en": str(i)}) for i in range(20))
+        )
+        assert all(created)
+        assert await dictionary.read("word7", "en") == "7"
+        await dictionary.flush()
+
+    asyncio.run(scenario())
+    if db_class is AsyncDbLogFile:
+        assert DbLogFile(path).get_or_none("word7")["weight"] == 1
+    else:
+        assert len(AsyncDbFile(path).db.get_whole_data()) == 20
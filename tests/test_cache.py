@@ -0,0 +1,206 @@
+import pytest
+import mongomock
+
+from db.cache import CachedDb
+from db.database import DbFactory, DbLogFile, DbSqlite, DbType
+from dictionary.dictionary import Dictionary
+
+
+class CountingDb(DbLogFile):
+    def __init__(self, connection_string: str):
+        super().__init__(connection_string)
+        self.lookups = 0
+
+    def get_or_none(self, key: str, lang: str = None) -> dict:
+        self.lookups += 1
+        return super().get_or_none(key, lang)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return CountingDb(str(tmp_path / "db.log"))
+
+
+def test_hits_are_served_from_cache(backend):
+    backend.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db = CachedDb(backend)
+    assert db.get_or_none("hello")["meanings"]["en"] == "greeting"
+    assert db.get_or_none("hello")["meanings"]["en"] == "greeting"
+    assert backend.lookups == 1
+    assert db.stats()["hits"] == 1
+    assert db.stats()["misses"] == 1
+
+
+def test_misses_are_cached(backend):
+    db = CachedDb(backend)
+    assert db.get_or_none("nothing") is None
+    assert not db.exists("nothing")
+    assert backend.lookups == 1
+
+
+def test_misses_not_cached_when_disabled(backend):
+    db = CachedDb(backend, cache_misses=False)
+    db.get_or_none("nothing")
+    db.get_or_none("nothing")
+    assert backend.lookups == 2
+
+
+def test_writes_invalidate(backend):
+    db = CachedDb(backend)
+    assert db.get_or_none("hello") is None
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    assert db.get_or_none("hello")["meanings"]["en"] == "greeting"
+    db.update("hello", {"meanings": {"en": "salutation"}})
+    assert db.get_or_none("hello")["meanings"]["en"] == "salutation"
+    db.increment("hello", "weight")
+    assert db.get_or_none("hello")["weight"] == 1
+    assert db.insert_if_absent({"word": "world", "meanings": {}}) is True
+    assert db.exists("world")
+
+
+def test_lru_eviction(backend):
+    for word in ["a", "b", "c"]:
+        backend.write({"word": word, "meanings": {}})
+    db = CachedDb(backend, capacity=2)
+    db.get_or_none("a")
+    db.get_or_none("b")
+    db.get_or_none("a")
+    db.get_or_none("c")
+    assert db.stats()["evictions"] == 1
+    lookups = backend.lookups
+    db.get_or_none("a")
+    assert backend.lookups == lookups
+    db.get_or_none("b")
+    assert backend.lookups == lookups + 1
+
+
+def test_ttl_expiry(backend, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("db.cache.time.monotonic", lambda: now[0])
+    backend.write({"word": "hello", "meanings": {}})
+    db = CachedDb(backend, ttl=10)
+    db.get_or_none("hello")
+    now[0] += 5
+    db.get_or_none("hello")
+    assert backend.lookups == 1
+    now[0] += 6
+    db.get_or_none("hello")
+    assert backend.lookups == 2
+
+
+def test_unknown_methods_reach_backend(backend):
+    db = CachedDb(backend)
+    db.write({"word": "hello", "meanings": {}})
+    assert db.log_records == 1
+    db.close()
+
+
+def test_factory_wraps_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr("db.mongo.MongoClient", mongomock.MongoClient)
+    db = DbFactory.create_db(
+        DbType.MONGO, "mongodb://localhost:27017/", "testdb", "cached", cache_size=100
+    )
+    assert isinstance(db, CachedDb)
+    assert db.capacity == 100
+    assert not isinstance(
+        DbFactory.create_db(DbType.FILE, str(tmp_path / "db.json")), CachedDb
+    )
+
+
+def test_entry_fetched_during_a_write_is_not_kept(backend):
+    db = CachedDb(backend)
+    get_or_none = backend.get_or_none
+
+    def racing_get(key: str) -> dict:
+        value = get_or_none(key)
+        # Another thread creates the word before this lookup stores its miss.
+        db.write({"word": key, "meanings": {"en": "greeting"}})
+        return value
+
+    backend.get_or_none = racing_get
+    assert db.get_or_none("hello") is None
+    backend.get_or_none = get_or_none
+    assert db.get_or_none("hello")["meanings"]["en"] == "greeting"
+
+
+def test_dictionary_over_cache(backend):
+    dictionary = Dictionary(CachedDb(backend))
+    dictionary.write("hello", {"en": "greeting"})
+    assert dictionary.read("hello", "en") == "greeting"
+    dictionary.update("hello", "en", "hi")
+    assert dictionary.read("hello", "en") == "hi"
+    lookups = backend.lookups
+    assert dictionary.read("hello", "en") == "hi"
+    assert backend.lookups == lookups
+    dictionary.flush_lookups()
+    assert backend.get_or_none("hello")["weight"] == 3
+    assert dictionary.db.get_or_none("hello")["weight"] == 3
+
+
+def test_get_many_uses_cache(backend):
+    backend.write({"word": "hello", "meanings": {"en": "greeting"}})
+    backend.write({"word": "world", "meanings": {"en": "planet"}})
+    db = CachedDb(backend)
+    db.get_or_none("hello")
+    found = db.get_many(["hello", "world", "moon"])
+    assert set(found) == {"hello", "world"}
+    lookups = backend.lookups
+    assert set(db.get_many(["hello", "world", "moon"])) == {"hello", "world"}
+    assert backend.lookups == lookups
+
+
+def test_prefix_results_are_cached_until_a_matching_word_is_added(monkeypatch):
+    monkeypatch.setattr("db.mongo.MongoClient", mongomock.MongoClient)
+    db = DbFactory.create_db(
+        DbType.MONGO,
+        "mongodb://localhost:27017/",
+        "testdb",
+        "prefixes",
+        prefix_cache_size=2,
+    )
+    dictionary = Dictionary(db, storage_search=True)
+    dictionary.write("hello", {"en": "greeting"})
+    queries = []
+    backend_search = db.db.keys_with_prefix
+    monkeypatch.setattr(
+        db.db,
+        "keys_with_prefix",
+        lambda *args: queries.append(args) or backend_search(*args),
+    )
+
+    assert dictionary.search("he") == ["hello"]
+    assert dictionary.search("he") == ["hello"]
+    assert dictionary.search("wo") == []
+    assert len(queries) == 2
+    dictionary.write("world", {"en": "planet"})
+    assert dictionary.search("he") == ["hello"]
+    assert dictionary.search("wo") == ["world"]
+    assert len(queries) == 3
+    assert db.stats()["prefix_hits"] == 2
+
+
+def test_prefix_search_only_offered_by_a_backend_that_has_it(tmp_path):
+    db = DbFactory.create_db(DbType.FILE, str(tmp_path / "db.json"), cache_size=10)
+    assert not hasattr(db, "keys_with_prefix")
+    with pytest.raises(ValueError):
+        Dictionary(db, storage_search=True)
+    with pytest.raises(ValueError):
+        DbFactory.create_db(
+            DbType.FILE, str(tmp_path / "db.json"), prefix_cache_size=10
+        )
+    db = CachedDb(DbSqlite(str(tmp_path / "db.sqlite3")))
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    assert db.keys_with_prefix("he") == ["hello"]
+
+
+def test_changes_of_other_processes_drop_cached_words(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    db = CachedDb(DbSqlite(path), capacity=10)
+    other = DbSqlite(path)
+    other.write({"word": "hello", "meanings": {"en": "greeting"}})
+    revision = db.revision()
+    assert db.get_or_none("hello")["meanings"] == {"en": "greeting"}
+    other.update("hello", {"meanings": {"en": "salutation"}})
+    assert db.get_or_none("hello")["meanings"] == {"en": "greeting"}
+    assert db.changes_since(revision)[0] == revision + 1
+    assert db.get_or_none("hello")["meanings"] == {"en": "salutation"}
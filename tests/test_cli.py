@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from cli import create_dictionary_cli, import_cli, mongo_client_options
+from db.database import DbFile, DbLogFile, DbSqlite, convert_json_to_indexed
+from dictionary.dictionary import Dictionary
+
+
+def test_import_csv(tmp_path):
+    source = tmp_path / "words.csv"
+    source.write_text(
+        "word,en,fa,weight\nhello,greeting,سلام,3\nworld,planet,,\n,orphan,,\n",
+        encoding="utf-8",
+    )
+    db = DbLogFile(str(tmp_path / "db.log"))
+    dictionary = Dictionary(db)
+    assert import_cli(dictionary, str(source), chunk_size=1) == 2
+    assert db.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "greeting", "fa": "سلام"},
+        "weight": 3,
+    }
+    assert db.get_or_none("world")["meanings"] == {"en": "planet"}
+
+
+def test_import_jsonl_skips_existing(tmp_path):
+    source = tmp_path / "words.jsonl"
+    lines = [
+        {"word": "hello", "meanings": {"en": "greeting"}},
+        {"word": "world", "meanings": {"en": "planet"}},
+    ]
+    source.write_text("\n".join(json.dumps(line) for line in lines), encoding="utf-8")
+    dictionary = Dictionary(DbLogFile(str(tmp_path / "db.log")))
+    dictionary.write("hello", {"en": "hi"})
+    assert import_cli(dictionary, str(source)) == 1
+    assert dictionary.read("hello", "en") == "hi"
+    assert dictionary.search("") == ["hello", "world"]
+
+
+def test_file_backends_keep_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    settings = (
+        "FILE_PATH",
+        "LOG_PATH",
+        "INDEXED_PATH",
+        "SQLITE_PATH",
+        "SNAPSHOT_PATH",
+        "INDEX_PATH",
+    )
+    for setting in settings:
+        monkeypatch.delenv(setting, raising=False)
+    DbFile("database.json").write({"word": "hello", "meanings": {"en": "greeting"}})
+    dictionary = create_dictionary_cli("log")
+    assert dictionary.write("world", {"en": "planet"}) is True
+    dictionary.close()
+    assert list(DbFile("database.json").get_whole_data()) == ["hello"]
+    assert list(DbLogFile("database.log").get_whole_data()) == ["world"]
+    convert_json_to_indexed("database.json", "database.idx")
+    dictionary = create_dictionary_cli("indexed")
+    assert dictionary.read("hello", "en") == "greeting"
+    dictionary.close()
+    dictionary = create_dictionary_cli("sqlite")
+    assert dictionary.write("sqlite", {"en": "database"}) is True
+    dictionary.close()
+    assert list(DbSqlite("database.sqlite3").get_whole_data()) == ["sqlite"]
+    assert list(DbFile("database.json").get_whole_data()) == ["hello"]
+
+
+def test_mongo_client_options(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+    monkeypatch.setenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000")
+    monkeypatch.delenv("MONGO_MIN_POOL_SIZE", raising=False)
+    assert mongo_client_options() == {
+        "maxPoolSize": 50,
+        "serverSelectionTimeoutMS": 2000,
+    }
+
+
+def test_startup_imports_only_what_it_needs():
+    # Only needed once Mongo is selected, a word is written or the trie is built
+    # in several processes.
+    modules = "{'pymongo', 'pydantic', 'concurrent.futures.process'}"
+    code = f"import sys, main; print(sorted({modules} & set(sys.modules)))"
+    root = Path(__file__).resolve().parent.parent
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert output.stdout.strip() == "[]"
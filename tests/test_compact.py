@@ -0,0 +1,60 @@
+from db.compact import CompactStorage
+
+
+ENTRIES = {
+    "hello": {
+        "word": "hello",
+        "meanings": {"en": "greeting", "fa": "سلام"},
+        "weight": 3,
+    },
+    "world": {"word": "world", "meanings": {"fe": "monde"}},
+    "sun": {"word": "sun", "weight": -2},
+    "moon": {"word": "moon", "meanings": {"en": ["satellite"]}},
+    "star": {"word": "star", "meanings": {}, "source": "import"},
+    "sky": {"word": "sky", "weight": 1 << 70},
+}
+
+
+def test_entries_read_back_as_stored():
+    storage = CompactStorage(ENTRIES)
+    assert storage == ENTRIES
+    assert list(storage) == list(ENTRIES)
+    assert storage["hello"] == ENTRIES["hello"]
+    assert storage.get("missing") is None
+    assert "sun" in storage and "missing" not in storage
+    # Every read builds a new entry.
+    assert storage["hello"] is not storage["hello"]
+
+
+def test_replaced_and_deleted_entries(monkeypatch):
+    monkeypatch.setattr("db.compact.MIN_GARBAGE_ROWS", 2)
+    storage = CompactStorage(ENTRIES)
+    old_rows, old_row = storage._rows, storage._rows.ids["hello"]
+    storage["hello"] = {"word": "hello", "meanings": {"de": "hallo"}, "weight": 4}
+    del storage["sun"]
+    storage["moon"] = {"word": "moon", "meanings": {"en": "satellite"}}
+    assert len(storage._rows.kinds) == 8
+    storage["star"] = storage["world"] = {"word": "star", "meanings": {}}
+    assert len(storage) == 5
+    assert storage["hello"] == {
+        "word": "hello",
+        "meanings": {"de": "hallo"},
+        "weight": 4,
+    }
+    assert storage["moon"] == {"word": "moon", "meanings": {"en": "satellite"}}
+    assert storage["world"] == {"word": "star", "meanings": {}}
+    # Rewritten without the replaced rows; a reader of the old ones still reads them.
+    assert len(storage._rows.kinds) == 5
+    assert old_rows.entry("hello", old_row) == ENTRIES["hello"]
+
+
+def test_word_weights():
+    storage = CompactStorage(ENTRIES)
+    assert list(storage.word_weights()) == [
+        ("hello", 3),
+        ("world", 0),
+        ("sun", -2),
+        ("moon", 0),
+        ("star", 0),
+        ("sky", 1 << 70),
+    ]
@@ -1,7 +1,21 @@
+import os
+import sqlite3
+
 import pytest
 import mongomock
 
-from db.database import DbFile, DbMongo, DbFactory, DbType
+from db.database import (
+    DbFactory,
+    DbFile,
+    DbIndexedFile,
+    DbLogFile,
+    DbMongo,
+    DbSqlite,
+    DbType,
+    convert_json_to_indexed,
+    convert_json_to_log,
+)
+from dictionary.word import WordCRUD
 
 
 @pytest.fixture
@@ -50,7 +64,7 @@ def test_dbfile_get_whole_data(temp_file):
 
 @pytest.fixture(autouse=True)
 def patch_mongo(monkeypatch):
-    monkeypatch.setattr("db.database.MongoClient", mongomock.MongoClient)
+    monkeypatch.setattr("db.mongo.MongoClient", mongomock.MongoClient)
 
 
 @pytest.fixture
@@ -74,6 +88,11 @@ def test_dbmongo_write_and_read(mongo_db):
     assert mongo_db.exists("hello")
     retrieved = mongo_db.get_or_none("hello")
     assert retrieved == data
+    mongo_db.update("hello", {"meanings": {"en": "greeting", "fa": "سلام"}})
+    assert mongo_db.get_or_none("hello", "fa") == {
+        "word": "hello",
+        "meanings": {"fa": "سلام"},
+    }
 
 
 def test_dbmongo_update(mongo_db):
@@ -132,3 +151,630 @@ def test_dbfactory_mongo_invalid():
 def test_dbfactory_invalid():
     with pytest.raises(ValueError):
         DbFactory.create_db("invalid", "dummy")
+
+
+def test_dbfile_increment(temp_file):
+    db = DbFile(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.increment("hello", "weight")
+    db.increment("hello", "weight", 2)
+    db.increment("missing", "weight")
+    assert DbFile(temp_file).get_or_none("hello")["weight"] == 3
+    assert not db.exists("missing")
+
+
+def test_dbmongo_increment(mongo_db):
+    mongo_db.write({"word": "hello", "meanings": {"en": "greeting"}, "weight": 1})
+    mongo_db.increment("hello", "weight")
+    assert mongo_db.get_or_none("hello")["weight"] == 2
+
+
+def test_dblogfile_write_update_and_replay(temp_file):
+    db = DbLogFile(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.write({"word": "world", "meanings": {"en": "planet"}})
+    db.update("hello", {"meanings": {"en": "salutation"}})
+    db.increment("hello", "weight", 2)
+    db.close()
+    with open(temp_file, encoding="utf-8") as f:
+        assert len(f.readlines()) == 4
+    reopened = DbLogFile(temp_file)
+    assert reopened.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "salutation"},
+        "weight": 2,
+    }
+    assert reopened.exists("world")
+    assert set(reopened.get_whole_data()) == {"hello", "world"}
+
+
+def test_dblogfile_ignores_torn_record(temp_file):
+    db = DbLogFile(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.close()
+    with open(temp_file, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "key": "wor')
+    reopened = DbLogFile(temp_file)
+    assert list(reopened.get_whole_data()) == ["hello"]
+    reopened.write({"word": "world", "meanings": {"en": "planet"}})
+    reopened.write({"word": "sun", "meanings": {"en": "star"}})
+    reopened.close()
+    assert list(DbLogFile(temp_file).get_whole_data()) == ["hello", "world", "sun"]
+
+
+def test_dblogfile_ends_an_unterminated_record(temp_file):
+    db = DbLogFile(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.close()
+    with open(temp_file, "rb+") as f:
+        f.truncate(f.seek(0, 2) - 1)
+    reopened = DbLogFile(temp_file)
+    reopened.write({"word": "world", "meanings": {"en": "planet"}})
+    reopened.close()
+    assert list(DbLogFile(temp_file).get_whole_data()) == ["hello", "world"]
+
+
+def test_dblogfile_compaction(temp_file):
+    db = DbLogFile(temp_file, compaction_ratio=2, compaction_min_records=10)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    for i in range(20):
+        db.update("hello", {"meanings": {"en": f"greeting {i}"}})
+    assert db.log_records < 10
+    db.close()
+    with open(temp_file, encoding="utf-8") as f:
+        assert len(f.readlines()) == db.log_records
+    assert DbLogFile(temp_file).get_or_none("hello")["meanings"]["en"] == "greeting 19"
+    assert not os.path.exists(temp_file + ".compact")
+
+
+def test_dblogfile_background_compaction(temp_file):
+    db = DbLogFile(
+        temp_file,
+        compaction_ratio=2,
+        compaction_min_records=10,
+        background_compaction=True,
+        fsync_interval=0.01,
+    )
+    for i in range(200):
+        db.write({"word": f"word{i % 5}", "meanings": {"en": str(i)}})
+    db.close()
+    reopened = DbLogFile(temp_file)
+    assert len(reopened.get_whole_data()) == 5
+    assert reopened.get_or_none("word4")["meanings"]["en"] == "199"
+
+
+def test_dblogfile_rejects_json_database(temp_file):
+    DbFile(temp_file).write({"word": "hello", "meanings": {"en": "greeting"}})
+    with open(temp_file, encoding="utf-8") as f:
+        content = f.read()
+    with pytest.raises(ValueError):
+        DbLogFile(temp_file)
+    with open(temp_file, encoding="utf-8") as f:
+        assert f.read() == content
+    assert DbFile(temp_file).exists("hello")
+
+
+def test_convert_json_to_log(tmp_path):
+    json_path = str(tmp_path / "database.json")
+    log_path = str(tmp_path / "database.log")
+    legacy = DbFile(json_path)
+    legacy.write({"word": "hello", "meanings": {"en": "greeting"}})
+    legacy.write({"word": "world", "meanings": {"en": "planet"}})
+    assert convert_json_to_log(json_path, log_path) == 2
+    db = DbLogFile(log_path)
+    assert db.get_or_none("hello") == {"word": "hello", "meanings": {"en": "greeting"}}
+    assert set(db.get_whole_data()) == {"hello", "world"}
+    assert DbFile(json_path).exists("world")
+
+
+def test_dbfactory_log(tmp_path):
+    db = DbFactory.create_db(DbType.LOG, str(tmp_path / "db.log"), fsync_interval=0)
+    assert isinstance(db, DbLogFile)
+    assert db.fsync_interval == 0
+
+
+def test_dbindexedfile_lookups(tmp_path):
+    path = str(tmp_path / "db.idx")
+    entries = [
+        ("apple", {"word": "apple", "meanings": {"en": "fruit"}}),
+        ("banana", {"word": "banana", "meanings": {"en": "fruit"}}),
+        ("سیب", {"word": "سیب", "meanings": {"en": "apple"}}),
+    ]
+    DbIndexedFile.build(path, entries)
+    db = DbIndexedFile(path)
+    assert db.count == 3
+    assert db.get_or_none("banana") == entries[1][1]
+    assert db.get_or_none("سیب")["meanings"]["en"] == "apple"
+    assert db.get_or_none("cherry") is None
+    assert db.exists("apple")
+    assert not db.exists("app")
+    assert db.get_whole_data() == dict(entries)
+
+
+def test_dbindexedfile_writes_and_merge(tmp_path):
+    path = str(tmp_path / "db.idx")
+    db = DbIndexedFile(path, merge_threshold=3)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.write({"word": "world", "meanings": {"en": "planet"}})
+    db.update("hello", {"meanings": {"en": "salutation"}})
+    assert db.count == 0
+    db.write({"word": "help", "meanings": {"en": "assistance"}})
+    assert db.count == 3
+    assert db.delta.storage == {}
+    db.increment("help", "weight")
+    db.close()
+    reopened = DbIndexedFile(path)
+    assert reopened.get_or_none("hello")["meanings"]["en"] == "salutation"
+    assert reopened.get_or_none("help")["weight"] == 1
+    assert list(reopened.keys_with_prefix("hel")) == ["hello", "help"]
+    assert list(reopened.keys_with_prefix("x")) == []
+
+
+def test_dbindexedfile_keys_with_prefix_pages_lazily(tmp_path):
+    path = str(tmp_path / "db.idx")
+    words = [f"a{i:03}" for i in range(0, 200, 2)]
+    DbIndexedFile.build(path, ((word, {"word": word}) for word in words))
+    db = DbIndexedFile(path)
+    db.write({"word": "a001", "meanings": {}})
+    db.update("a002", {"weight": 1})
+    assert list(db.keys_with_prefix("a", limit=4)) == ["a000", "a001", "a002", "a004"]
+    assert list(db.keys_with_prefix("a", limit=2, offset=1, after="a001")) == [
+        "a004",
+        "a006",
+    ]
+    assert list(db.keys_with_prefix("a19")) == ["a190", "a192", "a194", "a196", "a198"]
+    reads = []
+    key_at = db._key_at
+    db._key_at = lambda position: reads.append(position) or key_at(position)
+    assert list(db.keys_with_prefix("a", limit=3)) == ["a000", "a001", "a002"]
+    # The binary search, then only the keys the page needs.
+    assert len(reads) < 15
+    db.close()
+
+
+def test_convert_json_to_indexed(tmp_path):
+    json_path = str(tmp_path / "database.json")
+    indexed_path = str(tmp_path / "database.idx")
+    legacy = DbFile(json_path)
+    legacy.write({"word": "world", "meanings": {"en": "planet"}})
+    legacy.write({"word": "hello", "meanings": {"en": "greeting"}})
+    assert convert_json_to_indexed(json_path, indexed_path) == 2
+    db = DbFactory.create_db(DbType.INDEXED, indexed_path)
+    assert isinstance(db, DbIndexedFile)
+    assert db.get_or_none("hello") == {"word": "hello", "meanings": {"en": "greeting"}}
+    assert list(db.keys_with_prefix("")) == ["hello", "world"]
+
+
+def test_dbindexedfile_rejects_other_files(temp_file):
+    DbFile(temp_file).write({"word": "hello", "meanings": {"en": "greeting"}})
+    with pytest.raises(ValueError):
+        DbIndexedFile(temp_file)
+
+
+@pytest.mark.parametrize("db_class", [DbFile, DbLogFile, DbSqlite])
+def test_file_backends_insert_many(temp_file, db_class):
+    db = db_class(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.insert_many(
+        [
+            {"word": "hello", "meanings": {"en": "hi"}},
+            {"word": "world", "meanings": {"en": "planet"}},
+            {"word": "sun", "meanings": {"en": "star"}},
+        ]
+    )
+    assert db.existing_keys(["hello", "sun", "moon"]) == {"hello", "sun"}
+    if isinstance(db, DbLogFile):
+        db.close()
+    reopened = db_class(temp_file)
+    assert set(reopened.get_whole_data()) == {"hello", "world", "sun"}
+    assert reopened.get_or_none("hello")["meanings"]["en"] == "greeting"
+
+
+def test_dbindexedfile_insert_many(tmp_path):
+    path = str(tmp_path / "db.idx")
+    DbIndexedFile.build(
+        path, [("hello", {"word": "hello", "meanings": {"en": "greeting"}})]
+    )
+    db = DbIndexedFile(path)
+    db.insert_many(
+        [
+            {"word": "hello", "meanings": {"en": "hi"}},
+            {"word": "world", "meanings": {"en": "planet"}},
+        ]
+    )
+    assert db.get_or_none("hello")["meanings"]["en"] == "greeting"
+    assert db.existing_keys(["hello", "world", "sun"]) == {"hello", "world"}
+
+
+def test_dbmongo_insert_many(mongo_db):
+    mongo_db.insert_many(
+        [
+            {"word": "hello", "meanings": {"en": "greeting"}},
+            {"word": "world", "meanings": {"en": "planet"}},
+        ]
+    )
+    mongo_db.insert_many([])
+    assert mongo_db.existing_keys(["hello", "world", "moon"]) == {"hello", "world"}
+    assert mongo_db.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "greeting"},
+    }
+
+
+def test_dbmongo_creates_unique_word_index(mongo_db):
+    indexes = mongo_db.collection.index_information()
+    assert any(
+        index["key"] == [("word", 1)] and index.get("unique")
+        for index in indexes.values()
+    )
+
+
+def test_dbmongo_insert_if_absent(mongo_db):
+    data = {"word": "hello", "meanings": {"en": "greeting"}}
+    assert mongo_db.insert_if_absent(data) is True
+    assert (
+        mongo_db.insert_if_absent({"word": "hello", "meanings": {"en": "hi"}}) is False
+    )
+    assert mongo_db.get_or_none("hello") == data
+    assert "_id" not in data
+
+
+def test_dbmongo_insert_if_absent_race(mongo_db, monkeypatch):
+    # Another writer stores the word after this one found it missing.
+    monkeypatch.setattr(mongo_db, "exists", lambda key: False)
+    mongo_db.collection.insert_one({"word": "race", "meanings": {"en": "first"}})
+    crud = WordCRUD(mongo_db)
+    assert crud.create("race", {"en": "second"}) is False
+    assert mongo_db.collection.count_documents({"word": "race"}) == 1
+    assert mongo_db.get_or_none("race")["meanings"]["en"] == "first"
+
+
+def test_dbmongo_client_options(monkeypatch):
+    captured = {}
+
+    class RecordingClient(mongomock.MongoClient):
+        def __init__(self, *args, **kwargs):
+            captured.update(kwargs)
+            super().__init__(*args)
+
+    monkeypatch.setattr("db.mongo.MongoClient", RecordingClient)
+    DbFactory.create_db(
+        DbType.MONGO,
+        "mongodb://localhost:27017/",
+        "testdb",
+        "testcollection",
+        maxPoolSize=5,
+        serverSelectionTimeoutMS=100,
+    )
+    assert captured == {"maxPoolSize": 5, "serverSelectionTimeoutMS": 100}
+
+
+@pytest.mark.parametrize("db_class", [DbFile, DbLogFile])
+def test_file_backends_get_many(temp_file, db_class):
+    db = db_class(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.write({"word": "world", "meanings": {"en": "planet"}})
+    assert db.get_many(["world", "moon"], "en") == {
+        "world": {"word": "world", "meanings": {"en": "planet"}}
+    }
+    db.increment_many(["hello", "world", "moon"], "weight")
+    assert db.get_or_none("world")["weight"] == 1
+    assert not db.exists("moon")
+
+
+@pytest.mark.parametrize("db_class", [DbFile, DbLogFile, DbSqlite])
+def test_increment_amounts_in_one_write(tmp_path, db_class):
+    path = str(tmp_path / "db")
+    db = db_class(path)
+    db.insert_many(
+        [
+            {"word": "hello", "meanings": {"en": "greeting"}, "weight": 1},
+            {"word": "world", "meanings": {"en": "planet"}},
+        ]
+    )
+    db.increment_amounts({"hello": 3, "world": 1, "moon": 2}, "weight")
+    assert db.get_or_none("hello")["weight"] == 4
+    assert db.get_or_none("world")["weight"] == 1
+    assert not db.exists("moon")
+    db.close()
+    assert db_class(path).get_or_none("hello")["weight"] == 4
+
+
+def test_dbmongo_increment_amounts(mongo_db):
+    mongo_db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    mongo_db.write({"word": "world", "meanings": {"en": "planet"}})
+    mongo_db.increment_amounts({"hello": 3, "world": 1, "moon": 1}, "weight")
+    assert mongo_db.get_or_none("hello")["weight"] == 3
+    assert mongo_db.get_or_none("world")["weight"] == 1
+
+
+def test_dbmongo_get_many_projects_language(mongo_db):
+    mongo_db.write({"word": "hello", "meanings": {"en": "greeting", "fa": "سلام"}})
+    mongo_db.write({"word": "world", "meanings": {"fa": "دنیا"}})
+    found = mongo_db.get_many(["hello", "world", "moon"], "en")
+    assert found == {
+        "hello": {"word": "hello", "meanings": {"en": "greeting"}},
+        "world": {"word": "world", "meanings": {}},
+    }
+    assert mongo_db.get_many(["hello"])["hello"]["meanings"]["fa"] == "سلام"
+    mongo_db.increment_many(["hello", "world"], "weight", 2)
+    assert mongo_db.get_or_none("world")["weight"] == 2
+
+
+def test_dbfile_version_ignores_increments(temp_file):
+    db = DbFile(temp_file)
+    assert db.version() == 0
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.increment("hello", "weight")
+    assert db.version() == 1
+    db.update("hello", {"meanings": {"en": "hi"}})
+    assert db.version() == 2
+    assert DbFile(temp_file).version() == 2
+    assert list(db.iter_words()) == [("hello", 1)]
+
+
+def test_dblogfile_version_survives_compaction(temp_file):
+    db = DbLogFile(temp_file)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    db.write({"word": "world", "meanings": {"en": "planet"}})
+    db.increment("hello", "weight")
+    version = db.version()
+    db.compact()
+    assert db.version() == version
+    db.close()
+    assert DbLogFile(temp_file).version() == version
+
+
+def test_dbmongo_version_and_iter_words(mongo_db):
+    assert mongo_db.version() == 0
+    mongo_db.write({"word": "hello", "meanings": {"en": "greeting"}, "weight": 2})
+    version = mongo_db.version()
+    assert version == mongo_db.revision() > 0
+    mongo_db.insert_if_absent({"word": "hello", "meanings": {"en": "hi"}})
+    mongo_db.increment("hello", "weight")
+    assert mongo_db.version() == version
+    assert list(mongo_db.iter_words()) == [("hello", 3)]
+
+
+def test_dbindexedfile_version_ignores_increments(tmp_path):
+    path = str(tmp_path / "db.idx")
+    DbIndexedFile.build(
+        path, [("hello", {"word": "hello", "meanings": {"en": "greeting"}})]
+    )
+    db = DbIndexedFile(path)
+    version = db.version()
+    db.increment("hello", "weight")
+    db.increment_amounts({"hello": 2, "moon": 1}, "weight")
+    assert db.version() == version
+    assert db.get_or_none("hello")["weight"] == 3
+    assert not db.exists("moon")
+    db.update("hello", {"meanings": {"en": "hi"}})
+    assert db.version() != version
+
+
+def test_dbsqlite_entries_and_languages(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    db = DbFactory.create_db(DbType.SQLITE, path)
+    assert isinstance(db, DbSqlite)
+    assert db.version() == 0
+    assert db.insert_if_absent(
+        {"word": "hello", "meanings": {"en": "greeting", "fa": "سلام"}, "weight": 2}
+    )
+    assert not db.insert_if_absent({"word": "hello", "meanings": {"en": "hi"}})
+    db.write({"word": "world", "meanings": {"fa": "دنیا"}})
+    assert db.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "greeting", "fa": "سلام"},
+        "weight": 2,
+    }
+    assert db.get_or_none("moon") is None
+    assert db.get_or_none("hello", "fa") == {
+        "word": "hello",
+        "meanings": {"fa": "سلام"},
+        "weight": 2,
+    }
+    assert db.get_or_none("world", "en") == {
+        "word": "world",
+        "meanings": {},
+        "weight": 0,
+    }
+    assert db.get_or_none("moon", "en") is None
+    assert db.get_many(["hello", "world", "moon"], "en") == {
+        "hello": {"word": "hello", "meanings": {"en": "greeting"}, "weight": 2},
+        "world": {"word": "world", "meanings": {}, "weight": 0},
+    }
+    db.update("hello", {"meanings": {"en": "hi"}})
+    assert db.get_or_none("hello")["meanings"] == {"en": "hi"}
+    version = db.version()
+    db.increment_many(["hello", "world"], "weight")
+    db.increment("hello", "weight", 2)
+    assert db.version() == version
+    db.close()
+
+    reopened = DbSqlite(path)
+    assert reopened.version() == version
+    assert list(reopened.iter_words()) == [("hello", 5), ("world", 1)]
+    assert set(reopened.get_whole_data()) == {"hello", "world"}
+    with pytest.raises(ValueError):
+        reopened.increment("hello", "views")
+
+
+def test_dbsqlite_keys_with_prefix(tmp_path):
+    db = DbSqlite(str(tmp_path / "db.sqlite3"))
+    words = [
+        "he",
+        "hello",
+        "help",
+        "helm",
+        "hf",
+        "سلام",
+        "سیب",
+        "\U0010ffff",
+        "\U0010ffffa",
+    ]
+    db.insert_many([{"word": word, "meanings": {"en": word}} for word in words])
+    assert db.keys_with_prefix("hel") == ["hello", "helm", "help"]
+    assert db.keys_with_prefix("hel", limit=1, offset=1) == ["helm"]
+    assert db.keys_with_prefix("hel", after="helm") == ["help"]
+    assert db.keys_with_prefix("س") == ["سلام", "سیب"]
+    assert db.keys_with_prefix("\U0010ffff") == ["\U0010ffff", "\U0010ffffa"]
+    assert db.keys_with_prefix("", limit=2) == ["he", "hello"]
+    assert db.keys_with_prefix("x") == []
+
+
+def test_dbmongo_keys_with_prefix(mongo_db):
+    for word in ["he", "hello", "help", "a.b", "axb", "سلام"]:
+        mongo_db.write({"word": word, "meanings": {"en": word}})
+    assert mongo_db.keys_with_prefix("hel") == ["hello", "help"]
+    assert mongo_db.keys_with_prefix("a.") == ["a.b"]
+    assert mongo_db.keys_with_prefix("he", limit=1, offset=1) == ["hello"]
+    assert mongo_db.keys_with_prefix("he", after="hello") == ["help"]
+    assert mongo_db.keys_with_prefix("", limit=2) == ["a.b", "axb"]
+    assert mongo_db.keys_with_prefix("س") == ["سلام"]
+    assert mongo_db.keys_with_prefix("x") == []
+
+
+def test_dbfile_changes_of_another_process_are_replayed(temp_file):
+    first, second = DbFile(temp_file), DbFile(temp_file)
+    first.write({"word": "hello", "meanings": {"en": "greeting"}, "weight": 0})
+    second.write({"word": "world", "meanings": {"en": "planet"}, "weight": 0})
+    second.increment("hello", "weight", 2)
+    first.increment("hello", "weight")
+    assert first.changes_since(1) == (
+        2,
+        [{"word": "world", "meanings": {"en": "planet"}, "weight": 0}],
+    )
+    assert first.get_or_none("hello")["weight"] == 3
+    assert DbFile(temp_file).get_whole_data() == first.get_whole_data()
+    second.update("hello", {"meanings": {"en": "hi"}})
+    revision, entries = first.changes_since(2)
+    assert revision == first.version() == 3
+    assert entries == [{"word": "hello", "meanings": {"en": "hi"}, "weight": 3}]
+    # Revisions from before the file was opened are not known.
+    assert DbFile(temp_file).changes_since(0) is None
+
+
+def test_dbfile_changes_log_is_emptied(temp_file, monkeypatch):
+    monkeypatch.setattr(DbFile, "CHANGES_LOG_LIMIT", 1)
+    first, second = DbFile(temp_file), DbFile(temp_file)
+    first.write({"word": "hello", "meanings": {}})
+    assert [entry["word"] for entry in second.changes_since(0)[1]] == ["hello"]
+    first.write({"word": "help", "meanings": {}})
+    first.write({"word": "world", "meanings": {}})
+    with open(temp_file + ".changes", encoding="utf-8") as f:
+        assert f.read() == '{"revision": 3}\n'
+    # The log holding "help" is gone: the file is read again instead.
+    assert second.changes_since(1) is None
+    assert second.version() == 3
+    assert sorted(second.get_whole_data()) == ["hello", "help", "world"]
+    assert second.changes_since(3) == (3, [])
+
+
+def test_dbfile_keeps_only_the_latest_changes(temp_file, monkeypatch):
+    monkeypatch.setattr(DbFile, "CHANGES_KEPT", 4)
+    first, second = DbFile(temp_file), DbFile(temp_file)
+    for i in range(10):
+        first.write({"word": f"word{i}", "meanings": {}})
+    assert len(first._changes) <= 5
+    assert [entry["word"] for entry in second.changes_since(8)[1]] == ["word8", "word9"]
+    assert len(second._changes) <= 5
+    # Further back than what is kept: callers rebuild instead.
+    assert first.changes_since(1) is None
+    assert second.changes_since(1) is None
+
+
+def test_dbfile_compact_storage(temp_file, tmp_path):
+    plain_path = str(tmp_path / "plain.json")
+    compact, plain = DbFile(temp_file, compact=True), DbFile(plain_path)
+    for db in (compact, plain):
+        db.write({"word": "hello", "meanings": {"en": "greeting", "fa": "سلام"}})
+        db.insert_many(
+            [
+                {"word": "world", "meanings": {"en": "planet"}},
+                {"word": "sun", "meanings": {}},
+            ]
+        )
+        db.update("hello", {"weight": 2})
+        db.increment_many(["hello", "world"], "weight")
+    assert compact.get_whole_data() == plain.get_whole_data()
+    assert compact.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "greeting", "fa": "سلام"},
+        "weight": 3,
+    }
+    assert list(compact.iter_words()) == [("hello", 3), ("world", 1), ("sun", 0)]
+    # Saved exactly as the dict would be.
+    with open(temp_file, encoding="utf-8") as f, open(
+        plain_path, encoding="utf-8"
+    ) as g:
+        assert f.read() == g.read()
+    assert DbFile(temp_file, compact=True).get_whole_data() == plain.get_whole_data()
+
+
+def test_dbsqlite_changes_since(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    writer, reader = DbSqlite(path), DbSqlite(path)
+    writer.write({"word": "hello", "meanings": {"en": "greeting"}})
+    writer.insert_many(
+        [
+            {"word": "help", "meanings": {"en": "assistance"}},
+            {"word": "hello", "meanings": {}},
+        ]
+    )
+    writer.increment("hello", "weight")
+    assert reader.revision() == 2
+    assert reader.changes_since(1) == (
+        2,
+        [{"word": "help", "meanings": {"en": "assistance"}, "weight": 0}],
+    )
+    writer.update("hello", {"meanings": {"en": "hi"}})
+    assert reader.changes_since(2) == (
+        3,
+        [{"word": "hello", "meanings": {"en": "hi"}, "weight": 1}],
+    )
+    assert reader.changes_since(3) == (3, [])
+
+
+def test_dbsqlite_adds_revisions_to_an_older_database(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE words (word TEXT PRIMARY KEY, weight INTEGER) WITHOUT ROWID"
+    )
+    connection.execute("INSERT INTO words VALUES ('hello', 1)")
+    connection.commit()
+    connection.close()
+    db = DbSqlite(path)
+    assert db.changes_since(0) == (0, [])
+    db.write({"word": "help", "meanings": {}})
+    assert [entry["word"] for entry in db.changes_since(0)[1]] == ["help"]
+
+
+def test_dbmongo_changes_since(mongo_db):
+    assert mongo_db.changes_since(0) == (0, [])
+    mongo_db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    mongo_db.insert_many([{"word": "help", "meanings": {"en": "assistance"}}])
+    mongo_db.increment("hello", "weight")
+    assert mongo_db.get_or_none("hello") == {
+        "word": "hello",
+        "meanings": {"en": "greeting"},
+        "weight": 1,
+    }
+    revision, entries = mongo_db.changes_since(0)
+    assert revision == mongo_db.revision() > 0
+    assert sorted(entry["word"] for entry in entries) == ["hello", "help"]
+    assert mongo_db.changes_since(revision) == (revision, [])
+    # Writes in the same second still get a revision of their own.
+    revisions = []
+    for word in ["help", "hello", "help"]:
+        mongo_db.update(word, {"meanings": {"en": word}})
+        revisions.append(mongo_db.revision())
+    assert revision < revisions[0] < revisions[1] < revisions[2]
+    assert mongo_db.changes_since(revisions[0]) == (
+        revisions[2],
+        [
+            {"word": "hello", "meanings": {"en": "hello"}, "weight": 1},
+            {"word": "help", "meanings": {"en": "help"}},
+        ],
+    )
+    assert mongo_db.changes_since(revisions[2]) == (revisions[2], [])
@@ -1,3 +1,8 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
 import pytest
 
 
@@ -8,7 +13,7 @@ class FakeDb:
     def exists(self, key: str) -> bool:
         return key in self.data
 
-    def get_or_none(self, key: str) -> dict:
+    def get_or_none(self, key: str, lang: str = None) -> dict:
         return self.data.get(key)
 
     def get_whole_data(self):
@@ -17,14 +22,46 @@ class FakeDb:
     def write(self, data: dict):
         self.data[data["word"]] = data
 
+    def insert_if_absent(self, data: dict) -> bool:
+        if data["word"] in self.data:
+            return False
+        self.write(data)
+        return True
+
+    def existing_keys(self, keys: list[str]) -> set[str]:
+        return {key for key in keys if key in self.data}
+
+    def insert_many(self, data: list[dict]):
+        for entry in data:
+            self.data.setdefault(entry["word"], entry)
+
     def update(self, key: str, data: dict):
         if key in self.data:
             self.data[key].update(data)
         else:
             self.data[key] = data
 
+    def increment(self, key: str, field: str, amount: int = 1):
+        entry = self.data[key]
+        entry[field] = entry.get(field, 0) + amount
+
+    def get_many(self, keys: list[str], lang: str = None) -> dict:
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def increment_many(self, keys: list[str], field: str, amount: int = 1):
+        for key in keys:
+            self.increment(key, field, amount)
 
+    def increment_amounts(self, amounts: dict[str, int], field: str):
+        for key, amount in amounts.items():
+            self.increment(key, field, amount)
+
+
+from db.database import DbFile, DbIndexedFile, DbLogFile, DbSqlite
 from dictionary.dictionary import Dictionary
+from dictionary.snapshot import read_snapshot_version
+from dictionary.tie import RadixTrie, TrieType
+from models.lookup import LookupResult, LookupStatus
 
 
 def test_write_new_word():
@@ -137,7 +174,7 @@ class FakeDbList:
     def update(self, key: str, data: dict):
         pass
 
-    def get_or_none(self, key: str):
+    def get_or_none(self, key: str, lang: str = None):
         return None
 
 
@@ -157,7 +194,7 @@ class FakeDbDict:
     def update(self, key: str, data: dict):
         pass
 
-    def get_or_none(self, key: str):
+    def get_or_none(self, key: str, lang: str = None):
         return None
 
 
@@ -177,3 +214,591 @@ def test_update_trie_with_dict():
     assert "cherry" in results
     assert "date" in results
     assert len(results) == 2
+
+
+class CountingDb(FakeDb):
+    def __init__(self):
+        super().__init__()
+        self.whole_data_calls = 0
+
+    def get_whole_data(self):
+        self.whole_data_calls += 1
+        return super().get_whole_data()
+
+
+def test_write_and_update_do_not_rebuild_trie():
+    db = CountingDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.update("hello", "en", "hi")
+    assert db.whole_data_calls == 1
+    assert dictionary.search("he") == ["hello"]
+
+
+def test_search_with_radix_trie():
+    db = FakeDb()
+    dictionary = Dictionary(db, trie_type=TrieType.RADIX)
+    assert isinstance(dictionary.trie, RadixTrie)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.write("help", {"en": "assistance"})
+    assert sorted(dictionary.search("hel")) == ["hello", "help"]
+
+
+def test_search_pagination():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    for word in ["delta", "alpha", "charlie", "bravo", "echo"]:
+        dictionary.write(word, {"en": word})
+    assert dictionary.search("", limit=2) == ["alpha", "bravo"]
+    assert dictionary.search("", limit=2, offset=2) == ["charlie", "delta"]
+    assert dictionary.search("", limit=2, after="delta") == ["echo"]
+
+
+def test_complete_uses_write_weights():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"}, weight=3)
+    dictionary.write("help", {"en": "assistance"}, weight=8)
+    dictionary.write("helm", {"en": "wheel"})
+    assert dictionary.complete("hel", 2) == ["help", "hello"]
+    assert db.get_or_none("help")["weight"] == 8
+
+
+def test_read_records_lookups():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.write("help", {"en": "assistance"})
+    dictionary.read("help", "en")
+    dictionary.read("help", "en")
+    assert dictionary.complete("hel", 1) == ["help"]
+    # Counted in memory, and only written to the storage when flushed.
+    assert db.get_or_none("help")["weight"] == 0
+    dictionary.flush_lookups()
+    assert db.get_or_none("help")["weight"] == 2
+
+
+def test_read_without_recording_lookups():
+    db = FakeDb()
+    dictionary = Dictionary(db, record_lookups=False)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.read("hello", "en")
+    assert db.get_or_none("hello")["weight"] == 0
+
+
+def test_lookups_are_written_in_batches(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    dictionary = Dictionary(db, flush_interval=0)
+    dictionary.write_many(
+        [
+            {"word": "hello", "meanings": {"en": "greeting"}},
+            {"word": "help", "meanings": {"en": "aid"}},
+        ]
+    )
+    calls, saves = [], []
+    increment_amounts, save = db.increment_amounts, db._save
+    db.increment_amounts = lambda amounts, field: (
+        calls.append(dict(amounts)) or increment_amounts(amounts, field)
+    )
+    db._save = lambda: saves.append(1) or save()
+    for word in ["hello", "help", "hello"]:
+        dictionary.read(word, "en")
+    dictionary.read_many(["help", "hello"], "en")
+    assert calls == []
+    # Due on the next write, as flush_interval is 0.
+    dictionary.write("helm", {"en": "wheel"})
+    assert calls == [{"hello": 3, "help": 2}]
+    # One for the word, one for all the counts.
+    assert len(saves) == 2
+    assert DbFile(str(tmp_path / "db.json")).get_or_none("hello")["weight"] == 3
+
+
+def test_thread_safe_lookups_are_flushed_in_the_background():
+    db = FakeDb()
+    dictionary = Dictionary(db, thread_safe=True, flush_interval=0.01)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.read("hello", "en")
+    for _ in range(500):
+        if db.get_or_none("hello")["weight"] == 1:
+            break
+        threading.Event().wait(0.01)
+    dictionary.close()
+    assert db.get_or_none("hello")["weight"] == 1
+    assert dictionary.trie.weight("hello") == 1
+
+
+def test_weights_survive_restart():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.write("help", {"en": "assistance"})
+    dictionary.read("hello", "en")
+    dictionary.close()
+    restarted = Dictionary(db)
+    assert restarted.complete("hel", 2) == ["hello", "help"]
+
+
+def test_write_many():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    created = dictionary.write_many(
+        [
+            {"word": "help", "meanings": {"en": "assistance"}, "weight": 4},
+            {"word": "hello", "meanings": {"en": "hi"}},
+            {"word": "helm", "meanings": {"en": "wheel"}},
+            {"word": "helm", "meanings": {"en": "duplicate"}},
+        ]
+    )
+    assert created == ["help", "helm"]
+    assert dictionary.read("hello", "en") == "greeting"
+    assert db.get_or_none("helm")["meanings"]["en"] == "wheel"
+    assert dictionary.search("hel") == ["hello", "helm", "help"]
+    assert dictionary.complete("hel", 1) == ["help"]
+
+
+def test_write_many_validates_entries():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    with pytest.raises(Exception):
+        dictionary.write_many([{"word": "", "meanings": {"en": "empty"}}])
+    assert db.data == {}
+
+
+def test_read_many():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting", "fa": "سلام"})
+    dictionary.write("world", {"fa": "دنیا"})
+    results = dictionary.read_many(["world", "hello", "missing", "hello"], "en")
+    assert list(results) == ["world", "hello", "missing"]
+    assert results["hello"] == LookupResult(LookupStatus.FOUND, "greeting")
+    assert results["world"].status == LookupStatus.NO_MEANING
+    assert results["missing"] == LookupResult(LookupStatus.MISSING, None)
+    dictionary.flush_lookups()
+    assert db.get_or_none("hello")["weight"] == 1
+    assert db.get_or_none("world")["weight"] == 0
+    assert dictionary.trie.weight("hello") == 1
+
+
+def test_read_keeps_trie_weight_in_step_with_storage():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.read("hello", "en")
+    dictionary.read("hello", "en")
+    dictionary.flush_lookups()
+    assert dictionary.trie.weight("hello") == db.get_or_none("hello")["weight"] == 2
+
+
+def test_snapshot_skips_rebuild_when_storage_is_unchanged(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    dictionary = Dictionary(db, snapshot_path=snapshot_path)
+    dictionary.write("hello", {"en": "greeting"}, weight=3)
+    dictionary.write("سلام", {"en": "hello"})
+    dictionary.read("hello", "en")
+    dictionary.save_snapshot()
+
+    calls = []
+    db.iter_words = lambda: calls.append(1) or iter(())
+    reloaded = Dictionary(db, snapshot_path=snapshot_path)
+    assert calls == []
+    assert reloaded.search("") == ["hello", "سلام"]
+    assert reloaded.trie.weight("hello") == 4
+
+
+def test_snapshot_is_rebuilt_when_storage_changed(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    Dictionary(db, snapshot_path=snapshot_path).write("hello", {"en": "greeting"})
+    db.write({"word": "help", "meanings": {"en": "assistance"}})
+    dictionary = Dictionary(db, snapshot_path=snapshot_path)
+    assert dictionary.search("hel") == ["hello", "help"]
+    assert read_snapshot_version(snapshot_path) == db.version()
+
+
+def test_snapshot_holds_what_others_stored_before_saving(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    dictionary = Dictionary(DbSqlite(path), snapshot_path=snapshot_path)
+    dictionary.write("hello", {"en": "greeting"})
+    DbSqlite(path).write({"word": "world", "meanings": {"en": "planet"}})
+    dictionary.save_snapshot()
+    assert Dictionary(DbSqlite(path), snapshot_path=snapshot_path).search("") == [
+        "hello",
+        "world",
+    ]
+
+
+def test_snapshot_behind_the_storage_is_not_loaded(tmp_path):
+    # Without revisions the trie cannot catch up, so it is saved as built.
+    db = DbLogFile(str(tmp_path / "db.log"))
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    dictionary = Dictionary(db, snapshot_path=snapshot_path)
+    dictionary.write("hello", {"en": "greeting"})
+    db.write({"word": "world", "meanings": {"en": "planet"}})
+    dictionary.write("help", {"en": "aid"})
+    dictionary.save_snapshot()
+    assert read_snapshot_version(snapshot_path) != db.version()
+    assert Dictionary(db, snapshot_path=snapshot_path).search("") == [
+        "hello",
+        "help",
+        "world",
+    ]
+
+    dictionary = Dictionary(db, snapshot_path=snapshot_path)
+    dictionary.write("sun", {"en": "star"})
+    dictionary.save_snapshot()
+    assert read_snapshot_version(snapshot_path) == db.version()
+
+
+def test_build_workers(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    weights = {"hello": 3, "help": 5, "world": 1, "سلام": 2}
+    db.insert_many(
+        [
+            {"word": word, "meanings": {}, "weight": weight}
+            for word, weight in weights.items()
+        ]
+    )
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    for _ in range(2):
+        # Built from the storage, then loaded from the snapshot.
+        dictionary = Dictionary(db, snapshot_path=snapshot_path, build_workers=2)
+        assert dictionary.search("") == ["hello", "help", "world", "سلام"]
+        assert dictionary.complete("", 2) == ["help", "hello"]
+        dictionary.save_snapshot()
+    assert dictionary.search_suffix("lp") == ["help"]
+
+
+class VersionlessDb(FakeDb):
+    def version(self):
+        return None
+
+
+def test_snapshot_ignored_without_storage_version(tmp_path):
+    snapshot_path = tmp_path / "trie.snapshot"
+    db = VersionlessDb()
+    dictionary = Dictionary(db, snapshot_path=str(snapshot_path))
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.save_snapshot()
+    assert not snapshot_path.exists()
+
+
+def test_lazy_trie_is_built_on_first_search(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    db.write({"word": "hello", "meanings": {"en": "greeting"}, "weight": 1})
+    dictionary = Dictionary(db, lazy_trie=True)
+    assert dictionary._trie is None
+    assert dictionary.read("hello", "en") == "greeting"
+    assert dictionary.write("help", {"en": "assistance"}, weight=5)
+    assert dictionary._trie is None
+    assert dictionary.search("hel") == ["hello", "help"]
+    assert dictionary.trie.weight("hello") == 2
+    assert dictionary.complete("hel", 1) == ["help"]
+
+
+def test_lazy_trie_keeps_lookups_counted_before_loading_the_snapshot(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    Dictionary(db, snapshot_path=snapshot_path).write("hello", {"en": "greeting"})
+    dictionary = Dictionary(db, snapshot_path=snapshot_path, lazy_trie=True)
+    dictionary.read("hello", "en")
+    dictionary.read("hello", "en")
+    assert dictionary._trie is None
+    assert dictionary.trie.weight("hello") == 2
+
+    reloaded = Dictionary(db, snapshot_path=snapshot_path, lazy_trie=True)
+    reloaded.read("hello", "en")
+    reloaded.save_snapshot()
+    assert Dictionary(db, snapshot_path=snapshot_path).trie.weight("hello") == 3
+
+
+@pytest.mark.parametrize("db_class", [DbSqlite, DbIndexedFile])
+def test_storage_search_answers_without_the_trie(tmp_path, db_class):
+    dictionary = Dictionary(db_class(str(tmp_path / "db")), storage_search=True)
+    dictionary.write("hello", {"en": "greeting"}, weight=1)
+    dictionary.write_many([{"word": "help", "meanings": {"en": "aid"}, "weight": 5}])
+    assert dictionary.search("hel") == ["hello", "help"]
+    assert dictionary.search("hel", limit=1, after="hello") == ["help"]
+    assert dictionary._trie is None
+    assert dictionary.complete("hel", 1) == ["help"]
+
+
+def test_storage_search_does_not_track_lookups_for_the_trie(tmp_path):
+    snapshot_path = str(tmp_path / "trie.snapshot")
+    db = DbSqlite(str(tmp_path / "db.sqlite3"))
+    dictionary = Dictionary(db, snapshot_path=snapshot_path, storage_search=True)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.read("hello", "en")
+    dictionary.flush_lookups()
+    assert not dictionary._touched
+    dictionary.save_snapshot()
+    assert dictionary._trie is None
+    assert db.get_or_none("hello")["weight"] == 1
+
+
+def test_storage_search_needs_a_sorted_storage():
+    with pytest.raises(ValueError):
+        Dictionary(FakeDb(), storage_search=True)
+
+
+def test_suggest():
+    dictionary = Dictionary(FakeDb())
+    dictionary.write("hello", {"en": "greeting"}, weight=1)
+    dictionary.write("help", {"en": "assistance"}, weight=5)
+    dictionary.write("world", {"en": "planet"})
+    assert dictionary.suggest("helo", max_distance=1) == ["help", "hello"]
+    assert dictionary.suggest("hwlp", max_distance=1, limit=1) == ["help"]
+    assert dictionary.suggest("xyz", max_distance=1) == []
+
+
+def test_suggest_tries_the_other_keyboard_layout():
+    dictionary = Dictionary(FakeDb())
+    dictionary.write("سلام", {"en": "hello"})
+    dictionary.write("slam", {"en": "impact"})
+    # "sghl" is "سلام" typed with the Latin layout active.
+    assert dictionary.suggest("sghl", max_distance=0) == ["سلام"]
+    assert dictionary.suggest("سلاک", max_distance=1) == ["سلام"]
+    assert dictionary.suggest("سمشپ", max_distance=0) == ["slam"]
+
+
+def test_reverse_search_follows_writes_and_updates():
+    dictionary = Dictionary(FakeDb())
+    dictionary.write("hello", {"en": "a greeting", "fa": "سلام"})
+    assert dictionary.reverse_search("greeting", "en") == ["hello"]
+    dictionary.write("hi", {"en": "informal greeting"})
+    dictionary.write_many([{"word": "hey", "meanings": {"en": "informal call"}}])
+    assert dictionary.reverse_search("informal", "en") == ["hey", "hi"]
+    dictionary.update("hi", "en", "short salutation")
+    assert dictionary.reverse_search("greeting", "en") == ["hello"]
+    assert dictionary.reverse_search("سلام", "fa") == ["hello"]
+
+
+def test_reverse_index_is_persisted(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    index_path = str(tmp_path / "meanings.index")
+    dictionary = Dictionary(db, index_path=index_path)
+    dictionary.write("hello", {"en": "greeting"})
+    assert dictionary.reverse_search("greeting", "en") == ["hello"]
+    dictionary.write("hi", {"en": "greeting"})
+    dictionary.save_index()
+
+    db.get_whole_data = lambda: {}
+    assert Dictionary(db, index_path=index_path).reverse_search("greeting", "en") == [
+        "hello",
+        "hi",
+    ]
+
+
+def test_saved_index_holds_what_others_stored_before_saving(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    index_path = str(tmp_path / "meanings.index")
+    dictionary = Dictionary(DbSqlite(path), index_path=index_path)
+    dictionary.write("hello", {"en": "greeting"})
+    assert dictionary.reverse_search("greeting", "en") == ["hello"]
+    DbSqlite(path).write({"word": "hi", "meanings": {"en": "greeting"}})
+    dictionary.save_index()
+    reloaded = Dictionary(DbSqlite(path), index_path=index_path)
+    assert reloaded.reverse_search("greeting", "en") == ["hello", "hi"]
+
+
+def test_search_contains_and_suffix():
+    db = FakeDb()
+    for word in ["کتاب", "کتابها", "درختها", "hello", "shell"]:
+        db.write({"word": word, "meanings": {"en": word}})
+    dictionary = Dictionary(db, trie_type=TrieType.RADIX)
+    assert dictionary.search_contains("ell") == ["hello", "shell"]
+    assert dictionary.search_suffix("ها") == ["کتابها", "درختها"]
+    dictionary.write("گلها", {"en": "flowers"})
+    dictionary.write_many([{"word": "bell", "meanings": {"en": "bell"}}])
+    assert dictionary.search_suffix("ها") == ["کتابها", "درختها", "گلها"]
+    assert dictionary.search_contains("ell") == ["bell", "hello", "shell"]
+    assert dictionary.search_contains("ell", limit=1, offset=1) == ["hello"]
+    assert dictionary.search_contains("ell", limit=5, after="hello") == ["shell"]
+    assert dictionary.search_suffix("ها", limit=1, after="کتابها") == ["درختها"]
+
+
+@pytest.mark.parametrize("trie_type", [TrieType.STANDARD, TrieType.RADIX])
+def test_thread_safe_stress(tmp_path, trie_type):
+    db = DbFile(str(tmp_path / "db.json"))
+    dictionary = Dictionary(db, trie_type=trie_type, thread_safe=True)
+    dictionary.write("seed", {"en": "seed"})
+    errors = []
+    stop = threading.Event()
+
+    def writer(prefix: str):
+        try:
+            for i in range(40):
+                dictionary.write(f"{prefix}{i:02}", {"en": f"meaning {i}"})
+                dictionary.update(f"{prefix}{i:02}", "fa", "معنی")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            while not stop.is_set():
+                assert dictionary.read("seed", "en") == "seed"
+                found = dictionary.search("w")
+                # A published trie is complete: no gaps within a writer's sequence.
+                for prefix in ("wa", "wb"):
+                    numbers = [
+                        int(word[2:]) for word in found if word.startswith(prefix)
+                    ]
+                    assert numbers == list(range(len(numbers)))
+                dictionary.complete("", 5)
+                dictionary.search_suffix("9")
+                dictionary.search_contains("a1")
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [
+        threading.Thread(target=writer, args=(prefix,)) for prefix in ("wa", "wb")
+    ]
+    # Switch threads as often as possible to provoke interleavings.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    dictionary.close()
+    assert len(dictionary.search("w")) == 80
+    assert dictionary.search_contains("a3") == [f"wa3{i}" for i in range(10)]
+    assert dictionary.trie.weight("seed") == db.get_or_none("seed")["weight"]
+    assert DbFile(str(tmp_path / "db.json")).get_or_none("wb39")["meanings"] == {
+        "en": "meaning 39",
+        "fa": "معنی",
+    }
+
+
+def test_update_leaves_an_entry_held_by_a_reader_unchanged(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    dictionary = Dictionary(db)
+    dictionary.write("hello", {"en": "greeting"})
+    held = db.get_or_none("hello")
+    dictionary.update("hello", "en", "salutation")
+    assert held["meanings"] == {"en": "greeting"}
+    assert dictionary.read("hello", "en") == "salutation"
+
+
+def test_thread_safe_writes_do_not_touch_a_trie_being_walked():
+    dictionary = Dictionary(FakeDb(), thread_safe=True)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.write("world", {"en": "planet"})
+    trie = dictionary.trie
+    walk = trie.starts_with("")
+    assert next(walk) == "hello"
+    dictionary.write("help", {"en": "assistance"})
+    dictionary.read("world", "en")
+    dictionary.flush_lookups()
+    assert list(walk) == ["world"]
+    assert trie.weight("world") == 0
+    assert dictionary.search("") == ["hello", "help", "world"]
+    assert dictionary.trie.weight("world") == 1
+
+
+def test_thread_safe_word_searches_do_not_wait_on_writers():
+    db = FakeDb()
+    for word in ["hello", "shell", "bells"]:
+        db.write({"word": word, "meanings": {"en": word}})
+    dictionary = Dictionary(db, thread_safe=True)
+    assert dictionary.search_contains("ell") == ["bells", "hello", "shell"]
+    ngram_index = dictionary.ngram_index
+    dictionary.write("cells", {"en": "cells"})
+    assert ngram_index.search("ell") == {"bells", "hello", "shell"}
+    with dictionary._lock:
+        assert dictionary.search_contains("ell", limit=2) == ["bells", "cells"]
+        assert dictionary.search_suffix("lls") == ["bells", "cells"]
+    assert ngram_index.search_sorted("ell") is ngram_index.search_sorted("ell")
+
+
+def test_refresh_applies_only_what_other_processes_changed(tmp_path):
+    path = str(tmp_path / "db.json")
+    writer = Dictionary(DbFile(path))
+    writer.write("hello", {"en": "greeting"})
+    db = DbFile(path)
+    dictionary = Dictionary(db, thread_safe=True)
+    assert dictionary.reverse_search("greeting", "en") == ["hello"]
+    calls = []
+    db.iter_words = lambda: calls.append(1) or iter(())
+
+    writer.write("help", {"en": "assistance"}, weight=2)
+    writer.update("hello", "en", "salutation")
+    writer.read("hello", "en")
+    writer.flush_lookups()
+    assert dictionary.search("hel") == ["hello"]
+    dictionary.refresh()
+    assert calls == []
+    assert dictionary.search("hel") == ["hello", "help"]
+    assert dictionary.complete("hel", 1) == ["help"]
+    assert dictionary.trie.weight("hello") == 1
+    assert dictionary.reverse_search("salutation", "en") == ["hello"]
+    assert dictionary.reverse_search("greeting", "en") == []
+
+
+def test_refresh_rebuilds_without_revisions():
+    db = FakeDb()
+    dictionary = Dictionary(db)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    dictionary.refresh()
+    assert dictionary.search("") == ["hello"]
+
+
+def test_refresh_interval(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    with pytest.raises(ValueError):
+        Dictionary(DbSqlite(path), refresh_interval=0.01)
+    with pytest.raises(ValueError):
+        Dictionary(FakeDb(), thread_safe=True, refresh_interval=0.01)
+    dictionary = Dictionary(DbSqlite(path), thread_safe=True, refresh_interval=0.01)
+    DbSqlite(path).write({"word": "hello", "meanings": {"en": "greeting"}})
+    for _ in range(500):
+        if dictionary.search("") == ["hello"]:
+            break
+        threading.Event().wait(0.01)
+    dictionary.close()
+    assert dictionary.search("") == ["hello"]
+
+
+WRITER = """
+from db.database import DbFile
+from dictionary.dictionary import Dictionary
+dictionary = Dictionary(DbFile({path!r}), lazy_trie=True)
+for i in range(20):
+    dictionary.write(f"{name}{{i}}", {{"en": {name!r}}})
+    dictionary.read("seed", "en")
+dictionary.close()
+"""
+
+
+def test_processes_sharing_a_file_lose_no_change(tmp_path):
+    path = str(tmp_path / "db.json")
+    dictionary = Dictionary(DbFile(path))
+    dictionary.write("seed", {"en": "seed"})
+    root = Path(__file__).resolve().parent.parent
+    writers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WRITER.format(path=path, name=name)], cwd=root
+        )
+        for name in ("a", "b")
+    ]
+    for writer in writers:
+        assert writer.wait(timeout=60) == 0
+
+    dictionary.refresh()
+    assert dictionary.search("a") == sorted(f"a{i}" for i in range(20))
+    assert len(dictionary.search("b")) == 20
+    stored = DbFile(path)
+    assert len(stored.get_whole_data()) == 41
+    assert stored.get_or_none("seed")["weight"] == 40
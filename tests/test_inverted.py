@@ -0,0 +1,40 @@
+from dictionary.inverted import InvertedIndex, tokenize
+
+
+def test_tokenize_normalizes_persian_script():
+    assert tokenize("كتابِ من، مي‌روم ۱۲") == ["کتاب", "من", "میروم", "12"]
+    assert tokenize("Hello-World!") == ["hello", "world"]
+
+
+def test_search_intersects_tokens():
+    index = InvertedIndex()
+    index.add("hello", {"en": "a friendly greeting", "fa": "سلام"})
+    index.add("hi", {"en": "informal greeting"})
+    index.add("bye", {"en": "a farewell"})
+    assert index.search("greeting", "en") == ["hello", "hi"]
+    assert index.search("Friendly greeting", "en") == ["hello"]
+    assert index.search("greeting farewell", "en") == []
+    assert index.search("greeting", "fa") == []
+    assert index.search("سلام", "fa") == ["hello"]
+    assert index.search("", "en") == []
+
+
+def test_add_replaces_previous_meanings():
+    index = InvertedIndex()
+    index.add("hello", {"en": "greeting"})
+    index.add("hello", {"en": "salutation"})
+    assert index.search("greeting", "en") == []
+    assert index.search("salutation", "en") == ["hello"]
+    index.remove("hello")
+    assert index.postings == {"en": {}}
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "meanings.index")
+    index = InvertedIndex()
+    index.add("hello", {"en": "greeting", "fa": "درود"})
+    index.save(path, 3)
+    assert InvertedIndex.load(path, 4) is None
+    loaded = InvertedIndex.load(path, 3)
+    assert loaded.search("درود", "fa") == ["hello"]
+    assert InvertedIndex.load(str(tmp_path / "missing"), 3) is None
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from db.cache import CachedDb
+from db.database import DbFile, DbSqlite
+from db.metrics import Histogram, InstrumentedDb, Metrics
+from dictionary.dictionary import Dictionary
+from test_dictionary import FakeDb
+
+
+def test_histogram_percentiles_within_a_bucket():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.count == 100
+    assert histogram.max == 0.1
+    for percent, exact in [(50, 0.050), (95, 0.095), (99, 0.099)]:
+        assert exact <= histogram.percentile(percent) <= exact * 1.1
+    assert Histogram().percentile(99) == 0.0
+
+
+def test_metrics_count_errors():
+    metrics = Metrics()
+    double = metrics.timed("op", lambda x: x * 2)
+    assert double(21) == 42
+    with pytest.raises(TypeError):
+        double(None)
+    summary = metrics.snapshot()["op"]
+    assert summary["count"] == 2
+    assert summary["errors"] == 1
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_instrumented_db_times_every_call(tmp_path):
+    metrics = Metrics()
+    db = InstrumentedDb(DbFile(str(tmp_path / "db.json")), metrics)
+    db.write({"word": "hello", "meanings": {"en": "greeting"}})
+    assert db.get_or_none("hello")["meanings"] == {"en": "greeting"}
+    assert db.get_many(["hello", "nope"]).keys() == {"hello"}
+    assert list(db.iter_words()) == [("hello", 0)]
+    operations = metrics.snapshot()
+    assert {name: summary["count"] for name, summary in operations.items()} == {
+        "db.get_many": 1,
+        "db.get_or_none": 1,
+        "db.iter_words": 1,
+        "db.write": 1,
+    }
+
+
+def test_instrumented_db_wraps_a_backend_without_revisions():
+    metrics = Metrics()
+    dictionary = Dictionary(FakeDb(), metrics=metrics)
+    dictionary.write("hello", {"en": "greeting"})
+    assert dictionary.search("he") == ["hello"]
+    assert dictionary.db.revision() is None
+    assert dictionary.db.changes_since(0) is None
+    assert "db.revision" not in metrics.snapshot()
+
+
+def test_dictionary_stats(tmp_path):
+    metrics = Metrics()
+    db = CachedDb(DbFile(str(tmp_path / "db.json")), capacity=10)
+    dictionary = Dictionary(db, metrics=metrics)
+    dictionary.write("hello", {"en": "greeting"})
+    dictionary.write("help", {"en": "aid"})
+    assert dictionary.read("hello", "en") == "greeting"
+    with pytest.raises(Exception):
+        dictionary.read("nope", "en")
+    assert dictionary.search("he") == ["hello", "help"]
+
+    stats = dictionary.stats()
+    assert stats["trie"] == {"words": 2, "nodes": 7}
+    assert stats["cache"]["capacity"] == 10
+    operations = stats["operations"]
+    assert operations["dictionary.read"]["count"] == 2
+    assert operations["dictionary.read"]["errors"] == 1
+    assert operations["dictionary.write"]["count"] == 2
+    assert operations["dictionary.update_trie"]["count"] == 1
+    assert operations["crud.create"]["count"] == 2
+    assert operations["db.insert_if_absent"]["count"] == 2
+    assert operations["db.get_or_none"]["count"] == 2
+
+    path = tmp_path / "metrics.json"
+    metrics.export(str(path), trie=stats["trie"])
+    exported = json.loads(path.read_text(encoding="utf-8"))
+    assert exported["trie"] == {"words": 2, "nodes": 7}
+    assert exported["operations"]["dictionary.search"]["count"] == 1
+
+
+def test_stats_do_not_build_the_trie(tmp_path):
+    dictionary = Dictionary(DbSqlite(str(tmp_path / "db.sqlite3")), storage_search=True)
+    dictionary.write("hello", {"en": "greeting"})
+    assert "trie" not in dictionary.stats()
+    assert dictionary._trie is None
+
+
+def test_dictionary_without_metrics_is_not_wrapped(tmp_path):
+    db = DbFile(str(tmp_path / "db.json"))
+    dictionary = Dictionary(db)
+    assert dictionary.db is db
+    assert "read" not in vars(dictionary)
+    assert "operations" not in dictionary.stats()
@@ -0,0 +1,47 @@
+import random
+
+from dictionary.ngram import NGramIndex
+
+
+def test_search_matches_scan():
+    rng = random.Random(4)
+    words = {
+        "".join(rng.choice("abc") for _ in range(rng.randint(1, 7))) for _ in range(300)
+    }
+    index = NGramIndex()
+    for word in words:
+        index.add(word)
+    for substring in ["", "a", "ab", "abc", "cab", "abca", "bbbbbb", "x"]:
+        assert index.search(substring) == {word for word in words if substring in word}
+
+
+def test_remove():
+    index = NGramIndex()
+    for word in ["ab", "abcd", "bcde"]:
+        index.add(word)
+    index.remove("ab")
+    index.remove("abcd")
+    assert index.search("b") == {"bcde"}
+    assert index.search("bcd") == {"bcde"}
+    assert "abc" not in index.postings
+
+
+def test_with_words_leaves_the_index_untouched():
+    index = NGramIndex()
+    for word in ["ab", "abcd"]:
+        index.add(word)
+    copy = index.with_words(["a", "xbcd"])
+    assert index.search("bcd") == {"abcd"}
+    assert index.search("a") == {"ab", "abcd"}
+    assert copy.search("bcd") == {"abcd", "xbcd"}
+    assert copy.search("a") == {"a", "ab", "abcd"}
+    assert copy.postings["bcd"] is not index.postings["bcd"]
+    assert copy.postings["abc"] is index.postings["abc"]
+
+
+def test_search_sorted_is_dropped_on_change():
+    index = NGramIndex()
+    index.add("abcd")
+    assert index.search_sorted("bc") == ["abcd"]
+    index.add("abce")
+    assert index.search_sorted("bc") == ["abcd", "abce"]
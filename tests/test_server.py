@@ -0,0 +1,156 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from db.database import DbFile
+from db.metrics import Metrics
+from dictionary.dictionary import Dictionary
+from server import DictionaryServer, handle_lines, serve_stream
+
+
+def answer(dictionary, requests: list) -> list[dict]:
+    lines = [
+        json.dumps(request).encode() if not isinstance(request, bytes) else request
+        for request in requests
+    ]
+    return [json.loads(line) for line in handle_lines(dictionary, lines).splitlines()]
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    dictionary = Dictionary(DbFile(str(tmp_path / "db.json")), thread_safe=True)
+    dictionary.write("hello", {"en": "greeting", "fa": "سلام"})
+    dictionary.write("help", {"en": "assistance"})
+    return dictionary
+
+
+def test_requests_are_answered_in_order(dictionary):
+    responses = answer(
+        dictionary,
+        [
+            {"id": 1, "op": "get", "word": "hello", "lang": "fa"},
+            {"id": 2, "op": "add", "word": "world", "meanings": {"en": "planet"}},
+            {"id": 3, "op": "search", "prefix": "hel", "limit": 1},
+            b"{not json",
+            {"id": 4, "op": "update", "word": "help", "lang": "en", "meaning": "aid"},
+            {"id": 5, "op": "get", "word": "help", "lang": "en"},
+            {"id": 6, "op": "complete", "prefix": "", "k": 1},
+            {"id": 7, "op": "fly"},
+            {"id": 8, "op": "get"},
+            {
+                "id": 9,
+                "op": "batch",
+                "requests": [
+                    {"id": "a", "op": "suggest", "word": "wrld", "max_distance": 1}
+                ],
+            },
+        ],
+    )
+    assert [response.get("id") for response in responses] == [
+        1,
+        2,
+        3,
+        None,
+        4,
+        5,
+        6,
+        7,
+        8,
+        9,
+    ]
+    assert responses[0] == {"id": 1, "ok": True, "result": "سلام"}
+    assert responses[1]["result"] is True
+    assert responses[2]["result"] == ["hello"]
+    assert responses[3]["ok"] is False and responses[3]["error"].startswith(
+        "Invalid JSON"
+    )
+    assert responses[5]["result"] == "aid"
+    assert responses[6]["result"] == ["hello"]
+    assert responses[7]["error"] == "Unknown operation: 'fly'"
+    assert responses[8]["error"] == "Missing field: word"
+    assert responses[9]["result"] == [{"id": "a", "ok": True, "result": ["world"]}]
+
+
+def test_consecutive_gets_share_one_lookup(dictionary, monkeypatch):
+    calls = []
+    read_many = dictionary.read_many
+    monkeypatch.setattr(
+        dictionary,
+        "read_many",
+        lambda keys, lang: calls.append(keys) or read_many(keys, lang),
+    )
+    responses = answer(
+        dictionary,
+        [
+            {"id": 1, "op": "get", "word": "hello", "lang": "en"},
+            {"id": 2, "op": "get", "word": "missing", "lang": "en"},
+            {"id": 3, "op": "get", "word": "help", "lang": "fa"},
+            {"id": 4, "op": "get", "word": "hello", "lang": "en"},
+            {"id": 5, "op": "get", "word": "hello", "lang": "en"},
+        ],
+    )
+    assert calls == [["hello", "missing"], ["help"], ["hello"], ["hello"]]
+    assert responses[1]["error"] == "The word 'missing' was not found!"
+    assert responses[2]["error"] == "The word 'help' does not have a definition in fa."
+    # Repeated words are not merged, so every get is counted.
+    dictionary.flush_lookups()
+    assert dictionary.trie.weight("hello") == 3
+
+
+def test_serve_stream_handles_split_lines(dictionary):
+    data = (
+        b'{"id": 1, "op": "get", "word": "hel'
+        + b'lo", "lang": "en"}\n{"id": 2, "op": "complete"}'
+    )
+    chunks = iter([data[:20], data[20:], b""])
+    written = []
+    serve_stream(dictionary, lambda size: next(chunks), written.append)
+    responses = [json.loads(line) for line in b"".join(written).splitlines()]
+    assert [response["id"] for response in responses] == [1, 2]
+    assert responses[0]["result"] == "greeting"
+
+
+def test_socket_server_pipelines(dictionary, tmp_path):
+    path = str(tmp_path / "dictionary.sock")
+    server = DictionaryServer(path, dictionary)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            requests = [
+                {"id": i, "op": "get", "word": "hello", "lang": "en"}
+                for i in range(200)
+            ]
+            client.sendall(
+                b"".join(json.dumps(request).encode() + b"\n" for request in requests)
+            )
+            client.shutdown(socket.SHUT_WR)
+            received = b""
+            while chunk := client.recv(65536):
+                received += chunk
+        responses = [json.loads(line) for line in received.splitlines()]
+        assert [response["id"] for response in responses] == list(range(200))
+        assert all(response["result"] == "greeting" for response in responses)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_socket_server_needs_thread_safe_dictionary(tmp_path):
+    with pytest.raises(ValueError):
+        DictionaryServer(
+            str(tmp_path / "dictionary.sock"),
+            Dictionary(DbFile(str(tmp_path / "db.json"))),
+        )
+
+
+def test_stats_request(tmp_path):
+    dictionary = Dictionary(DbFile(str(tmp_path / "db.json")), metrics=Metrics())
+    dictionary.write("hello", {"en": "greeting"})
+    answer(dictionary, [{"op": "get", "word": "hello", "lang": "en"}])
+    [response] = answer(dictionary, [{"id": 1, "op": "stats"}])
+    assert response["result"]["trie"]["words"] == 1
+    assert response["result"]["operations"]["dictionary.read_many"]["count"] == 1
@@ -0,0 +1,341 @@
+import random
+
+import pytest
+
+from dictionary.tie import BaseTrie, RadixTrie, Trie, TrieFactory, TrieType
+
+
+@pytest.fixture(params=[TrieType.STANDARD, TrieType.RADIX])
+def trie(request):
+    return TrieFactory.create_trie(request.param)
+
+
+def test_trie_must_provide_the_walk():
+    class Incomplete(BaseTrie):
+        def _locate(self, prefix: str):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_insert_and_starts_with(trie):
+    for word in ["hello", "help", "he", "world"]:
+        trie.insert(word)
+    assert list(trie.starts_with("he")) == ["he", "hello", "help"]
+    assert list(trie.starts_with("hel")) == ["hello", "help"]
+    assert list(trie.starts_with("hell")) == ["hello"]
+    assert list(trie.starts_with("x")) == []
+    assert trie.search_prefix("wor") is not None
+    assert trie.search_prefix("wx") is None
+
+
+def test_delete_existing_word(trie):
+    trie.insert("hello")
+    trie.insert("help")
+    assert trie.delete("hello") is True
+    assert list(trie.starts_with("hel")) == ["help"]
+
+
+def test_delete_keeps_prefix_word(trie):
+    trie.insert("he")
+    trie.insert("hello")
+    trie.delete("hello")
+    assert list(trie.starts_with("h")) == ["he"]
+    assert trie.search_prefix("hel") is None
+
+
+def test_delete_missing_word(trie):
+    trie.insert("hello")
+    assert trie.delete("hell") is False
+    assert trie.delete("world") is False
+    assert list(trie.starts_with("")) == ["hello"]
+
+
+def test_delete_prunes_nodes():
+    trie = Trie()
+    trie.insert("hello")
+    trie.delete("hello")
+    assert trie.root.children == {}
+
+
+def test_radix_trie_splits_and_merges_edges():
+    trie = RadixTrie()
+    trie.insert("hello")
+    trie.insert("help")
+    middle = trie.root.child("h")
+    assert middle.label == "hel"
+    assert middle.keys == "lp"
+    trie.delete("help")
+    assert trie.root.child("h").label == "hello"
+    assert trie.root.child("h").nodes is None
+
+
+def test_radix_trie_matches_trie():
+    rng = random.Random(7)
+    words = {
+        "".join(rng.choice("abc") for _ in range(rng.randint(0, 6))) for _ in range(300)
+    }
+    trie, radix = Trie(), RadixTrie()
+    for word in words:
+        trie.insert(word)
+        radix.insert(word)
+    for word in list(words)[::3]:
+        assert trie.delete(word) == radix.delete(word)
+    for prefix in ["", "a", "ab", "abc", "ba", "cc", "cab"]:
+        assert list(trie.starts_with(prefix)) == list(radix.starts_with(prefix))
+
+
+def test_starts_with_is_lexicographic(trie):
+    words = ["banana", "b", "bandana", "ban", "apple", "band", "bananas"]
+    for word in words:
+        trie.insert(word)
+    assert list(trie.starts_with("")) == sorted(words)
+    assert list(trie.starts_with("ban")) == [
+        "ban",
+        "banana",
+        "bananas",
+        "band",
+        "bandana",
+    ]
+
+
+def test_starts_with_limit_and_offset(trie):
+    for word in ["ab", "abc", "abd", "abe", "abf"]:
+        trie.insert(word)
+    assert list(trie.starts_with("ab", limit=2)) == ["ab", "abc"]
+    assert list(trie.starts_with("ab", limit=2, offset=2)) == ["abd", "abe"]
+    assert list(trie.starts_with("ab", offset=4)) == ["abf"]
+    assert list(trie.starts_with("ab", limit=2, offset=10)) == []
+
+
+def test_starts_with_resumes_after_cursor(trie):
+    words = ["ban", "banana", "bananas", "band", "bandana", "bar", "bat"]
+    for word in words:
+        trie.insert(word)
+    assert list(trie.starts_with("ba", limit=3, after="banana")) == [
+        "bananas",
+        "band",
+        "bandana",
+    ]
+    assert list(trie.starts_with("ba", after="bana")) == words[1:]
+    assert list(trie.starts_with("ba", after="bandz")) == ["bar", "bat"]
+    assert list(trie.starts_with("ba", after="a")) == words
+    assert list(trie.starts_with("ba", after="c")) == []
+
+
+def test_starts_with_cursor_pages_cover_everything():
+    rng = random.Random(3)
+    words = sorted(
+        {
+            "".join(rng.choice("abc") for _ in range(rng.randint(1, 7)))
+            for _ in range(500)
+        }
+    )
+    for trie in (Trie(), RadixTrie()):
+        for word in words:
+            trie.insert(word)
+        pages, after = [], None
+        while True:
+            page = list(trie.starts_with("", limit=17, after=after))
+            if not page:
+                break
+            pages.extend(page)
+            after = page[-1]
+        assert pages == words
+
+
+def test_starts_with_handles_deep_words(trie):
+    word = "a" * 5000
+    trie.insert(word)
+    assert list(trie.starts_with("aaa")) == [word]
+
+
+def test_starts_with_is_lazy():
+    trie = Trie()
+    for word in ["aa", "ab", "ac"]:
+        trie.insert(word)
+    matches = trie.starts_with("a")
+    assert next(matches) == "aa"
+
+
+def test_top_k_orders_by_weight(trie):
+    weights = {"car": 5, "card": 9, "care": 9, "cart": 1, "cat": 3, "dog": 100}
+    for word, weight in weights.items():
+        trie.insert(word, weight)
+    assert trie.top_k("ca", 3) == ["card", "care", "car"]
+    assert trie.top_k("car", 10) == ["card", "care", "car", "cart"]
+    assert trie.top_k("", 1) == ["dog"]
+    assert trie.top_k("x", 3) == []
+    assert trie.top_k("ca", 0) == []
+
+
+def test_top_k_follows_weight_changes(trie):
+    for word in ["tea", "ten", "tent"]:
+        trie.insert(word, 1)
+    assert trie.set_weight("tent", 7) is True
+    assert trie.top_k("te", 1) == ["tent"]
+    trie.set_weight("tent", 0)
+    assert trie.top_k("te", 1) == ["tea"]
+    assert trie.set_weight("te", 3) is False
+    assert trie.weight("tent") == 0
+    assert trie.weight("te") is None
+
+
+def test_insert_keeps_weight_unless_given(trie):
+    trie.insert("word", 4)
+    trie.insert("word")
+    assert trie.weight("word") == 4
+    trie.insert("word", 2)
+    assert trie.weight("word") == 2
+
+
+def test_delete_updates_max_weights(trie):
+    trie.insert("apple", 1)
+    trie.insert("applet", 50)
+    trie.insert("apricot", 10)
+    trie.delete("applet")
+    assert trie.root.max_weight == 10
+    assert trie.top_k("ap", 2) == ["apricot", "apple"]
+
+
+def test_top_k_matches_sorting():
+    rng = random.Random(11)
+    words = {
+        "".join(rng.choice("abcd") for _ in range(rng.randint(1, 6))): rng.randint(
+            0, 20
+        )
+        for _ in range(400)
+    }
+    for trie in (Trie(), RadixTrie()):
+        for word, weight in words.items():
+            trie.insert(word, weight)
+        for word in list(words)[::5]:
+            trie.delete(word)
+            words.pop(word)
+        for prefix in ["", "a", "bc", "dda"]:
+            expected = sorted(
+                (w for w in words if w.startswith(prefix)), key=lambda w: (-words[w], w)
+            )[:7]
+            assert trie.top_k(prefix, 7) == expected
+
+
+def test_factory_invalid():
+    with pytest.raises(ValueError):
+        TrieFactory.create_trie("invalid")
+
+
+def test_items_yields_words_with_weights(trie):
+    for word, weight in [("help", 2), ("he", 0), ("hello", 5), ("world", 1)]:
+        trie.insert(word, weight)
+    trie.delete("world")
+    assert list(trie.items()) == [("he", 0), ("hello", 5), ("help", 2)]
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            row.append(
+                min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = row
+    return previous[-1]
+
+
+def test_fuzzy_matches_brute_force(trie):
+    rng = random.Random(3)
+    words = {
+        "".join(rng.choice("abcd") for _ in range(rng.randint(0, 8))): rng.randint(0, 5)
+        for _ in range(300)
+    }
+    for word, weight in words.items():
+        trie.insert(word, weight)
+    for query in ["", "a", "abc", "abcdab", "x", "abcdabcdabcd"]:
+        for max_distance in (0, 1, 2, 3):
+            expected = sorted(
+                (levenshtein(query, word), -weight, word)
+                for word, weight in words.items()
+                if levenshtein(query, word) <= max_distance
+            )
+            assert trie.fuzzy(query, max_distance) == [
+                (word, distance) for distance, _, word in expected
+            ]
+
+
+def test_fuzzy_limit_ranks_by_distance_then_weight(trie):
+    for word, weight in [("cart", 1), ("card", 9), ("cat", 0), ("dog", 50)]:
+        trie.insert(word, weight)
+    assert trie.fuzzy("carx", 1, limit=2) == [("card", 1), ("cart", 1)]
+
+
+def test_with_word_leaves_the_original_untouched(trie):
+    for word, weight in [("hello", 1), ("help", 2), ("world", 3)]:
+        trie.insert(word, weight)
+    before = list(trie.items())
+    evolved = (
+        trie.with_word("helm", 9)
+        .with_word("he")
+        .with_weight("hello", 7)
+        .with_word("hel", 0)
+    )
+    assert list(trie.items()) == before
+    assert trie.top_k("", 3) == ["world", "help", "hello"]
+    assert list(evolved.items()) == [
+        ("he", 0),
+        ("hel", 0),
+        ("hello", 7),
+        ("helm", 9),
+        ("help", 2),
+        ("world", 3),
+    ]
+    assert evolved.top_k("hel", 2) == ["helm", "hello"]
+    assert evolved.with_weight("missing", 1).weight("missing") is None
+
+
+def test_stats(trie):
+    assert trie.stats() == {"words": 0, "nodes": 1}
+    for word in ["hello", "help", "he"]:
+        trie.insert(word)
+    nodes = {Trie: 7, RadixTrie: 5}
+    assert trie.stats() == {"words": 3, "nodes": nodes[type(trie)]}
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.parametrize("trie_type", [TrieType.STANDARD, TrieType.RADIX])
+def test_build_trie_matches_insert(trie_type, workers):
+    rng = random.Random(13)
+    items = [
+        (
+            "".join(rng.choice("abcé") for _ in range(rng.randint(0, 6))),
+            rng.randint(0, 20),
+        )
+        for _ in range(500)
+    ]
+    items.append(("b" * 3000, 30))
+    inserted = TrieFactory.create_trie(trie_type)
+    for word, weight in items:
+        inserted.insert(word, weight)
+    built = TrieFactory.build_trie(trie_type, items, workers)
+    assert type(built) is type(inserted)
+    assert list(built.items()) == list(inserted.items())
+    assert built.stats() == inserted.stats()
+    for prefix in ["", "a", "bc", "éa", "bbb"]:
+        assert built.top_k(prefix, 5) == inserted.top_k(prefix, 5)
+    assert TrieFactory.build_trie(trie_type, [], workers).stats() == {
+        "words": 0,
+        "nodes": 1,
+    }
+
+
+def test_from_sorted_builds_final_radix_edges():
+    trie = RadixTrie.from_sorted(["he", "hello", "help"], [1, 5, 2])
+    middle = trie.root.child("h")
+    assert middle.label == "he" and middle.is_end_of_word
+    assert middle.child("l").label == "l" and middle.child("l").keys == "lp"
+    assert [node.max_weight for node in (trie.root, middle, middle.child("l"))] == [
+        5,
+        5,
+        5,
+    ]